@@ -0,0 +1,100 @@
+"""
+Dataset cache benchmark: loading the training CSVs by parsing them (what
+the training scripts did on every run: read_csv + strip every string column)
+vs through the columnar cache in services/dataset_cache.py.
+
+For each dataset, reports the CSV load, the one-off cache build and a
+cached load (best of --repeat), plus the in-memory size of each frame, and
+checks that the label-encoded features are identical either way. --scale
+replicates the rows to a larger temporary CSV first.
+
+Usage (from backend/):
+    python benchmarks/bench_dataset_cache.py [--scale 1] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+warnings.filterwarnings("ignore")
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+DATASETS = ("farm_resource_dataset.csv", "agriculture_dataset.csv")
+
+
+def parse_csv(path: str) -> pd.DataFrame:
+    """The training scripts' original load."""
+    df = pd.read_csv(path)
+    df.columns = [col.strip() for col in df.columns]
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        df[col] = df[col].astype(str).str.strip()
+    return df
+
+
+def best_of(fn, repeat: int) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def frame_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=1, help="replicate each dataset this many times")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATASET_CACHE_DIR"] = os.path.join(tmp, "cache")
+        from services import dataset_cache  # noqa: E402  (reads DATASET_CACHE_DIR)
+
+        failed = False
+        for name in DATASETS:
+            path = os.path.join(BACKEND_DIR, "dataset", name)
+            if args.scale > 1:
+                scaled = os.path.join(tmp, name)
+                pd.concat([pd.read_csv(path)] * args.scale, ignore_index=True).to_csv(scaled, index=False)
+                path = scaled
+
+            csv_s, parsed = best_of(lambda: parse_csv(path), args.repeat)
+            start = time.perf_counter()
+            dataset_cache.load_dataset(path)
+            build_s = time.perf_counter() - start
+            cached_s, cached = best_of(lambda: dataset_cache.load_dataset(path), args.repeat)
+
+            print(f"\n{name}: {len(parsed)} rows")
+            print(f"  csv + strip   {csv_s*1000:8.1f} ms   {frame_mb(parsed):7.1f} MB in memory")
+            print(f"  cache build   {build_s*1000:8.1f} ms   (once per CSV change)")
+            print(f"  cache load    {cached_s*1000:8.1f} ms   {frame_mb(cached):7.1f} MB in memory"
+                  f"   ({csv_s / cached_s:.1f}x faster)")
+
+            columns = parsed.select_dtypes(include=["object", "string"]).columns.tolist()
+            expected, expected_enc = dataset_cache.label_encode(parsed.copy(), columns)
+            actual, actual_enc = dataset_cache.label_encode(cached.copy(), columns)
+            same = (
+                list(expected.columns) == list(actual.columns)
+                and all(np.array_equal(expected[c].to_numpy(), actual[c].to_numpy()) for c in expected.columns)
+                and all(list(expected_enc[c].classes_) == list(actual_enc[c].classes_) for c in columns)
+            )
+            print(f"  {'✅' if same else '❌'} encoded features and encoders identical")
+            failed = failed or not same
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
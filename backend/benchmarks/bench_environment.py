@@ -0,0 +1,160 @@
+"""
+Environment engine benchmark: analyze_environment_batch / generate_advisories_batch
+vs a per-pair loop over the scalar functions.
+
+Checks that the vectorized results are identical to the frozen scalar
+implementation in environment_reference.py (the code the engine replaced) —
+adjusted yield, risk level, warnings and advisories — on farms from
+dataset/farm_resource_dataset.csv paired with every crop, on random
+conditions, and on a grid of values sitting exactly on, just inside and
+just outside every crop's range bounds (and the ±5 °C advisory thresholds).
+Then prints throughput in pairs per second for the numeric engine alone
+(penalties, risk, advisory bitmasks), the full batch functions (with
+messages, and with advisory IDs only) and the reference scalar loop.
+
+Usage (from backend/):
+    python benchmarks/bench_environment.py [--pairs 1000 100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import environment_reference as reference  # noqa: E402
+from services.environment import (  # noqa: E402
+    CROP_RANGES,
+    DEFAULT_RANGES,
+    _condition_column,
+    advisory_masks,
+    analyze_environment_batch,
+    generate_advisories_batch,
+    score_environment,
+)
+
+DATA_PATH = os.path.join(BACKEND_DIR, "dataset", "farm_resource_dataset.csv")
+
+CROPS = list(CROP_RANGES) + ["Cotton"]  # Cotton → DEFAULT_RANGES
+FACTOR_COLUMNS = {"temperature": "Temperature_C", "rainfall": "Rainfall_mm", "soil_ph": "Soil_pH"}
+OFFSETS = (-5.01, -5.0, -0.01, 0.0, 0.01, 5.0, 5.01)
+
+
+def dataset_pairs(n: int, seed: int = 0):
+    """n (farm, crop) pairs: dataset farms, each paired with every crop in CROPS."""
+    farms = pd.read_csv(DATA_PATH).sample(-(-n // len(CROPS)), random_state=seed, replace=True)
+    rows, crops, yields = [], [], []
+    for farm in farms.to_dict("records"):
+        for crop in CROPS:
+            rows.append(farm)
+            crops.append(crop)
+            yields.append(round(float(farm["Farm_Area_acres"]) / 4, 3))
+    return rows[:n], crops[:n], yields[:n]
+
+
+def random_pairs(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    rows, crops, yields = [], [], []
+    for _ in range(n):
+        rows.append({
+            "Temperature_C":      round(float(rng.uniform(-5, 50)), 1),
+            "Rainfall_mm":        round(float(rng.uniform(100, 3500))),
+            "Soil_pH":            round(float(rng.uniform(4, 9.5)), 2),
+            "Fertilizer_Used_kg": round(float(rng.uniform(0, 250)), 1),
+            "Irrigation_Type":    str(rng.choice(["Flood", "Drip", "Rainfed", "Sprinkler"])),
+            "Soil_Type":          str(rng.choice(["Sandy", "Clay", "Peaty", "Loamy", "Silty"])),
+            "Season":             str(rng.choice(["Kharif", "Rabi", "Summer", "Zaid"])),
+        })
+        crops.append(str(rng.choice(CROPS)))
+        yields.append(round(float(rng.uniform(0, 10)), 3))
+    return rows, crops, yields
+
+
+def boundary_pairs():
+    base = random_pairs(1, seed=1)[0][0]
+    rows, crops, yields = [], [], []
+    for ranges in list(CROP_RANGES.values()) + [DEFAULT_RANGES]:
+        for factor, bounds in ranges.items():
+            for bound in bounds:
+                for offset in OFFSETS:
+                    for crop in CROPS:
+                        rows.append({**base, FACTOR_COLUMNS[factor]: float(bound + offset)})
+                        crops.append(crop)
+                        yields.append(1.0)
+    return rows, crops, yields
+
+
+def check_parity(rows, crops, yields) -> int:
+    analyzed = analyze_environment_batch(rows, crops, yields)
+    advisories = generate_advisories_batch(rows, crops)
+    mismatches = 0
+    for i, (row, crop, y) in enumerate(zip(rows, crops, yields)):
+        if analyzed[i] != reference.analyze_environment(row, crop, y) or \
+                advisories[i] != reference.generate_advisories(row, crop):
+            mismatches += 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--loop-limit", type=int, default=20000,
+                        help="skip the per-pair loop above this many pairs")
+    args = parser.parse_args()
+
+    failed = False
+    suites = [("dataset", dataset_pairs(5000)), ("random", random_pairs(5000)), ("boundary", boundary_pairs())]
+    for label, (rows, crops, yields) in suites:
+        mismatches = check_parity(rows, crops, yields)
+        status = "✅" if mismatches == 0 else "❌"
+        print(f"{status} {label:8} parity: {len(rows) - mismatches}/{len(rows)} pairs identical")
+        failed = failed or mismatches > 0
+    print()
+
+    for n in args.pairs:
+        rows, crops, yields = dataset_pairs(n)
+
+        start = time.perf_counter()
+        score_environment(
+            _condition_column(rows, "Temperature_C", 27.0),
+            _condition_column(rows, "Rainfall_mm", 850.0),
+            _condition_column(rows, "Soil_pH", 7.0),
+            crops, np.asarray(yields),
+        )
+        advisory_masks(rows, crops)
+        engine_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        analyze_environment_batch(rows, crops, yields)
+        generate_advisories_batch(rows, crops)
+        batch_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        analyze_environment_batch(rows, crops, yields)
+        generate_advisories_batch(rows, crops, ids_only=True)
+        ids_s = time.perf_counter() - start
+
+        line = (f"{n:7d} pairs  engine {engine_s*1000:8.1f} ms ({n/engine_s:9.0f} pairs/s)"
+                f"  batch {batch_s*1000:8.1f} ms ({n/batch_s:8.0f} pairs/s)"
+                f"  ids-only {ids_s*1000:8.1f} ms")
+
+        if n <= args.loop_limit:
+            start = time.perf_counter()
+            for row, crop, y in zip(rows, crops, yields):
+                reference.analyze_environment(row, crop, y)
+                reference.generate_advisories(row, crop)
+            loop_s = time.perf_counter() - start
+            line += f"  loop {loop_s*1000:8.1f} ms ({n/loop_s:8.0f} pairs/s)"
+        print(line)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
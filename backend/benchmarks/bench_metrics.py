@@ -0,0 +1,73 @@
+"""
+Instrumentation overhead: cost of the metrics calls the request path makes,
+with metrics enabled and disabled (METRICS_ENABLED), and of a whole
+enrich_allocation call (three predicted crops) in both modes.
+
+Prediction caches are disabled so every enrich_allocation call runs the
+models. The switch is flipped in-process via services.metrics.METRICS_ENABLED,
+which every metrics call reads on entry.
+
+Usage (from backend/):
+    python benchmarks/bench_metrics.py [--calls 200000] [--plans 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ["PREDICTION_CACHE_SIZE"] = "0"
+
+from services import metrics  # noqa: E402
+from services.metrics import REQUESTS, record_inference, reset_metrics, stage  # noqa: E402
+from services.registry import SMOKE_FARMS  # noqa: E402
+
+ALLOCATION = {"Rice": 8.0, "Wheat": 7.0, "Maize": 5.0}
+
+
+def per_call_ns(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def timed_stage():
+    with stage("bench"):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--plans", type=int, default=2000)
+    args = parser.parse_args()
+
+    from main import enrich_allocation
+    farm = SMOKE_FARMS[0]
+
+    calls = [
+        ("stage() block",      timed_stage),
+        ("counter inc",        lambda: REQUESTS.inc(endpoint="/bench", method="GET", status=200)),
+        ("record_inference",   lambda: record_inference("bench", 3)),
+    ]
+    for enabled in (True, False):
+        metrics.METRICS_ENABLED = enabled
+        reset_metrics()
+        label = "enabled " if enabled else "disabled"
+        for name, fn in calls:
+            print(f"{label}  {name:18} {per_call_ns(fn, args.calls):8.0f} ns/call")
+
+        enrich_allocation(ALLOCATION, farm)  # warm-up
+        start = time.perf_counter()
+        for _ in range(args.plans):
+            enrich_allocation(ALLOCATION, farm)
+        plan_us = (time.perf_counter() - start) / args.plans * 1e6
+        print(f"{label}  {'enrich_allocation':18} {plan_us:8.1f} µs/call")
+        print()
+
+
+if __name__ == "__main__":
+    main()
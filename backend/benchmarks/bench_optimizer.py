@@ -0,0 +1,80 @@
+"""
+LP optimizer benchmark: compares the solver backends of optimize_allocation.
+
+Solves random allocation problems (random crop subsets, land, water and
+fertilizer) with every backend, checks that each reaches the same optimal
+profit as PuLP/CBC (within ₹0.05 — allocations themselves may differ when
+the LP has alternative optima), and prints per-solve p50/p99 latency.
+
+Usage (from backend/):
+    python benchmarks/bench_optimizer.py [--problems 200] [--backends vertex,highs,pulp]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services.optimizer import CROP_DATA, SOLVERS, optimize_allocation  # noqa: E402
+
+PROFIT_TOLERANCE = 0.05
+
+
+def random_problems(n: int, seed: int = 0) -> list[tuple]:
+    rng = np.random.default_rng(seed)
+    crops = list(CROP_DATA)
+    problems = []
+    for _ in range(n):
+        subset = [str(c) for c in rng.choice(crops, rng.integers(1, len(crops) + 1), replace=False)]
+        problems.append((
+            float(rng.uniform(1, 50)),         # land (acres)
+            float(rng.uniform(1000, 200000)),  # water
+            float(rng.uniform(50, 5000)),      # fertilizer (kg)
+            subset,
+        ))
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--problems", type=int, default=200)
+    parser.add_argument("--backends", default=",".join(SOLVERS))
+    args = parser.parse_args()
+
+    backends = args.backends.split(",")
+    problems = random_problems(args.problems)
+    profits: dict[str, list[float]] = {}
+
+    print(f"Solving {len(problems)} random allocation problems\n")
+    for backend in backends:
+        optimize_allocation(*problems[0], backend=backend)  # warm up imports
+        timings = []
+        profits[backend] = []
+        for land, water, fertilizer, crops in problems:
+            start = time.perf_counter()
+            result = optimize_allocation(land, water, fertilizer, crops, backend=backend)
+            timings.append(time.perf_counter() - start)
+            profits[backend].append(result["total_profit"])
+
+        p50, p99 = np.percentile(np.array(timings) * 1e6, [50, 99])
+        print(f"{backend:8} p50={p50:9.1f}µs  p99={p99:9.1f}µs")
+
+    reference = "pulp" if "pulp" in profits else backends[0]
+    failed = False
+    print()
+    for backend in backends:
+        diff = np.abs(np.array(profits[backend]) - np.array(profits[reference]))
+        within = int((diff <= PROFIT_TOLERANCE).sum())
+        print(f"{backend:8} profit matches {reference}: {within}/{len(problems)} (max diff ₹{diff.max():.2f})")
+        failed = failed or within != len(problems)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Batch LP optimizer benchmark: optimize_allocation_batch vs a per-farm loop.
+
+Generates a portfolio of farms with random land, water, fertilizer and crop
+sets (drawn from the RELATED_CROPS triples used by /generate-farm-plan plus
+random subsets), solves it once with optimize_allocation_batch and once with
+a Python loop over optimize_allocation, checks that both return identical
+results, and prints throughput in farms per second.
+
+Usage (from backend/):
+    python benchmarks/bench_optimizer_batch.py [--farms 10000 50000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Disable the solution memo so the per-farm loop really solves every farm
+os.environ.setdefault("OPTIMIZER_MEMO_SIZE", "0")
+
+from services.optimizer import CROP_DATA, optimize_allocation, optimize_allocation_batch  # noqa: E402
+
+RELATED_SETS = [
+    ["Rice", "Wheat", "Maize"],
+    ["Wheat", "Potato", "Maize"],
+    ["Tomato", "Potato", "Wheat"],
+    ["Maize", "Rice", "Wheat"],
+    ["Potato", "Tomato", "Maize"],
+]
+
+
+def portfolio(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    crops = list(CROP_DATA)
+    crop_sets = []
+    for _ in range(n):
+        if rng.random() < 0.8:
+            crop_sets.append(RELATED_SETS[rng.integers(len(RELATED_SETS))])
+        else:
+            k = int(rng.integers(1, len(crops) + 1))
+            crop_sets.append([str(c) for c in rng.choice(crops, k, replace=False)])
+    land = rng.uniform(1, 50, n)
+    water = rng.uniform(1000, 200000, n)
+    fertilizer = rng.uniform(50, 5000, n)
+    return land, water, fertilizer, crop_sets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--farms", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--loop-limit", type=int, default=10000,
+                        help="skip the per-farm loop above this many farms")
+    args = parser.parse_args()
+
+    for n in args.farms:
+        land, water, fertilizer, crop_sets = portfolio(n)
+
+        start = time.perf_counter()
+        batch = optimize_allocation_batch(land, water, fertilizer, crop_sets)
+        batch_s = time.perf_counter() - start
+        line = f"{n:7d} farms  batch {batch_s*1000:9.1f} ms ({n / batch_s:10.0f} farms/s)"
+
+        if n <= args.loop_limit:
+            start = time.perf_counter()
+            loop = [
+                optimize_allocation(float(l), float(w), float(f), c, backend="vertex")
+                for l, w, f, c in zip(land, water, fertilizer, crop_sets)
+            ]
+            loop_s = time.perf_counter() - start
+            identical = sum(1 for a, b in zip(batch, loop) if a == b)
+            line += f"  loop {loop_s*1000:9.1f} ms ({n / loop_s:8.0f} farms/s)  identical {identical}/{n}"
+            if identical != n:
+                print(line)
+                sys.exit(1)
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Rotation planner benchmark: plan_rotation (services/rotation.py) on farms
+with dozens of plots, with and without the warm start.
+
+First checks small random farms against brute-force enumeration of every
+plan (the planner must be within ROTATION_MIP_GAP of the optimum), and
+exits 1 on a mismatch. Then samples farms from
+dataset/farm_resource_dataset.csv, derives per-season profit coefficients
+from the yield model (main.rotation_profits) over a Kharif → Rabi → Zaid
+cycle, splits each farm into --plots random whole-acre plots with tight
+water/fertilizer budgets, and reports per size: solve time, how often
+optimality was proven, and profit relative to the best plan found,
+alongside the greedy and rolling-horizon plans. Every plan is checked
+against the constraints.
+
+Usage (from backend/):
+    python benchmarks/bench_rotation.py [--plots 12 24 48] [--seasons 6] [--farms 3] [--time-limit 5]
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import warnings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("MODEL_WATCH_INTERVAL", "0")
+warnings.filterwarnings("ignore")
+
+import numpy as np  # noqa: E402
+
+from bench_suite import farm_fields, sample_farms  # noqa: E402
+
+import main as app_module  # noqa: E402
+from services.optimizer import CROP_DATA  # noqa: E402
+from services.preprocessor import safe_preprocess  # noqa: E402
+from services.rotation import (  # noqa: E402
+    ROTATION_MIP_GAP,
+    ROTATION_RULES,
+    check_plan,
+    greedy_plan,
+    plan_profit,
+    plan_rotation,
+    rolling_plan,
+)
+
+CROPS = list(CROP_DATA)
+SEASON_CYCLE = [
+    {"Season": "Kharif", "Rainfall_mm": 900, "Temperature_C": 29},
+    {"Season": "Rabi",   "Rainfall_mm": 150, "Temperature_C": 18},
+    {"Season": "Zaid",   "Rainfall_mm": 80,  "Temperature_C": 34},
+]
+
+
+def brute_force(plots, crops, profit, water, fertilizer, previous) -> float:
+    """Best profit over every assignment of crops (or fallow) to plots and seasons."""
+    best = 0.0
+    options = list(crops) + [None]
+    seasons = list(itertools.product(options, repeat=len(plots)))
+    for plan in itertools.product(seasons, repeat=len(water)):
+        if not check_plan(plan, plots, crops, water, fertilizer, previous):
+            best = max(best, plan_profit(plan, plots, crops, profit))
+    return best
+
+
+def check_optimality(instances: int) -> bool:
+    rng = np.random.default_rng(0)
+    ok = True
+    for _ in range(instances):
+        crops = list(rng.choice(CROPS, size=3, replace=False))
+        if "Potato" not in crops:
+            crops[0] = "Potato"
+        plots = [int(a) for a in rng.integers(1, 4, size=3)]
+        profit = rng.uniform(20000, 70000, size=(2, len(crops)))
+        water = [float(sum(plots)) * rng.uniform(1500, 3500) for _ in range(2)]
+        fertilizer = [float(sum(plots)) * rng.uniform(40, 90) for _ in range(2)]
+        previous = [rng.choice(CROPS + [None]) for _ in plots]
+
+        result = plan_rotation(plots, crops, profit, water, fertilizer, previous, time_limit=10)
+        plan = [season["plots"] for season in result["seasons"]]
+        expected = brute_force(plots, crops, profit, water, fertilizer, previous)
+        ok = ok and not check_plan(plan, plots, crops, water, fertilizer, previous) \
+            and plan_profit(plan, plots, crops, profit) >= expected * (1 - ROTATION_MIP_GAP) - 1e-6
+    print(f"{'✅' if ok else '❌'} {instances} small farms: plans within {ROTATION_MIP_GAP:.2%} "
+          f"of the brute-force optimum")
+    return ok
+
+
+def farm_instance(row: dict, n_plots: int, n_seasons: int, rng: np.random.Generator):
+    conditions = safe_preprocess(farm_fields(row))
+    seasons = [SEASON_CYCLE[s % len(SEASON_CYCLE)] for s in range(n_seasons)]
+    profit = np.array(app_module.rotation_profits(conditions, seasons, CROPS))
+    plots = [int(a) for a in rng.integers(1, 6, size=n_plots)]
+    land = sum(plots)
+    water = [land * rng.uniform(1800, 3000) for _ in range(n_seasons)]
+    fertilizer = [land * rng.uniform(55, 85) for _ in range(n_seasons)]
+    previous = [rng.choice(CROPS + [None]) for _ in plots]
+    return plots, profit, water, fertilizer, previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plots", type=int, nargs="+", default=[12, 24, 48])
+    parser.add_argument("--seasons", type=int, default=6)
+    parser.add_argument("--farms", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=5.0)
+    parser.add_argument("--brute-force", type=int, default=20, help="small farms checked against enumeration")
+    args = parser.parse_args()
+
+    failed = not check_optimality(args.brute_force)
+    rng = np.random.default_rng(1)
+    farms = sample_farms(args.farms, seed=0)
+
+    print(f"\n{args.seasons} seasons, {len(CROPS)} crops, time limit {args.time_limit:.0f} s; "
+          f"profit relative to the best plan found per farm")
+    for n_plots in args.plots:
+        stats = {"warm": [], "cold": []}
+        for row in farms:
+            plots, profit, water, fertilizer, previous = farm_instance(row, n_plots, args.seasons, rng)
+            greedy = plan_profit(greedy_plan(plots, CROPS, profit, water, fertilizer, previous),
+                                 plots, CROPS, profit)
+            rolling = plan_profit(rolling_plan(plots, CROPS, profit, water, fertilizer, previous,
+                                               ROTATION_RULES, args.time_limit / 4), plots, CROPS, profit)
+            runs = {}
+            for mode in stats:
+                result = plan_rotation(plots, CROPS, profit, water, fertilizer, previous,
+                                       warm_start=mode == "warm", time_limit=args.time_limit)
+                plan = [season["plots"] for season in result["seasons"]]
+                problems = check_plan(plan, plots, CROPS, water, fertilizer, previous)
+                if problems:
+                    print(f"❌ {n_plots} plots, {mode}: {problems[:3]}")
+                    failed = True
+                runs[mode] = (result, plan_profit(plan, plots, CROPS, profit))
+            best = max(profit_ for _, profit_ in runs.values())
+            for mode, (result, profit_) in runs.items():
+                stats[mode].append((result["solve_seconds"], result["status"] == "optimal",
+                                    profit_ / best, greedy / best, rolling / best))
+
+        print(f"\n{n_plots} plots:")
+        for mode, rows in stats.items():
+            seconds, optimal, relative, greedy, rolling = map(np.array, zip(*rows))
+            print(f"  {mode:5} start  {np.mean(seconds):6.2f} s avg  {optimal.sum()}/{len(rows)} proven optimal  "
+                  f"profit {np.mean(relative):.5f}")
+        print(f"  greedy plan {np.mean(greedy):.5f}   rolling-horizon plan {np.mean(rolling):.5f}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
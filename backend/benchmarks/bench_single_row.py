@@ -0,0 +1,98 @@
+"""
+Single-row inference benchmark: pandas DataFrame path vs NumPy fast path.
+
+Replays farm rows from dataset/farm_resource_dataset.csv through
+  - the original DataFrame path  (pd.DataFrame([data])[columns] → encode → predict)
+  - the NumPy path used by services.prediction / services.yield_predictor
+checks that both return identical predictions, and prints p50/p99 latency.
+
+Usage (from backend/):
+    python benchmarks/bench_single_row.py [--rows 500]
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services import prediction, yield_predictor  # noqa: E402
+
+DATA_PATH  = os.path.join(BACKEND_DIR, "dataset", "farm_resource_dataset.csv")
+MODELS_DIR = os.path.join(BACKEND_DIR, "models")
+
+
+def _percentiles(samples: list[float]) -> str:
+    p50, p99 = np.percentile(np.array(samples) * 1e6, [50, 99])
+    return f"p50={p50:8.1f}µs  p99={p99:8.1f}µs"
+
+
+def _time_calls(fn, rows: list[dict]) -> tuple[list, list[float]]:
+    outputs, timings = [], []
+    for row in rows:
+        start = time.perf_counter()
+        outputs.append(fn(row))
+        timings.append(time.perf_counter() - start)
+    return outputs, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500, help="number of dataset rows to replay")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", category=UserWarning)
+    df = pd.read_csv(DATA_PATH).sample(args.rows, random_state=0)
+    rows = df.drop(columns=["Crop"]).to_dict("records")
+
+    # Untouched copies of the artifacts for the original DataFrame path
+    crop_model    = joblib.load(os.path.join(MODELS_DIR, "crop_model.pkl"))
+    crop_encoders = joblib.load(os.path.join(MODELS_DIR, "encoders.pkl"))
+    crop_labels   = joblib.load(os.path.join(MODELS_DIR, "crop_encoder.pkl"))
+    yield_model   = joblib.load(os.path.join(MODELS_DIR, "yield_model.pkl"))
+    yield_encs    = joblib.load(os.path.join(MODELS_DIR, "yield_encoders.pkl"))
+
+    def crop_dataframe(data: dict) -> str:
+        frame = pd.DataFrame([data])[prediction.FEATURE_ORDER]
+        for col in prediction.CATEGORICAL_COLUMNS:
+            frame[col] = crop_encoders[col].transform(frame[col])
+        return str(crop_labels.inverse_transform([crop_model.predict(frame)[0]])[0])
+
+    def yield_dataframe(data: dict) -> float:
+        frame = pd.DataFrame([{**data, "Crop": "Wheat"}])[yield_predictor.FEATURE_COLUMNS]
+        for col in yield_predictor.CATEGORICAL_COLUMNS:
+            frame[col] = yield_encs[col].transform(frame[col].astype(str))
+        return round(float(yield_model.predict(frame)[0]), 3)
+
+    cases = [
+        ("predict_crop",  crop_dataframe,  prediction.predict_crop),
+        ("predict_yield", yield_dataframe, lambda d: yield_predictor.predict_yield(d, crop_name="Wheat")),
+    ]
+
+    print(f"Replaying {len(rows)} rows from {os.path.basename(DATA_PATH)}\n")
+    for name, before_fn, after_fn in cases:
+        # Warm up both paths once before timing
+        before_fn(rows[0])
+        after_fn(rows[0])
+
+        before, before_t = _time_calls(before_fn, rows)
+        after,  after_t  = _time_calls(after_fn, rows)
+        mismatches = sum(1 for a, b in zip(before, after) if a != b)
+
+        print(f"{name}")
+        print(f"   DataFrame path : {_percentiles(before_t)}")
+        print(f"   NumPy path     : {_percentiles(after_t)}")
+        print(f"   parity         : {len(rows) - mismatches}/{len(rows)} identical")
+        if mismatches:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
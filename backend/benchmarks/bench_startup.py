@@ -0,0 +1,108 @@
+"""
+Cold-start benchmark: how long a fresh worker takes to import main.py and to
+serve its first prediction, for each MODEL_LOADING mode.
+
+Every run is a new interpreter started with `python -X importtime`, so
+imports are measured exactly as uvicorn sees them (bytecode already cached).
+For each mode it prints the median wall time of `import main`, the time until
+both models are loaded (the first predict_crop / predict_yield calls, which
+load them on demand in the lazy modes), and the heaviest imports by
+cumulative time as reported by -X importtime. (MODEL_LOADING=background
+times like lazy here: its warm-up thread starts in the app's lifespan.)
+
+Usage (from backend/):
+    python benchmarks/bench_startup.py [--runs 5] [--modes eager lazy] [--top 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child interpreter; prints one JSON line with the timings
+CHILD = """
+import json, sys, time, warnings
+warnings.simplefilter("ignore")
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+heavy = {m: m in sys.modules for m in ("pandas", "sklearn", "joblib")}
+from services.prediction import predict_crop
+from services.registry import SMOKE_FARMS
+from services.yield_predictor import predict_yield
+predict_crop(SMOKE_FARMS[0])
+predict_yield(SMOKE_FARMS[0], "Rice")
+served = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - start,
+    "first_prediction_s": served - start,
+    "heavy": heavy,
+}))
+"""
+
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """
+    -X importtime lines up to the end of `import main` → {module: cumulative µs}.
+    Imports done later by the first predictions are left out.
+    """
+    cumulative: dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        if not cum.strip().isdigit():
+            continue  # header line
+        name = name.strip()
+        cumulative[name] = int(cum)
+        if name == "main":
+            break
+    return cumulative
+
+
+def run_once(mode: str) -> tuple[dict, dict[str, int]]:
+    env = {**os.environ, "MODEL_LOADING": mode, "MODEL_WATCH_INTERVAL": "0"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1]), parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", default=["eager", "lazy"])
+    parser.add_argument("--top", type=int, default=10, help="heaviest imports to list per mode")
+    args = parser.parse_args()
+
+    run_once(args.modes[0])  # warm the bytecode and page caches
+    for mode in args.modes:
+        timings, imports = [], []
+        for _ in range(args.runs):
+            result, cumulative = run_once(mode)
+            timings.append(result)
+            imports.append(cumulative)
+
+        import_ms = statistics.median(t["import_s"] for t in timings) * 1000
+        first_ms  = statistics.median(t["first_prediction_s"] for t in timings) * 1000
+        heavy = [name for name, loaded in timings[-1]["heavy"].items() if loaded]
+        print(f"{mode:10}  import main {import_ms:7.1f} ms  "
+              f"first prediction {first_ms:7.1f} ms  "
+              f"heavy modules after import: {', '.join(heavy) or 'none'}")
+
+        # Nested modules are listed too; a parent's time includes its children
+        modules = imports[-1]
+        top = sorted(modules, key=lambda m: statistics.median(c.get(m, 0) for c in imports), reverse=True)
+        for name in top[:args.top]:
+            median_ms = statistics.median(c.get(name, 0) for c in imports) / 1000
+            print(f"    {median_ms:7.1f} ms  {name}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Bulk farm-plan benchmark: POST /generate-farm-plan/stream vs one
+POST /generate-farm-plan per farm, both in-process through TestClient.
+
+Farms are sampled from dataset/farm_resource_dataset.csv (resources derived
+as in bench_suite.py), with a few malformed rows mixed in. Checks that every
+streamed plan — sent as NDJSON and as CSV — is identical to the per-farm
+endpoint's response (and that malformed rows fail in both), then prints
+farms per second for each path.
+
+Usage (from backend/):
+    python benchmarks/bench_stream.py [--farms 2000] [--loop-limit 2000]
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+import warnings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("MODEL_WATCH_INTERVAL", "0")
+warnings.filterwarnings("ignore")
+
+from bench_suite import farm_fields, resources, sample_farms  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main as app_module  # noqa: E402
+
+# Rows that must come back as per-row errors
+BAD_ROWS = {
+    5:  {"Soil_Type": "Moon"},             # unknown category
+    17: {"Soil_pH": "acidic"},             # not a number
+    29: {"land_area": None},               # missing resource
+}
+
+
+def plan_requests(n: int) -> list[dict]:
+    requests = [{**farm_fields(r), **resources(r)} for r in sample_farms(n, seed=0)]
+    for i, override in BAD_ROWS.items():
+        if i < n:
+            requests[i] = {**requests[i], **override}
+    return requests
+
+
+def to_csv(requests: list[dict]) -> str:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(requests[0]))
+    writer.writeheader()
+    writer.writerows({k: "" if v is None else v for k, v in r.items()} for r in requests)
+    return out.getvalue()
+
+
+def stream(client: TestClient, body: str, content_type: str) -> tuple[list[dict], dict, float]:
+    start = time.perf_counter()
+    response = client.post("/generate-farm-plan/stream", content=body, headers={"Content-Type": content_type})
+    elapsed = time.perf_counter() - start
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    return lines[:-1], lines[-1]["summary"], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--farms", type=int, default=2000)
+    parser.add_argument("--loop-limit", type=int, default=2000,
+                        help="compare against per-farm requests for at most this many farms")
+    args = parser.parse_args()
+
+    requests = plan_requests(args.farms)
+    failed = False
+    with TestClient(app_module.app) as client:
+        ndjson_results, summary, ndjson_s = stream(
+            client, "".join(json.dumps(r) + "\n" for r in requests), "application/x-ndjson"
+        )
+        csv_results, _, csv_s = stream(client, to_csv(requests), "text/csv")
+        print(f"stream ndjson {args.farms:6d} farms  {ndjson_s*1000:9.1f} ms  ({args.farms/ndjson_s:8.0f} farms/s)"
+              f"  failed rows: {summary['failed']}")
+        print(f"stream csv    {args.farms:6d} farms  {csv_s*1000:9.1f} ms  ({args.farms/csv_s:8.0f} farms/s)")
+
+        n = min(args.farms, args.loop_limit)
+        start = time.perf_counter()
+        single = [client.post("/generate-farm-plan", json=r) for r in requests[:n]]
+        loop_s = time.perf_counter() - start
+        print(f"per-farm      {n:6d} farms  {loop_s*1000:9.1f} ms  ({n/loop_s:8.0f} farms/s)\n")
+
+    for label, results in (("ndjson", ndjson_results), ("csv", csv_results)):
+        mismatches = 0
+        for i, response in enumerate(single):
+            streamed = {k: v for k, v in results[i].items() if k != "row"}
+            if results[i]["row"] != i + 1:
+                mismatches += 1
+            elif response.status_code == 200:
+                mismatches += streamed != response.json()
+            else:
+                mismatches += "error" not in streamed
+        status = "✅" if mismatches == 0 else "❌"
+        print(f"{status} {label:6} parity: {n - mismatches}/{n} rows identical to /generate-farm-plan")
+        failed = failed or mismatches > 0 or len(results) != len(requests)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
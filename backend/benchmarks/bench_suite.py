@@ -0,0 +1,310 @@
+"""
+End-to-end benchmark suite: every API endpoint (driven in-process through
+httpx's ASGI transport, including the app lifespan) and the core service
+functions called directly, on payloads sampled from
+dataset/farm_resource_dataset.csv with a fixed seed.
+
+For each target it reports throughput and p50 / p95 / p99 / mean latency,
+and with --json writes them together with the commit, library versions and
+settings, so that runs can be compared across commits:
+
+    python benchmarks/bench_suite.py --json before.json
+    git checkout <other commit>
+    python benchmarks/bench_suite.py --compare before.json
+
+--compare prints the change per target and exits with status 1 if any p50,
+p95 or throughput moved more than --threshold (default 10%) in the wrong
+direction.
+
+Prediction caches and the optimizer memo are disabled unless --cache is
+given, so every call pays for model inference and LP solving. Payload
+resources come from each farm's own row: land = Farm_Area_acres, water =
+a 16-week season of Water_Availability_L_per_week, fertilizer = 4× the
+recorded Fertilizer_Used_kg; candidate crops are main.RELATED_CROPS of the
+row's crop. Yield targets use the row's crop when the yield model prices it
+(MARKET_PRICE), otherwise its first candidate crop.
+
+Usage (from backend/):
+    python benchmarks/bench_suite.py [--requests 500] [--concurrency 1]
+        [--only predict optimize] [--cache] [--json out.json] [--compare base.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+DATA_PATH = os.path.join(BACKEND_DIR, "dataset", "farm_resource_dataset.csv")
+FARM_COLUMNS = [
+    "Soil_Type", "Farm_Area_acres", "Water_Availability_L_per_week", "Irrigation_Type",
+    "Fertilizer_Used_kg", "Season", "Rainfall_mm", "Temperature_C", "Soil_pH",
+]
+SEASON_WEEKS = 16
+BATCH_SIZE = 32
+WARMUP_CALLS = 20
+
+
+# ─── Payloads ──────────────────────────────────────────────────────────────────
+
+def sample_farms(n: int, seed: int) -> list[dict[str, Any]]:
+    """n dataset rows as plain Python dicts (farm conditions plus "Crop")."""
+    df = pd.read_csv(DATA_PATH).sample(n, random_state=seed, replace=n > 50000)
+    return json.loads(df.to_json(orient="records"))
+
+
+def farm_fields(row: dict) -> dict:
+    return {col: row[col] for col in FARM_COLUMNS}
+
+
+def resources(row: dict) -> dict:
+    return {
+        "land_area":            row["Farm_Area_acres"],
+        "water_available":      row["Water_Availability_L_per_week"] * SEASON_WEEKS,
+        "fertilizer_available": row["Fertilizer_Used_kg"] * 4,
+    }
+
+
+def endpoint_payloads(rows: list[dict], related: dict, default_related: list) -> dict[str, tuple[str, list]]:
+    """{target name: (path, [json body per call])} for every POST endpoint."""
+    def candidates(row):
+        return related.get(row["Crop"], default_related)
+
+    batches = [rows[i:i + BATCH_SIZE] for i in range(0, len(rows) - BATCH_SIZE + 1, BATCH_SIZE)] or [rows]
+    return {
+        "POST /predict-crop": ("/predict-crop", [farm_fields(r) for r in rows]),
+        "POST /predict-crop-batch": ("/predict-crop-batch", [
+            {"farms": [farm_fields(r) for r in batch]} for batch in batches
+        ]),
+        "POST /predict-yield": ("/predict-yield", [
+            {**farm_fields(r), "crop_name": r["Yield_Crop"], "acres": r["Farm_Area_acres"]} for r in rows
+        ]),
+        "POST /optimize-allocation": ("/optimize-allocation", [
+            {**farm_fields(r), **resources(r), "candidate_crops": candidates(r)} for r in rows
+        ]),
+        "POST /optimize-allocation-batch": ("/optimize-allocation-batch", [
+            {
+                "land_area":            [resources(r)["land_area"] for r in batch],
+                "water_available":      [resources(r)["water_available"] for r in batch],
+                "fertilizer_available": [resources(r)["fertilizer_available"] for r in batch],
+                "candidate_crops":      [candidates(r) for r in batch],
+            }
+            for batch in batches
+        ]),
+        "POST /generate-farm-plan": ("/generate-farm-plan", [
+            {**farm_fields(r), **resources(r)} for r in rows
+        ]),
+    }
+
+
+# ─── Measurement ───────────────────────────────────────────────────────────────
+
+def summarize(latencies: list[float], elapsed: float, errors: int) -> dict[str, Any]:
+    ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "calls":          len(latencies),
+        "errors":         errors,
+        "throughput_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms":         round(float(p50), 4),
+        "p95_ms":         round(float(p95), 4),
+        "p99_ms":         round(float(p99), 4),
+        "mean_ms":        round(float(ms.mean()), 4),
+    }
+
+
+def bench_function(fn: Callable, args_list: list[tuple]) -> dict[str, Any]:
+    for args in args_list[:WARMUP_CALLS]:
+        fn(*args)
+    latencies = []
+    start = time.perf_counter()
+    for args in args_list:
+        t0 = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - start, errors=0)
+
+
+async def bench_endpoint(client, path: str, bodies: list, concurrency: int) -> dict[str, Any]:
+    for body in bodies[:WARMUP_CALLS]:
+        await client.post(path, json=body)
+
+    latencies: list[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < len(bodies):
+            body = bodies[next_index]
+            next_index += 1
+            t0 = time.perf_counter()
+            response = await client.post(path, json=body)
+            latencies.append(time.perf_counter() - t0)
+            errors += response.status_code >= 400
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+async def run_endpoints(app, lifespan, targets: dict, concurrency: int) -> dict[str, dict]:
+    import httpx
+
+    results = {}
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, (path, bodies) in targets.items():
+                results[name] = await bench_endpoint(client, path, bodies, concurrency)
+                print_result(name, results[name])
+    return results
+
+
+def print_result(name: str, r: dict) -> None:
+    errors = f"  errors={r['errors']}" if r["errors"] else ""
+    print(f"{name:34} {r['throughput_per_s']:9.1f}/s  p50 {r['p50_ms']:8.3f} ms  "
+          f"p95 {r['p95_ms']:8.3f} ms  p99 {r['p99_ms']:8.3f} ms{errors}", flush=True)
+
+
+# ─── Metadata / comparison ─────────────────────────────────────────────────────
+
+def run_metadata(args) -> dict[str, Any]:
+    import fastapi
+    import sklearn
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit":    commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python":    platform.python_version(),
+        "platform":  platform.platform(),
+        "versions":  {"numpy": np.__version__, "pandas": pd.__version__,
+                      "scikit-learn": sklearn.__version__, "fastapi": fastapi.__version__},
+        "settings":  run_settings(args),
+    }
+
+
+def run_settings(args) -> dict[str, Any]:
+    return {"requests": args.requests, "concurrency": args.concurrency,
+            "seed": args.seed, "cache": args.cache}
+
+
+def compare(results: dict, settings: dict, baseline_path: str, threshold: float) -> bool:
+    """Prints changes vs a previous --json run; True if any target regressed."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nChange vs {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    if baseline["meta"].get("settings") != settings:
+        print(f"  ⚠️  settings differ: baseline {baseline['meta'].get('settings')}, now {settings}")
+    regressed = False
+    for name, new in results.items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"  {name:34} (not in baseline)")
+            continue
+        changes = {
+            "p50":        new["p50_ms"] / old["p50_ms"] - 1,
+            "p95":        new["p95_ms"] / old["p95_ms"] - 1,
+            "throughput": old["throughput_per_s"] / new["throughput_per_s"] - 1,  # >0 = slower
+        }
+        worse = [metric for metric, change in changes.items() if change > threshold]
+        regressed = regressed or bool(worse)
+        flag = f"  ❌ regressed: {', '.join(worse)}" if worse else ""
+        print(f"  {name:34} p50 {changes['p50']:+7.1%}  p95 {changes['p95']:+7.1%}  "
+              f"throughput {-changes['throughput']:+7.1%}{flag}")
+    return regressed
+
+
+# ─── Main ──────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="calls per target")
+    parser.add_argument("--concurrency", type=int, default=1, help="in-flight requests per endpoint")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", help="run targets whose name contains any of these")
+    parser.add_argument("--cache", action="store_true", help="keep prediction caches and the optimizer memo")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="previous --json output to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    if not args.cache:
+        os.environ["PREDICTION_CACHE_SIZE"] = "0"
+        os.environ["OPTIMIZER_MEMO_SIZE"] = "0"
+    os.environ.setdefault("MODEL_WATCH_INTERVAL", "0")
+    warnings.filterwarnings("ignore")
+
+    import main as app_module
+    from services.optimizer import optimize_allocation
+    from services.prediction import predict_crop
+    from services.preprocessor import safe_preprocess
+    from services.yield_predictor import MARKET_PRICE, predict_yield
+
+    rows = sample_farms(args.requests, args.seed)
+    farms = [safe_preprocess(farm_fields(r)) for r in rows]
+    candidates = [app_module.RELATED_CROPS.get(r["Crop"], app_module.DEFAULT_RELATED) for r in rows]
+    for r, crops in zip(rows, candidates):
+        r["Yield_Crop"] = r["Crop"] if r["Crop"] in MARKET_PRICE else crops[0]
+    allocations = [
+        optimize_allocation(*resources(r).values(), crops)["allocation"]
+        for r, crops in zip(rows, candidates)
+    ]
+
+    functions = {
+        "predict_crop":        (predict_crop, [(farm,) for farm in farms]),
+        "predict_yield":       (predict_yield, [(farm, r["Yield_Crop"]) for farm, r in zip(farms, rows)]),
+        "optimize_allocation": (optimize_allocation, [
+            (*resources(r).values(), crops) for r, crops in zip(rows, candidates)
+        ]),
+        "enrich_allocation":   (app_module.enrich_allocation, list(zip(allocations, farms))),
+    }
+    endpoints = endpoint_payloads(rows, app_module.RELATED_CROPS, app_module.DEFAULT_RELATED)
+
+    def selected(name: str) -> bool:
+        return not args.only or any(part in name for part in args.only)
+
+    print(f"{args.requests} calls per target, concurrency {args.concurrency}, "
+          f"caches {'on' if args.cache else 'off'}\n")
+    results: dict[str, dict] = {}
+    for name, (fn, args_list) in functions.items():
+        if selected(name):
+            results[name] = bench_function(fn, args_list)
+            print_result(name, results[name])
+
+    targets = {name: target for name, target in endpoints.items() if selected(name)}
+    if targets:
+        results.update(asyncio.run(
+            run_endpoints(app_module.app, app_module.lifespan, targets, args.concurrency)
+        ))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"meta": run_metadata(args), "results": results}, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+    if args.compare and compare(results, run_settings(args), args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
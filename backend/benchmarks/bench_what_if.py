@@ -0,0 +1,119 @@
+"""
+What-if benchmark: one POST /what-if sweep vs evaluating each grid cell
+separately with enrich_allocation (one model call per point), prediction
+cache disabled.
+
+Farms are sampled from dataset/farm_resource_dataset.csv and swept over
+rainfall × temperature for every crop with a market price. Checks that every
+cell — expected yield, adjusted yield, profit and risk level — is identical
+to enrich_allocation({crop: acres}, conditions at that point), and exits 1
+if not. Then prints sweeps per second for the endpoint (through TestClient),
+what_if_sweep itself and the per-cell loop.
+
+Usage (from backend/):
+    python benchmarks/bench_what_if.py [--farms 5] [--steps 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ["PREDICTION_CACHE_SIZE"] = "0"
+os.environ.setdefault("MODEL_WATCH_INTERVAL", "0")
+warnings.filterwarnings("ignore")
+
+from bench_suite import farm_fields, sample_farms  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main as app_module  # noqa: E402
+from services.preprocessor import safe_preprocess  # noqa: E402
+from services.yield_predictor import MARKET_PRICE  # noqa: E402
+
+CROPS = list(MARKET_PRICE)
+FIELDS = ("expected_yield", "adjusted_yield", "risk_level")
+
+
+def sweep_axes(steps: int) -> list[dict]:
+    return [
+        {"feature": "Rainfall_mm",   "start": 200, "stop": 1200, "steps": steps},
+        {"feature": "Temperature_C", "start": 10,  "stop": 40,   "steps": steps},
+    ]
+
+
+def per_cell(conditions: dict, axes: list[tuple[str, list[float]]], acres: float) -> dict:
+    """The sweep computed one point at a time through enrich_allocation."""
+    results = {crop: {field: [] for field in FIELDS + ("profit",)} for crop in CROPS}
+    for first in axes[0][1]:
+        rows = {crop: {field: [] for field in FIELDS + ("profit",)} for crop in CROPS}
+        for second in axes[1][1]:
+            point = {**conditions, axes[0][0]: first, axes[1][0]: second}
+            enriched = app_module.enrich_allocation({crop: acres for crop in CROPS}, point)
+            for crop in CROPS:
+                for field in FIELDS:
+                    rows[crop][field].append(enriched[crop][field])
+                rows[crop]["profit"].append(enriched[crop]["expected_profit"])
+        for crop in CROPS:
+            for field, values in rows[crop].items():
+                results[crop][field].append(values)
+    return results
+
+
+def rate(fn, calls: int) -> float:
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--farms", type=int, default=5)
+    parser.add_argument("--steps", type=int, default=10, help="values per sweep axis")
+    args = parser.parse_args()
+
+    farms = [farm_fields(row) for row in sample_farms(args.farms, seed=0)]
+    cells = args.steps ** 2 * len(CROPS)
+    failed = False
+
+    with TestClient(app_module.app) as client:
+        for i, farm in enumerate(farms):
+            conditions = safe_preprocess(dict(farm))
+            acres = conditions["Farm_Area_acres"]
+            axes = [(axis["feature"], app_module.sweep_values(app_module.SweepAxis(**axis)))
+                    for axis in sweep_axes(args.steps)]
+
+            response = client.post("/what-if", json={**farm, "crops": CROPS, "axes": sweep_axes(args.steps)})
+            swept = response.json()["results"] if response.status_code == 200 else None
+            same = swept == per_cell(conditions, axes, acres)
+            print(f"{'✅' if same else '❌'} farm {i}: {cells} cells "
+                  f"{'identical to enrich_allocation' if same else 'DIFFER'}")
+            failed = failed or not same
+
+        farm = farms[0]
+        conditions = safe_preprocess(dict(farm))
+        acres = conditions["Farm_Area_acres"]
+        body = {**farm, "crops": CROPS, "axes": sweep_axes(args.steps)}
+        axes = [(axis["feature"], app_module.sweep_values(app_module.SweepAxis(**axis)))
+                for axis in sweep_axes(args.steps)]
+
+        endpoint = rate(lambda: client.post("/what-if", json=body), 20)
+        batched = rate(lambda: app_module.what_if_sweep(conditions, CROPS, acres, axes), 20)
+        looped = rate(lambda: per_cell(conditions, axes, acres), 2)
+
+    print(f"\n{args.steps}×{args.steps} sweep × {len(CROPS)} crops = {cells} cells")
+    print(f"  POST /what-if        {endpoint:8.1f} sweeps/s  ({endpoint * cells:9.0f} cells/s)")
+    print(f"  what_if_sweep        {batched:8.1f} sweeps/s  ({batched * cells:9.0f} cells/s)")
+    print(f"  per-cell loop        {looped:8.1f} sweeps/s  ({looped * cells:9.0f} cells/s)"
+          f"   → batched is {batched / looped:.0f}x faster")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Yield grid benchmark: predict_yield from the forest vs from the precomputed
+grid (build_grid.py, served with YIELD_GRID=1), prediction cache disabled.
+
+Replays held-out rows from dataset/agriculture_dataset.csv through
+predict_yield with the grid on and off, and prints p50/p99 latency and the
+served difference. Also checks that rows outside the grid fall back to the
+forest with identical results, and that with the prediction cache on,
+predict_yield (grid) and predict_yields_for_crops (forest) each return
+their own values whichever is called first; exits 1 if not.
+
+Usage (from backend/):
+    python build_grid.py                       # once, after training
+    python benchmarks/bench_yield_grid.py [--rows 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ["YIELD_GRID"] = "1"
+os.environ["PREDICTION_CACHE_SIZE"] = "0"
+os.environ.setdefault("MODEL_WATCH_INTERVAL", "0")
+warnings.filterwarnings("ignore")
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import services.yield_predictor as yield_predictor  # noqa: E402
+from services.cache import PredictionCache  # noqa: E402
+from services.registry import registry  # noqa: E402
+from services.yield_predictor import _CONDITION_COLUMNS, predict_yield, predict_yields_for_crops  # noqa: E402
+
+DATA_PATH = os.path.join(BACKEND_DIR, "dataset", "agriculture_dataset.csv")
+
+
+def _percentiles(samples: list[float]) -> str:
+    p50, p99 = np.percentile(np.array(samples) * 1e6, [50, 99])
+    return f"p50={p50:8.1f}µs  p99={p99:8.1f}µs"
+
+
+def _replay(rows: list[dict]) -> tuple[np.ndarray, list[float]]:
+    outputs, timings = [], []
+    for row in rows:
+        start = time.perf_counter()
+        outputs.append(predict_yield(row, row["Crop"]))
+        timings.append(time.perf_counter() - start)
+    return np.array(outputs), timings
+
+
+def check_cache_paths(rows: list[dict], grid_values: np.ndarray, forest_values: np.ndarray) -> bool:
+    """Both call orders against a fresh, enabled cache give each path its own values."""
+    original = yield_predictor._cache
+    ok = True
+    try:
+        for grid_first in (True, False):
+            yield_predictor._cache = PredictionCache("predict_yield_check", maxsize=len(rows) * 2)
+            calls = [
+                lambda row: predict_yield(row, row["Crop"]),
+                lambda row: predict_yields_for_crops(row, [row["Crop"]])[row["Crop"]],
+            ]
+            order = calls if grid_first else calls[::-1]
+            first = np.array([order[0](row) for row in rows])
+            second = np.array([order[1](row) for row in rows])
+            served, forest = (first, second) if grid_first else (second, first)
+            ok = ok and np.array_equal(served, grid_values) and np.array_equal(forest, forest_values)
+    finally:
+        yield_predictor._cache = original
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    bundle = registry.get("yield")
+    if bundle.grid is None:
+        print("❌ No current yield grid — run `python build_grid.py` first")
+        sys.exit(1)
+    grid = bundle.grid
+
+    data = pd.read_csv(DATA_PATH).sample(n=args.rows, random_state=0)
+    rows = data[_CONDITION_COLUMNS + ["Crop"]].to_dict("records")
+    # Out-of-grid copies: water and rainfall beyond the grid's upper bounds
+    outside = [
+        {**row,
+         "Water_Availability_L_per_week": float(grid.axes[grid.numeric_columns.index("Water_Availability_L_per_week")][-1]) * 2,
+         "Rainfall_mm": float(grid.axes[grid.numeric_columns.index("Rainfall_mm")][-1]) + 100}
+        for row in rows[:200]
+    ]
+
+    served, grid_times = _replay(rows)
+    fallback, _ = _replay(outside)
+    bundle.grid = None
+    try:
+        forest, forest_times = _replay(rows)
+        forest_outside, _ = _replay(outside)
+    finally:
+        bundle.grid = grid
+
+    diff = np.abs(served - forest)
+    print(f"predict_yield  forest {_percentiles(forest_times)}")
+    print(f"predict_yield  grid   {_percentiles(grid_times)}  "
+          f"({np.median(forest_times) / np.median(grid_times):.1f}x faster at p50)")
+    print(f"grid size {grid.nbytes / 2**20:.1f} MB; |grid - forest| on {len(rows)} rows: "
+          f"mean {diff.mean():.4f}  p95 {np.percentile(diff, 95):.4f}  max {diff.max():.4f} ton/acre")
+
+    ok = np.array_equal(fallback, forest_outside)
+    print(f"{'✅' if ok else '❌'} out-of-grid rows fall back to the forest "
+          f"({len(outside)} rows {'identical' if ok else 'DIFFER'})")
+
+    cached_ok = check_cache_paths(rows[:200], served[:200], forest[:200])
+    print(f"{'✅' if cached_ok else '❌'} cached grid and forest values stay separate in either call order")
+    if not (ok and cached_ok):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Precomputes the yield model on a grid (services/yield_grid.py) so that
+/predict-yield can interpolate instead of running the forest (YIELD_GRID=1).
+
+Numeric axes span the training data's range, with --points grid points
+each (defaults below; more points → larger artifact, closer to the model).
+The accuracy report compares the interpolated yield, rounded like
+predict_yield, with the model:
+  - on the held-out split (in-grid rows only), also against the true yields
+  - on --samples random in-range points with random categories
+It is printed and saved in the grid's meta.json.
+
+Usage (from backend/):
+    python build_grid.py [--points Rainfall_mm=12 Temperature_C=8 ...] [--samples 20000]
+"""
+
+import argparse
+import os
+import time
+
+# The yield model is loaded explicitly below
+os.environ.setdefault("MODEL_LOADING", "lazy")
+
+import numpy as np
+
+from compile_models import HELD_OUT
+from services.dataset_cache import load_dataset
+from services.yield_grid import YieldGrid, evaluate_grid, grid_points, save_grid
+from services.yield_predictor import (
+    CATEGORICAL_COLUMNS,
+    FEATURE_COLUMNS,
+    GRID_PATH,
+    MODEL_PATH,
+    load_yield_model,
+)
+from train_chunked import SPECS
+
+NUMERIC_COLUMNS = [col for col in FEATURE_COLUMNS if col not in CATEGORICAL_COLUMNS]
+
+# Grid points per numeric feature: more where the model's output varies most
+DEFAULT_POINTS = {
+    "Farm_Area_acres":               3,
+    "Water_Availability_L_per_week": 3,
+    "Fertilizer_Used_kg":            6,
+    "Rainfall_mm":                   8,
+    "Temperature_C":                 6,
+    "Soil_pH":                       3,
+}
+
+
+def parse_points(pairs: list[str]) -> dict[str, int]:
+    points = dict(DEFAULT_POINTS)
+    for pair in pairs:
+        col, _, count = pair.partition("=")
+        if col not in points or not count.isdigit():
+            raise SystemExit(f"--points expects COLUMN=N with COLUMN in {NUMERIC_COLUMNS}, got '{pair}'")
+        points[col] = int(count)
+    return points
+
+
+def error_stats(predicted: np.ndarray, expected: np.ndarray) -> dict[str, float]:
+    error = np.abs(predicted - expected)
+    return {
+        "mae": round(float(error.mean()), 4),
+        "p95": round(float(np.percentile(error, 95)), 4),
+        "max": round(float(error.max()), 4),
+    }
+
+
+def interpolate(grid, X: np.ndarray) -> np.ndarray:
+    """Served values (3 d.p.) for rows known to be in-grid."""
+    return np.array([round(grid.predict_row(row), 3) for row in X])
+
+
+def accuracy_report(grid, bundle, samples: int) -> dict:
+    X_test, y_test = HELD_OUT["yield"]()
+    in_grid = np.array([grid.predict_row(row) is not None for row in X_test])
+    X_in, y_in = X_test[in_grid], y_test[in_grid]
+    model = np.round(bundle.estimator.predict(X_in), 3)
+    served = interpolate(grid, X_in)
+
+    rng = np.random.default_rng(0)
+    X_rand = np.zeros((samples, len(FEATURE_COLUMNS)))
+    for col in CATEGORICAL_COLUMNS:
+        X_rand[:, FEATURE_COLUMNS.index(col)] = rng.integers(len(bundle.lookups[col].classes), size=samples)
+    for col, axis in zip(grid.numeric_columns, grid.axes):
+        X_rand[:, FEATURE_COLUMNS.index(col)] = rng.uniform(axis[0], axis[-1], size=samples)
+
+    return {
+        "held_out_rows":     int(len(X_test)),
+        "held_out_in_grid":  int(in_grid.sum()),
+        "held_out_vs_model": error_stats(served, model),
+        "held_out_mae_true": {
+            "model": round(float(np.abs(model - y_in).mean()), 4),
+            "grid":  round(float(np.abs(served - y_in).mean()), 4),
+        },
+        "random_points":     samples,
+        "random_vs_model":   error_stats(interpolate(grid, X_rand), np.round(bundle.estimator.predict(X_rand), 3)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", nargs="*", default=[], metavar="COLUMN=N", help="grid points per numeric feature")
+    parser.add_argument("--samples", type=int, default=20000, help="random points for the accuracy report")
+    args = parser.parse_args()
+    points = parse_points(args.points)
+
+    bundle = load_yield_model()
+    data = load_dataset(SPECS["yield"]["data"])
+    axes = {col: grid_points(float(data[col].min()), float(data[col].max()), points[col]) for col in NUMERIC_COLUMNS}
+    categories = bundle.categories()
+
+    n_combos = int(np.prod([len(classes) for classes in categories.values()]))
+    n_points = int(np.prod(list(points.values())))
+    print(f"\n🧮 Yield grid: {n_combos} categorical combinations × {n_points} numeric points "
+          f"= {n_combos * n_points} model evaluations")
+    start = time.perf_counter()
+    values = evaluate_grid(bundle.estimator, FEATURE_COLUMNS, categories, axes)
+    print(f"   evaluated in {time.perf_counter() - start:.1f} s → {values.nbytes / 2**20:.1f} MB float32")
+
+    grid = YieldGrid(list(categories), list(axes), axes, values, FEATURE_COLUMNS)
+    report = accuracy_report(grid, bundle, args.samples)
+    save_grid(GRID_PATH, values, categories, axes, MODEL_PATH, report=report)
+
+    held, rand = report["held_out_vs_model"], report["random_vs_model"]
+    print(f"✅ Saved → {GRID_PATH}/")
+    print(f"\n[Accuracy vs the model, ton/acre (served values, 3 d.p.)]")
+    print(f"   held-out ({report['held_out_in_grid']}/{report['held_out_rows']} in grid): "
+          f"MAE {held['mae']:.4f}  p95 {held['p95']:.4f}  max {held['max']:.4f}")
+    print(f"   random in-range ({args.samples}):  "
+          f"MAE {rand['mae']:.4f}  p95 {rand['p95']:.4f}  max {rand['max']:.4f}")
+    print(f"   MAE vs true yields on held-out: model {report['held_out_mae_true']['model']:.4f}, "
+          f"grid {report['held_out_mae_true']['grid']:.4f}")
+    print("\n   Serve it with YIELD_GRID=1 (workers pick up a rebuilt grid automatically).\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import argparse
+import copy
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, mean_absolute_error
+from sklearn.model_selection import train_test_split
+
+from services.forest import compile_forest, load_forest, prune_forest, save_forest
+
+# ─── Paths ─────────────────────────────────────────────────────────────────────
+BASE_DIR   = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, "models")
+DATA_DIR   = os.path.join(BASE_DIR, "dataset")
+
+# (sklearn model, compiled forest) pairs, as loaded by the services
+ARTIFACTS = {
+    "crop":  ("crop_model.pkl",  "crop_forest"),
+    "yield": ("yield_model.pkl", "yield_forest"),
+}
+
+
+# ─── Held-out splits (same preprocessing and split as the training scripts) ────
+
+def _crop_test_split() -> tuple[np.ndarray, np.ndarray]:
+    from services.prediction import FEATURE_ORDER, CATEGORICAL_COLUMNS
+
+    data = pd.read_csv(os.path.join(DATA_DIR, "farm_resource_dataset.csv"))
+    data.columns = [col.strip() for col in data.columns]
+    encoders = joblib.load(os.path.join(MODELS_DIR, "encoders.pkl"))
+    crop_encoder = joblib.load(os.path.join(MODELS_DIR, "crop_encoder.pkl"))
+
+    X = data[FEATURE_ORDER].copy()
+    for col in CATEGORICAL_COLUMNS:
+        X[col] = encoders[col].transform(X[col].astype(str).str.strip())
+    y = crop_encoder.transform(data["Crop"].str.strip())
+    _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    return X_test.to_numpy(dtype=np.float64), y_test
+
+
+def _yield_test_split() -> tuple[np.ndarray, np.ndarray]:
+    from services.yield_predictor import FEATURE_COLUMNS
+
+    data = pd.read_csv(os.path.join(DATA_DIR, "agriculture_dataset.csv"))
+    encoders = joblib.load(os.path.join(MODELS_DIR, "yield_encoders.pkl"))
+
+    X = data[FEATURE_COLUMNS].copy()
+    for col, le in encoders.items():
+        X[col] = le.transform(X[col].astype(str))
+    y = data["Crop_Yield_ton_per_acre"].to_numpy()
+    _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    return X_test.to_numpy(dtype=np.float64), y_test
+
+
+HELD_OUT = {"crop": _crop_test_split, "yield": _yield_test_split}
+
+
+# ─── Compile + verify ──────────────────────────────────────────────────────────
+
+def verify(name: str, model, forest) -> bool:
+    """
+    Checks exact parity between sklearn and the compiled forest on the
+    held-out split (against the same leading trees if it was truncated).
+    """
+    X_test, _ = HELD_OUT[name]()
+    model = truncated(model, forest.n_trees)
+    model.n_jobs = 1  # accumulate trees in order, as FlatForest does
+
+    start = time.perf_counter()
+    expected = model.predict(X_test)
+    sklearn_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = forest.predict(X_test)
+    flat_s = time.perf_counter() - start
+
+    # Small batches take a different traversal path; check those too
+    chunked = np.concatenate([forest.predict(X_test[i:i + 64]) for i in range(0, len(X_test), 64)])
+
+    ok = np.array_equal(expected, actual) and np.array_equal(expected, chunked)
+    if forest.kind == "classifier":
+        ok = ok and np.array_equal(model.predict_proba(X_test), forest.predict_proba(X_test))
+
+    status = "✅ exact parity" if ok else "❌ MISMATCH"
+    print(f"   {status} on {len(X_test)} held-out rows "
+          f"(sklearn {sklearn_s*1000:.1f} ms, flat {flat_s*1000:.1f} ms)")
+    return ok
+
+
+def truncated(model, n_trees: int):
+    """The model restricted to its first `n_trees` trees (the model itself if that is all of them)."""
+    if n_trees == len(model.estimators_):
+        return model
+    model = copy.copy(model)
+    model.estimators_ = model.estimators_[:n_trees]
+    model.n_estimators = n_trees
+    return model
+
+
+def export(model, quantize: bool, prune: bool, max_trees: int | None, max_kb: float | None):
+    """
+    Compiles a model with the export options. With `max_kb`, keeps the
+    most leading trees whose node arrays fit the budget.
+    """
+    forest = compile_forest(model, quantize=quantize)
+    if prune or max_trees is not None or max_kb is not None:
+        forest = prune_forest(forest, max_trees=max_trees)
+    if max_kb is not None and forest.nbytes > max_kb * 1024:
+        lo, hi = 1, forest.n_trees - 1   # largest tree count that fits, by bisection
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if prune_forest(forest, max_trees=mid).nbytes <= max_kb * 1024:
+                lo = mid
+            else:
+                hi = mid - 1
+        forest = prune_forest(forest, max_trees=lo)
+    return forest
+
+
+def _best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _dir_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def report(name: str, model, forest, model_path: str, forest_path: str) -> None:
+    """Prints held-out score, artifact size and load time: original pickle vs exported forest."""
+    X_test, y_test = HELD_OUT[name]()
+    metric, fn = ("accuracy", accuracy_score) if forest.kind == "classifier" else ("MAE", mean_absolute_error)
+    original = fn(y_test, model.predict(X_test))
+    exported = fn(y_test, forest.predict(X_test))
+
+    pkl_s = _best_of(lambda: joblib.load(model_path))
+    mmap_s = _best_of(lambda: load_forest(forest_path, source_path=model_path))
+    read_s = _best_of(lambda: load_forest(forest_path, source_path=model_path, mmap=False))
+    print(f"   {metric}: {original:.4f} → {exported:.4f} (Δ {exported - original:+.4f})")
+    print(f"   size: {os.path.getsize(model_path) / 2**20:.2f} MB pickle → "
+          f"{_dir_bytes(forest_path) / 2**20:.2f} MB compiled")
+    print(f"   load: {pkl_s * 1000:.1f} ms joblib → {mmap_s * 1000:.2f} ms mmap / {read_s * 1000:.2f} ms read")
+
+
+def compile_all(check: bool = True, quantize: bool = False, prune: bool = False,
+                max_trees: int | None = None, max_kb: float | None = None,
+                models: list[str] | None = None) -> bool:
+    ok = True
+    for name, (model_file, forest_file) in ARTIFACTS.items():
+        if models and name not in models:
+            continue
+        model_path  = os.path.join(MODELS_DIR, model_file)
+        forest_path = os.path.join(MODELS_DIR, forest_file)
+        if not os.path.exists(model_path):
+            print(f"⚠️  {model_file} not found — train it first. Skipping.")
+            continue
+
+        model = joblib.load(model_path)
+        if hasattr(model, "feature_names_in_"):
+            del model.feature_names_in_  # compare on plain arrays
+        forest = export(model, quantize, prune, max_trees, max_kb)
+        save_forest(forest, forest_path, source_path=model_path)
+
+        # Single-file .npz artifacts from earlier versions are no longer read
+        if os.path.exists(forest_path + ".npz"):
+            os.remove(forest_path + ".npz")
+        print(f"✅ {model_file} → {forest_file}/  "
+              f"({forest.n_trees} trees, {forest.n_nodes} nodes, depth {forest.max_depth})")
+
+        if check:
+            ok = verify(name, model, load_forest(forest_path, source_path=model_path)) and ok
+            report(name, model, forest, model_path, forest_path)
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the trained forests to memory-mappable NumPy arrays.")
+    parser.add_argument("models", nargs="*", help=f"models to compile: {', '.join(ARTIFACTS)} (default: all)")
+    parser.add_argument("--no-verify", action="store_true", help="skip the parity check and report")
+    parser.add_argument("--quantize", action="store_true",
+                        help="int16/int32/float32 node arrays and integer class counts (predictions unchanged)")
+    parser.add_argument("--prune", action="store_true",
+                        help="drop splits that can't change a prediction and leaf-only values (predictions unchanged)")
+    parser.add_argument("--max-trees", type=int, help="keep only the first N trees (changes predictions)")
+    parser.add_argument("--max-kb", type=float, help="keep as many leading trees as fit in this many KB")
+    args = parser.parse_args()
+    unknown = sorted(set(args.models) - set(ARTIFACTS))
+    if unknown:
+        parser.error(f"unknown model(s): {', '.join(unknown)}")
+    if not compile_all(check=not args.no_verify, quantize=args.quantize, prune=args.prune,
+                       max_trees=args.max_trees, max_kb=args.max_kb, models=args.models):
+        sys.exit(1)
@@ -1,8 +1,22 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Match
+from pydantic import BaseModel, Field, ValidationError
 import os
 
+import hmac
+import math
+import time
+
+from services import executor
+from services.bulk import DuplexStreamingResponse, iter_records, micro_batches, ndjson, stream_format
+from services.executor import ExecutorSaturated, executor_stats, run_in_process, run_in_thread
+from services.memory import memory_report
+from services.metrics import METRICS_ENABLED, REQUESTS, REQUEST_SECONDS, render_metrics, stage
+from services.registry import MODEL_LOADING, registry
+
 # Input Validation Schema
 class FarmInput(BaseModel):
     Soil_Type: str
@@ -15,11 +29,41 @@ class FarmInput(BaseModel):
     Temperature_C: float
     Soil_pH: float
 
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+
+def _warm_imports() -> None:
+    """Background warm-up, after the models: imports only the batch endpoint needs."""
+    import pandas  # noqa: F401
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # MODEL_LOADING=background: load the models off the startup path; /ready
+    # reports when they are hot
+    if MODEL_LOADING == "background":
+        registry.start_warm_up(then=_warm_imports)
+    # Per-worker memory: compiled forests are memory-mapped from models/, so
+    # their pages show up as shared once more than one worker maps them
+    mem = memory_report(MODELS_DIR)
+    if mem["available"]:
+        print(
+            f"🧠 Worker {mem['pid']}: RSS {mem['rss_mb']} MB "
+            f"(private {mem['private_mb']} MB, shared {mem['shared_mb']} MB); "
+            f"model artifacts mapped {mem['mapped_mb']} MB",
+            flush=True
+        )
+    # Pick up retrained model artifacts without a restart (MODEL_WATCH_INTERVAL)
+    registry.start_watcher()
+    yield
+    registry.stop_watcher()
+    # Stop the CPU worker pools so process workers don't outlive the server
+    executor.shutdown()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Farm Planner Backend",
     description="API for crop prediction and farm management",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS for production
@@ -32,9 +76,47 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Model-Version"],
 )
 
-from typing import List
+@app.middleware("http")
+async def model_version_header(request: Request, call_next):
+    """Reports the model versions active when the request started."""
+    version = registry.version_header()
+    response = await call_next(request)
+    response.headers["X-Model-Version"] = version
+    return response
+
+def _endpoint_label(request: Request) -> str:
+    """Route template (e.g. "/predict-crop") so metric labels stay bounded."""
+    route = request.scope.get("route")
+    if route is None:
+        route = next(
+            (r for r in request.app.router.routes if r.matches(request.scope)[0] == Match.FULL), None
+        )
+    return getattr(route, "path", "unmatched")
+
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    """Counts requests by endpoint/method/status and records their latency."""
+    if not METRICS_ENABLED:
+        return await call_next(request)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        endpoint = _endpoint_label(request)
+        REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint, method=request.method)
+        REQUESTS.inc(endpoint=endpoint, method=request.method, status=status)
+
+# Shared secret for /admin endpoints; they are disabled when unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+from itertools import product
+from typing import Any, Dict, List, Optional
 
 # Input schema for basic optimization (no farm conditions)
 class OptimizationInput(BaseModel):
@@ -43,18 +125,40 @@ class OptimizationInput(BaseModel):
     fertilizer_available: float
     candidate_crops: List[str]
 
-# Enriched optimization input — includes farm conditions for yield prediction
+# Input schema for portfolio-wide optimization: one entry per farm in each
+# resource array; candidate_crops holds one crop list per farm, or a single
+# list shared by every farm
+class OptimizationBatchInput(BaseModel):
+    land_area: List[float]
+    water_available: List[float]
+    fertilizer_available: List[float]
+    candidate_crops: List[List[str]]
+
+# Enriched optimization input — includes farm conditions for yield prediction.
+# advisory_ids_only returns advisory IDs (see /advisory-templates) instead of
+# rendered messages, to keep responses small.
 class EnrichedOptimizationInput(FarmInput):
     land_area: float
     water_available: float
     fertilizer_available: float
     candidate_crops: List[str]
+    advisory_ids_only: bool = False
 
 # Input schema for the combined farm plan endpoint
 class FarmPlanInput(FarmInput):
     land_area: float
     water_available: float
     fertilizer_available: float
+    advisory_ids_only: bool = False
+
+# Most farms accepted by one /predict-crop-batch request
+CROP_BATCH_MAX_ROWS = int(os.getenv("CROP_BATCH_MAX_ROWS", "1000"))
+
+# Input schema for batch crop prediction. Farms are plain dicts so that one
+# malformed row is reported per-row instead of rejecting the whole batch.
+class CropBatchInput(BaseModel):
+    farms: List[Dict[str, Any]] = Field(..., max_length=CROP_BATCH_MAX_ROWS)
+    include_probabilities: bool = False
 
 # Related crops map - for each predicted crop, 2 complementary crops are suggested
 RELATED_CROPS = {
@@ -72,11 +176,59 @@ class YieldInput(FarmInput):
     crop_name: str
     acres: float
 
-from services.prediction import predict_crop
-from services.optimizer import optimize_allocation
-from services.yield_predictor import predict_yield, calculate_profit
+# One /what-if sweep axis: a numeric farm condition and either explicit
+# values or `steps` evenly spaced values from start to stop
+class SweepAxis(BaseModel):
+    feature: str
+    values: Optional[List[float]] = None
+    start: Optional[float] = None
+    stop: Optional[float] = None
+    steps: int = 11
+
+# Input schema for /what-if: base farm conditions, the crops to compare, one
+# or two sweep axes, and the acres per crop for profit (default: the farm area)
+class WhatIfInput(FarmInput):
+    crops: List[str]
+    axes: List[SweepAxis]
+    acres: Optional[float] = None
+
+# One season of a rotation plan: its season name, optional weather overrides
+# for the farm's conditions, and its resource budgets (fertilizer optional)
+class RotationSeason(BaseModel):
+    Season: str
+    Rainfall_mm: Optional[float] = None
+    Temperature_C: Optional[float] = None
+    water_available: float = Field(..., ge=0)
+    fertilizer_available: Optional[float] = Field(None, ge=0)
+
+# Input schema for /plan-rotation: the farm's conditions, whole-acre plot
+# sizes, consecutive seasons, candidate crops (default: every crop) and the
+# crop each plot grew last season (null for fallow/unknown)
+class RotationInput(FarmInput):
+    plots: List[int]
+    seasons: List[RotationSeason]
+    crops: Optional[List[str]] = None
+    previous_crops: Optional[List[Optional[str]]] = None
+    time_limit: Optional[float] = Field(None, gt=0)
+
+from services.prediction import predict_crop, predict_crop_batch
+from services.optimizer import CROP_DATA, optimize_allocation, optimize_allocation_batch, memo_stats
+from services.rotation import ROTATION_TIME_LIMIT, plan_rotation
+from services.yield_predictor import (
+    MARKET_PRICE,
+    calculate_profit,
+    predict_yield,
+    predict_yields_batch,
+    predict_yields_for_crops,
+)
 from services.preprocessor import safe_preprocess
-from services.environment import analyze_environment, generate_advisories
+from services.environment import (
+    ADVISORY_TEMPLATES,
+    analyze_environment,
+    analyze_environment_batch,
+    generate_advisories_batch,
+)
+from services.cache import cache_stats
 
 
 def _sustainability_score(enriched: dict) -> int:
@@ -94,12 +246,12 @@ def _sustainability_score(enriched: dict) -> int:
     return round(total / len(enriched))
 
 
-def enrich_allocation(allocation: dict, farm_conditions: dict) -> dict:
+def enrich_allocation(allocation: dict, farm_conditions: dict, advisory_ids_only: bool = False) -> dict:
     """
     For each allocated crop:
-      1. Predict base yield (ML model)
+      1. Predict base yield (ML model, one batched call for all crops)
       2. Analyze environment → adjusted yield + risk level
-      3. Generate farmer-friendly advisories
+      3. Generate farmer-friendly advisories (or only their IDs)
       4. Recalculate profit using adjusted yield
 
     Only includes crops with acres > 0.
@@ -107,20 +259,26 @@ def enrich_allocation(allocation: dict, farm_conditions: dict) -> dict:
                                   expected_profit, risk_level, advisories}}
     """
     enriched = {}
-    for crop_name, acres in allocation.items():
-        if acres <= 0:
-            continue
+    planted = {crop_name: acres for crop_name, acres in allocation.items() if acres > 0}
+
+    # Step 1: ML yield prediction for all planted crops in one model call
+    with stage("predict_yield"):
+        base_yields = predict_yields_for_crops(farm_conditions, list(planted))
+
+    # Step 3 (all crops at once): farmer-friendly advisories (replaces raw warnings)
+    with stage("generate_advisories"):
+        advisories_by_crop = generate_advisories_batch(
+            [farm_conditions] * len(planted), list(planted), ids_only=advisory_ids_only
+        )
 
-        # Step 1: ML yield prediction
-        base_yield = predict_yield(farm_conditions, crop_name=crop_name)
+    for (crop_name, acres), advisories in zip(planted.items(), advisories_by_crop):
+        base_yield = base_yields[crop_name]
 
         # Step 2: Environmental stress adjustment
-        env = analyze_environment(farm_conditions, crop_name=crop_name, predicted_yield=base_yield)
+        with stage("analyze_environment"):
+            env = analyze_environment(farm_conditions, crop_name=crop_name, predicted_yield=base_yield)
         adjusted_yield = env["adjusted_yield"]
 
-        # Step 3: Farmer-friendly advisories (replaces raw warnings)
-        advisories = generate_advisories(farm_conditions, crop_name=crop_name)
-
         # Step 4: Profit from adjusted yield
         profit = calculate_profit(adjusted_yield, acres, crop_name)
 
@@ -134,6 +292,340 @@ def enrich_allocation(allocation: dict, farm_conditions: dict) -> dict:
         }
     return enriched
 
+
+def enrich_allocations_batch(allocations: list[dict], farm_conditions: list[dict],
+                             advisory_ids_only: bool = False) -> list[dict]:
+    """
+    enrich_allocation for many farms at once (bulk planning): one yield model
+    call, one environment pass and one advisory pass over every planted
+    (farm, crop) pair. The i-th result equals
+    enrich_allocation(allocations[i], farm_conditions[i], advisory_ids_only).
+    """
+    pairs = [
+        (i, crop_name, acres)
+        for i, allocation in enumerate(allocations)
+        for crop_name, acres in allocation.items() if acres > 0
+    ]
+    rows  = [farm_conditions[i] for i, _, _ in pairs]
+    crops = [crop_name for _, crop_name, _ in pairs]
+
+    with stage("predict_yield"):
+        base_yields = predict_yields_batch(rows, crops)
+    with stage("analyze_environment"):
+        envs = analyze_environment_batch(rows, crops, base_yields)
+    with stage("generate_advisories"):
+        advisories = generate_advisories_batch(rows, crops, ids_only=advisory_ids_only)
+
+    enriched: list[dict] = [{} for _ in allocations]
+    for (i, crop_name, acres), base_yield, env, crop_advisories in zip(pairs, base_yields, envs, advisories):
+        enriched[i][crop_name] = {
+            "acres":          acres,
+            "expected_yield": base_yield,
+            "adjusted_yield": env["adjusted_yield"],
+            "expected_profit":calculate_profit(env["adjusted_yield"], acres, crop_name),
+            "risk_level":     env["risk_level"],
+            "advisories":     crop_advisories
+        }
+    return enriched
+
+
+# Farm conditions /what-if can sweep, and the largest grid (points × crops) it evaluates
+SWEEP_FEATURES = [
+    "Temperature_C",
+    "Rainfall_mm",
+    "Fertilizer_Used_kg",
+    "Soil_pH",
+    "Water_Availability_L_per_week",
+    "Farm_Area_acres",
+]
+WHAT_IF_MAX_CELLS = int(os.getenv("WHAT_IF_MAX_CELLS", "20000"))
+
+
+def sweep_values(axis: SweepAxis) -> list[float]:
+    """
+    The values of one /what-if axis.
+
+    Raises:
+        ValueError: On an unsupported feature, more than WHAT_IF_MAX_CELLS
+            values, or unless exactly one of `values` / `start`+`stop`
+            (with steps >= 2) is given.
+    """
+    if axis.feature not in SWEEP_FEATURES:
+        raise ValueError(f"Cannot sweep '{axis.feature}'. Supported: {SWEEP_FEATURES}")
+    if axis.values is not None:
+        if axis.start is not None or axis.stop is not None:
+            raise ValueError(f"Axis '{axis.feature}': give either values or start/stop, not both")
+        if len(axis.values) > WHAT_IF_MAX_CELLS:
+            raise ValueError(f"Axis '{axis.feature}': at most {WHAT_IF_MAX_CELLS} values")
+        values = axis.values
+    else:
+        if axis.start is None or axis.stop is None:
+            raise ValueError(f"Axis '{axis.feature}': give values, or start and stop")
+        if axis.steps < 2:
+            raise ValueError(f"Axis '{axis.feature}': steps must be at least 2")
+        if axis.steps > WHAT_IF_MAX_CELLS:
+            raise ValueError(f"Axis '{axis.feature}': at most {WHAT_IF_MAX_CELLS} steps")
+        span = axis.stop - axis.start
+        values = [round(axis.start + span * i / (axis.steps - 1), 6) for i in range(axis.steps)]
+    if not values or not all(math.isfinite(v) for v in values):
+        raise ValueError(f"Axis '{axis.feature}': values must be a non-empty list of finite numbers")
+    return [float(v) for v in values]
+
+
+def what_if_sweep(farm_conditions: dict, crops: list[str], acres: float,
+                  axes: list[tuple[str, list[float]]]) -> dict:
+    """
+    Yield, environment-adjusted yield, profit and risk for every crop at
+    every point of a one- or two-axis grid of farm conditions, with one yield
+    model call and one vectorized environment pass for the whole grid. Each
+    cell equals what enrich_allocation({crop: acres}, conditions at that
+    point) reports for the crop.
+
+    Args:
+        farm_conditions (dict): Base farm conditions (preprocessed).
+        crops (list[str]): Crops to evaluate (duplicates are ignored).
+        acres (float): Acres per crop used for profit.
+        axes (list): One or two (feature, values) pairs.
+
+    Returns:
+        dict: axes, crops, acres and per-crop matrices (expected_yield,
+            adjusted_yield, profit, risk_level) indexed [i] or [i][j] by
+            the axes' value positions.
+
+    Raises:
+        ValueError: On bad axes or crops, an oversized grid, or invalid farm conditions.
+    """
+    if len(axes) not in (1, 2):
+        raise ValueError("Give one or two sweep axes")
+    if len(axes) == 2 and axes[0][0] == axes[1][0]:
+        raise ValueError(f"Both axes sweep '{axes[0][0]}'")
+    crops = list(dict.fromkeys(crops))
+    if not crops:
+        raise ValueError("Give at least one crop")
+    unknown = [crop for crop in crops if crop not in MARKET_PRICE]
+    if unknown:
+        raise ValueError(f"No market price found for {unknown}. Supported crops: {list(MARKET_PRICE)}")
+
+    cells = math.prod(len(values) for _, values in axes) * len(crops)
+    if cells > WHAT_IF_MAX_CELLS:
+        raise ValueError(
+            f"The sweep has {cells} cells (points × crops); "
+            f"the limit is {WHAT_IF_MAX_CELLS}"
+        )
+    points = list(product(*(values for _, values in axes)))
+
+    # Rows are point-major: every crop at point 0, then every crop at point 1, ...
+    rows, row_crops = [], []
+    for point in points:
+        conditions = {**farm_conditions, **{feature: value for (feature, _), value in zip(axes, point)}}
+        rows.extend([conditions] * len(crops))
+        row_crops.extend(crops)
+
+    with stage("predict_yield"):
+        base_yields = predict_yields_batch(rows, row_crops)
+    with stage("analyze_environment"):
+        envs = analyze_environment_batch(rows, row_crops, base_yields)
+
+    def matrix(values: list) -> list:
+        if len(axes) == 1:
+            return values
+        width = len(axes[1][1])
+        return [values[i:i + width] for i in range(0, len(values), width)]
+
+    results = {}
+    for k, crop in enumerate(crops):
+        cells = range(k, len(rows), len(crops))
+        adjusted = [envs[i]["adjusted_yield"] for i in cells]
+        results[crop] = {
+            "expected_yield": matrix([base_yields[i] for i in cells]),
+            "adjusted_yield": matrix(adjusted),
+            "profit":         matrix([calculate_profit(y, acres, crop) for y in adjusted]),
+            "risk_level":     matrix([envs[i]["risk_level"] for i in cells]),
+        }
+    return {
+        "axes":    [{"feature": feature, "values": values} for feature, values in axes],
+        "crops":   crops,
+        "acres":   acres,
+        "results": results,
+    }
+
+
+def rotation_profits(farm_conditions: dict, seasons: list[dict], crops: list[str]) -> list[list[float]]:
+    """
+    Profit per acre for every season and crop of a rotation plan: the
+    adjusted yield for the season's conditions (one yield model call and one
+    environment pass for all seasons × crops) at market price.
+
+    Args:
+        farm_conditions (dict): The farm's conditions (preprocessed).
+        seasons (list[dict]): Per-season overrides (Season, and optionally
+            Rainfall_mm / Temperature_C).
+        crops (list[str]): Candidate crops.
+
+    Returns:
+        list[list[float]]: (seasons × crops) profit per acre.
+    """
+    rows, row_crops = [], []
+    for season in seasons:
+        overrides = {key: value for key, value in season.items() if value is not None}
+        rows.extend([{**farm_conditions, **overrides}] * len(crops))
+        row_crops.extend(crops)
+
+    with stage("predict_yield"):
+        base_yields = predict_yields_batch(rows, row_crops)
+    with stage("analyze_environment"):
+        envs = analyze_environment_batch(rows, row_crops, base_yields)
+
+    profits = [calculate_profit(env["adjusted_yield"], 1, crop) for env, crop in zip(envs, row_crops)]
+    return [profits[i:i + len(crops)] for i in range(0, len(profits), len(crops))]
+
+
+def _farm_plan_response(predicted_crop: str, candidate_crops: list[str], enriched: dict) -> dict:
+    """/generate-farm-plan response: farm_plan list, total profit and sustainability score."""
+    farm_plan = [
+        {
+            "crop":           crop,
+            "acres":          d["acres"],
+            "expected_yield": d["expected_yield"],
+            "adjusted_yield": d["adjusted_yield"],
+            "expected_profit":d["expected_profit"],
+            "risk_level":     d["risk_level"],
+            "advisories":     d["advisories"]
+        }
+        for crop, d in enriched.items()
+    ]
+    total_expected_profit = round(
+        sum(d["expected_profit"] for d in enriched.values()), 2
+    )
+    sustainability_score = _sustainability_score(enriched)
+
+    return {
+        "predicted_crop":       predicted_crop,
+        "candidate_crops":      candidate_crops,
+        "farm_plan":            farm_plan,
+        "total_expected_profit":total_expected_profit,
+        "sustainability_score": sustainability_score
+    }
+
+
+# Request fields that are not farm conditions
+PLAN_RESOURCE_FIELDS = {"land_area", "water_available", "fertilizer_available", "advisory_ids_only"}
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+    )
+
+
+def predict_crop_rows(farms: list[dict], return_proba: bool = False) -> list[dict]:
+    """
+    /predict-crop-batch: validates each farm against FarmInput and preprocesses
+    it exactly as /predict-crop does, then predicts every valid farm with one
+    predict_crop_batch call. A row is accepted here only if /predict-crop would
+    accept it, and gets the same crop.
+
+    Args:
+        farms (list[dict]): Farm conditions as sent.
+        return_proba (bool): Include per-crop class probabilities per row.
+
+    Returns:
+        list[dict]: Per farm, in order: predict_crop_batch's result, or
+            {"error": str} for a farm that fails validation.
+    """
+    results: list[dict] = [{} for _ in farms]
+    valid: list[tuple[int, dict]] = []  # (position, farm conditions)
+    for pos, farm in enumerate(farms):
+        try:
+            valid.append((pos, safe_preprocess(FarmInput.model_validate(farm).model_dump())))
+        except ValidationError as e:
+            results[pos] = {"error": _validation_message(e)}
+
+    predictions = predict_crop_batch([conditions for _, conditions in valid], return_proba=return_proba)
+    for (pos, _), prediction in zip(valid, predictions):
+        results[pos] = prediction
+    return results
+
+
+def plan_farm_batch(records: list[tuple], advisory_ids_only: bool = False) -> list[dict]:
+    """
+    Farm plans for one micro-batch of /generate-farm-plan/stream rows, with
+    one crop model call, one batched LP solve and one enrichment pass for the
+    whole batch. Each plan matches what /generate-farm-plan returns for the row.
+
+    Args:
+        records (list[tuple]): (row number, record dict or None, parse error or None).
+        advisory_ids_only (bool): Return advisory IDs instead of messages.
+
+    Returns:
+        list[dict]: Per record, in order: {"row": n, ["id": ...,] **plan}
+            or {"row": n, ["id": ...,] "error": str}.
+    """
+    results: list[dict] = [{} for _ in records]
+    farms: list[tuple[int, FarmPlanInput, dict]] = []  # (position, request, farm conditions)
+    for pos, (row, record, error) in enumerate(records):
+        results[pos]["row"] = row
+        if record is not None and "id" in record:
+            results[pos]["id"] = record["id"]
+        if error is None:
+            try:
+                plan_input = FarmPlanInput.model_validate(record)
+                farms.append((pos, plan_input, safe_preprocess(plan_input.model_dump(exclude=PLAN_RESOURCE_FIELDS))))
+                continue
+            except ValidationError as e:
+                error = _validation_message(e)
+        results[pos]["error"] = error
+
+    # Step 1: crop prediction for the whole batch (unknown categories fail per row)
+    with stage("predict_crop"):
+        predictions = predict_crop_batch([conditions for _, _, conditions in farms])
+    planned = []
+    for farm, prediction in zip(farms, predictions):
+        if "error" in prediction:
+            results[farm[0]]["error"] = prediction["error"]
+        else:
+            planned.append((*farm, prediction["recommended_crop"]))
+    if not planned:
+        return results
+
+    # Steps 2-3: candidate crops and one vectorized LP solve per crop set
+    candidate_sets = [RELATED_CROPS.get(crop, DEFAULT_RELATED) for *_, crop in planned]
+    with stage("optimize_allocation"):
+        solutions = optimize_allocation_batch(
+            land_area=[plan_input.land_area for _, plan_input, _, _ in planned],
+            water_available=[plan_input.water_available for _, plan_input, _, _ in planned],
+            fertilizer_available=[plan_input.fertilizer_available for _, plan_input, _, _ in planned],
+            crop_sets=candidate_sets,
+        )
+    solved = []
+    for farm, candidates, solution in zip(planned, candidate_sets, solutions):
+        if "error" in solution:
+            results[farm[0]]["error"] = solution["error"]
+        else:
+            solved.append((farm, candidates, solution["allocation"]))
+
+    # Step 4: enrichment for every planted (farm, crop) pair at once; if any
+    # farm fails (e.g. a category the yield model doesn't know), redo per farm
+    allocations = [allocation for _, _, allocation in solved]
+    conditions  = [farm[2] for farm, _, _ in solved]
+    try:
+        enriched_all = enrich_allocations_batch(allocations, conditions, advisory_ids_only)
+    except ValueError:
+        enriched_all = []
+        for allocation, farm_conditions in zip(allocations, conditions):
+            try:
+                enriched_all.append(enrich_allocations_batch([allocation], [farm_conditions], advisory_ids_only)[0])
+            except ValueError as e:
+                enriched_all.append(e)
+
+    # Step 5: same response body as /generate-farm-plan
+    for (farm, candidates, _), enriched in zip(solved, enriched_all):
+        if isinstance(enriched, ValueError):
+            results[farm[0]]["error"] = str(enriched)
+        else:
+            results[farm[0]].update(_farm_plan_response(farm[3], candidates, enriched))
+    return results
+
 @app.get("/")
 async def root():
     """
@@ -141,6 +633,90 @@ async def root():
     """
     return {"message": "Farm Planner Backend Running"}
 
+@app.get("/cache-stats")
+async def cache_stats_endpoint():
+    """
+    Hit/miss/eviction counters for the prediction caches and optimizer memo.
+    """
+    return {**cache_stats(), "optimizer_memo": memo_stats()}
+
+@app.get("/executor-stats")
+async def executor_stats_endpoint():
+    """
+    Worker pool sizes, in-flight tasks, saturation and rejection counters.
+    """
+    return executor_stats()
+
+@app.get("/memory-stats")
+async def memory_stats_endpoint():
+    """
+    This worker's private vs shared memory, and how much of the memory-mapped
+    model artifacts is resident and shared with other workers.
+    """
+    return memory_report(MODELS_DIR)
+
+@app.get("/health")
+async def health_endpoint():
+    """
+    Liveness probe: the worker is up and serving (models may still be loading,
+    see /ready).
+    """
+    return {"status": "ok", "pid": os.getpid()}
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """
+    Request counters, request and per-stage latency histograms, model
+    inference counts and optimizer solve times in Prometheus text format.
+    """
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (METRICS_ENABLED=0)")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/ready")
+async def ready_endpoint():
+    """
+    Readiness probe: 200 once every model is loaded, 503 while any is still
+    unloaded, loading or failed (see MODEL_LOADING).
+    """
+    readiness = registry.readiness()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+@app.get("/models")
+async def models_endpoint():
+    """
+    Active model versions with load time, reload counts and the last reload error.
+    """
+    return registry.status()
+
+@app.post("/admin/reload-models")
+async def reload_models_endpoint(force: bool = False, x_admin_token: str = Header(default="")):
+    """
+    Reloads models whose artifacts changed on disk (all of them with ?force=true).
+    New artifacts are validated before being swapped in; requests keep being
+    served by the current models meanwhile. Requires the X-Admin-Token header.
+    """
+    if not ADMIN_TOKEN or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid or missing admin token")
+    try:
+        report = await run_in_thread(registry.reload, force=force)
+        return {"models": report, "versions": registry.versions()}
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred while reloading models: {str(e)}"
+        )
+
+@app.get("/advisory-templates")
+async def advisory_templates_endpoint():
+    """
+    Advisory ID → message template, for clients using advisory_ids_only.
+    Placeholders ({crop}, {soil_ph}, ...) are filled in per farm and crop.
+    """
+    return ADVISORY_TEMPLATES
+
 @app.post("/predict-crop")
 async def predict_crop_endpoint(data: FarmInput):
     """
@@ -151,12 +727,14 @@ async def predict_crop_endpoint(data: FarmInput):
         input_dict = safe_preprocess(data.model_dump())
         
         # Get prediction
-        prediction = predict_crop(input_dict)
+        prediction = await run_in_thread(predict_crop, input_dict)
         
         # Return specific JSON format
         return {
             "recommended_crop": prediction
         }
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         # Raise HTTP 500 for internal errors
         raise HTTPException(
@@ -164,33 +742,65 @@ async def predict_crop_endpoint(data: FarmInput):
             detail=f"An error occurred during prediction: {str(e)}"
         )
 
+@app.post("/predict-crop-batch")
+async def predict_crop_batch_endpoint(data: CropBatchInput):
+    """
+    Predicts the best crop for many farms in a single model call.
+    Rows that fail validation are returned with an "error" field.
+    """
+    try:
+        results = await run_in_thread(
+            predict_crop_rows, data.farms, return_proba=data.include_probabilities
+        )
+
+        return {
+            "results": results,
+            "count":   len(results),
+            "failed":  sum(1 for r in results if "error" in r)
+        }
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred during batch prediction: {str(e)}"
+        )
+
 @app.post("/optimize-allocation")
 async def optimize_allocation_endpoint(data: EnrichedOptimizationInput):
     """
     Optimizes crop land allocation and returns per-crop yield and profit estimates.
     """
     try:
-        farm_conditions = safe_preprocess(
-            data.model_dump(
-                exclude={"land_area", "water_available", "fertilizer_available", "candidate_crops"}
+        with stage("preprocess"):
+            farm_conditions = safe_preprocess(
+                data.model_dump(
+                    exclude={"land_area", "water_available", "fertilizer_available",
+                             "candidate_crops", "advisory_ids_only"}
+                )
             )
-        )
 
-        result = optimize_allocation(
-            land_area=data.land_area,
-            water_available=data.water_available,
-            fertilizer_available=data.fertilizer_available,
-            crop_names=data.candidate_crops
-        )
+        with stage("optimize_allocation"):
+            result = await run_in_process(
+                optimize_allocation,
+                land_area=data.land_area,
+                water_available=data.water_available,
+                fertilizer_available=data.fertilizer_available,
+                crop_names=data.candidate_crops
+            )
 
         # Enrich each allocated crop with yield and profit
-        enriched = enrich_allocation(result["allocation"], farm_conditions)
+        enriched = await run_in_thread(
+            enrich_allocation, result["allocation"], farm_conditions, data.advisory_ids_only
+        )
 
         return {
             "allocation": enriched,
             "resource_usage": result["resource_usage"],
             "total_profit": result["total_profit"]
         }
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -200,6 +810,42 @@ async def optimize_allocation_endpoint(data: EnrichedOptimizationInput):
         )
 
 
+@app.post("/optimize-allocation-batch")
+async def optimize_allocation_batch_endpoint(data: OptimizationBatchInput):
+    """
+    Solves the land allocation LP for many farms in one vectorized pass.
+    Farms with unknown crops or infeasible resources get an "error" field.
+    """
+    if not (len(data.land_area) == len(data.water_available) == len(data.fertilizer_available)):
+        raise HTTPException(
+            status_code=400,
+            detail="land_area, water_available and fertilizer_available must have the same length"
+        )
+    try:
+        results = await run_in_process(
+            optimize_allocation_batch,
+            land_area=data.land_area,
+            water_available=data.water_available,
+            fertilizer_available=data.fertilizer_available,
+            crop_sets=data.candidate_crops
+        )
+
+        return {
+            "results": results,
+            "count":   len(results),
+            "failed":  sum(1 for r in results if "error" in r)
+        }
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred during batch optimization: {str(e)}"
+        )
+
+
 @app.post("/generate-farm-plan")
 async def generate_farm_plan(data: FarmPlanInput):
     """
@@ -211,50 +857,36 @@ async def generate_farm_plan(data: FarmPlanInput):
     """
     try:
         # Step 1: Predict the most suitable crop (with safe preprocessing)
-        raw_input = data.model_dump(exclude={"land_area", "water_available", "fertilizer_available"})
-        input_dict = safe_preprocess(raw_input)
+        raw_input = data.model_dump(exclude=PLAN_RESOURCE_FIELDS)
+        with stage("preprocess"):
+            input_dict = safe_preprocess(raw_input)
         farm_conditions = input_dict  # reuse the same preprocessed dict
-        predicted_crop = predict_crop(input_dict)
+        with stage("predict_crop"):
+            predicted_crop = await run_in_thread(predict_crop, input_dict)
 
         # Step 2: Get 3 related crops (including the predicted one)
         candidate_crops = RELATED_CROPS.get(predicted_crop, DEFAULT_RELATED)
 
         # Step 3: Run LP optimization over candidate crops
-        optimization_result = optimize_allocation(
-            land_area=data.land_area,
-            water_available=data.water_available,
-            fertilizer_available=data.fertilizer_available,
-            crop_names=candidate_crops
-        )
+        with stage("optimize_allocation"):
+            optimization_result = await run_in_process(
+                optimize_allocation,
+                land_area=data.land_area,
+                water_available=data.water_available,
+                fertilizer_available=data.fertilizer_available,
+                crop_names=candidate_crops
+            )
 
         # Step 4: Enrich each crop with yield, env analysis, advisories and profit
-        enriched = enrich_allocation(optimization_result["allocation"], farm_conditions)
-
-        # Step 5: Build farm_plan list + compute totals + sustainability score
-        farm_plan = [
-            {
-                "crop":           crop,
-                "acres":          d["acres"],
-                "expected_yield": d["expected_yield"],
-                "adjusted_yield": d["adjusted_yield"],
-                "expected_profit":d["expected_profit"],
-                "risk_level":     d["risk_level"],
-                "advisories":     d["advisories"]
-            }
-            for crop, d in enriched.items()
-        ]
-        total_expected_profit = round(
-            sum(d["expected_profit"] for d in enriched.values()), 2
+        enriched = await run_in_thread(
+            enrich_allocation, optimization_result["allocation"], farm_conditions,
+            data.advisory_ids_only
         )
-        sustainability_score = _sustainability_score(enriched)
 
-        return {
-            "predicted_crop":       predicted_crop,
-            "candidate_crops":      candidate_crops,
-            "farm_plan":            farm_plan,
-            "total_expected_profit":total_expected_profit,
-            "sustainability_score": sustainability_score
-        }
+        # Step 5: Build farm_plan list + compute totals + sustainability score
+        return _farm_plan_response(predicted_crop, candidate_crops, enriched)
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -264,6 +896,47 @@ async def generate_farm_plan(data: FarmPlanInput):
         )
 
 
+@app.post("/generate-farm-plan/stream")
+async def generate_farm_plan_stream(request: Request, format: str | None = None,
+                                    advisory_ids_only: bool = False):
+    """
+    Bulk farm plans. The body is NDJSON (one /generate-farm-plan request
+    object per line) or CSV (Content-Type: text/csv or ?format=csv) with the
+    same fields as columns. Rows are read as they arrive and planned in
+    micro-batches of BULK_BATCH_SIZE; each batch's results are streamed back
+    as NDJSON ({"row": n, ...plan} or {"row": n, "error": ...}) before more
+    input is read, so memory stays bounded. The last line is
+    {"summary": {"rows", "failed", "seconds"}}.
+    """
+    try:
+        fmt = stream_format(format, request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def results():
+        start = time.perf_counter()
+        rows = failed = 0
+        async for batch in micro_batches(iter_records(request.stream(), fmt)):
+            try:
+                planned = await run_in_thread(plan_farm_batch, batch, advisory_ids_only)
+            except ExecutorSaturated as e:
+                # The response has already started; report the batch's rows as failed
+                planned = [{"row": row, "error": str(e)} for row, _, _ in batch]
+            except Exception as e:
+                planned = [
+                    {"row": row, "error": f"An error occurred while generating the farm plan: {str(e)}"}
+                    for row, _, _ in batch
+                ]
+            rows += len(planned)
+            failed += sum(1 for plan in planned if "error" in plan)
+            yield ndjson(planned)
+        yield ndjson([{"summary": {
+            "rows": rows, "failed": failed, "seconds": round(time.perf_counter() - start, 3)
+        }}])
+
+    return DuplexStreamingResponse(results(), media_type="application/x-ndjson")
+
+
 @app.post("/predict-yield")
 async def predict_yield_endpoint(data: YieldInput):
     """
@@ -277,7 +950,7 @@ async def predict_yield_endpoint(data: YieldInput):
         )
 
         # Predict yield per acre
-        yield_per_acre = predict_yield(input_data, crop_name=data.crop_name)
+        yield_per_acre = await run_in_thread(predict_yield, input_data, crop_name=data.crop_name)
 
         # Calculate total production and profit
         total_production = round(yield_per_acre * data.acres, 3)
@@ -294,6 +967,8 @@ async def predict_yield_endpoint(data: YieldInput):
             "total_production_tons": total_production,
             "profit": profit
         }
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -303,6 +978,78 @@ async def predict_yield_endpoint(data: YieldInput):
         )
 
 
+@app.post("/what-if")
+async def what_if_endpoint(data: WhatIfInput):
+    """
+    Sensitivity sweep: how yield, adjusted yield, profit and risk change for
+    each crop as one or two farm conditions vary around the given farm.
+    """
+    try:
+        farm_conditions = safe_preprocess(data.model_dump(exclude={"crops", "axes", "acres"}))
+        acres = data.acres if data.acres is not None else farm_conditions["Farm_Area_acres"]
+        if len(data.axes) not in (1, 2):
+            raise ValueError("Give one or two sweep axes")
+        axes = [(axis.feature, sweep_values(axis)) for axis in data.axes]
+        return await run_in_thread(what_if_sweep, farm_conditions, data.crops, acres, axes)
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred during the what-if sweep: {str(e)}"
+        )
+
+
+@app.post("/plan-rotation")
+async def plan_rotation_endpoint(data: RotationInput):
+    """
+    Multi-season rotation plan: which crop each plot grows in each season,
+    maximizing total profit under per-season water/fertilizer budgets and
+    the rotation rules in services/rotation.py.
+    """
+    try:
+        farm_conditions = safe_preprocess(
+            data.model_dump(exclude={"plots", "seasons", "crops", "previous_crops", "time_limit"})
+        )
+        crops = list(dict.fromkeys(data.crops if data.crops is not None else CROP_DATA))
+        unknown = [crop for crop in crops if crop not in CROP_DATA or crop not in MARKET_PRICE]
+        if unknown:
+            raise ValueError(f"Unknown crop(s): {unknown}. Supported crops are: {list(CROP_DATA.keys())}")
+        if not data.seasons:
+            raise ValueError("Give at least one season.")
+
+        seasons = [
+            {"Season": season.Season, "Rainfall_mm": season.Rainfall_mm, "Temperature_C": season.Temperature_C}
+            for season in data.seasons
+        ]
+        profit = await run_in_thread(rotation_profits, farm_conditions, seasons, crops)
+
+        time_limit = ROTATION_TIME_LIMIT if data.time_limit is None else min(data.time_limit, ROTATION_TIME_LIMIT)
+        with stage("plan_rotation"):
+            return await run_in_process(
+                plan_rotation,
+                plots=data.plots,
+                crop_names=crops,
+                profit=profit,
+                water_available=[season.water_available for season in data.seasons],
+                fertilizer_available=[season.fertilizer_available for season in data.seasons],
+                previous_crops=data.previous_crops,
+                season_names=[season.Season for season in data.seasons],
+                time_limit=time_limit,
+            )
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred during rotation planning: {str(e)}"
+        )
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,169 @@
+# ─── services/bulk.py ─────────────────────────────────────────────────────────
+# Streaming input for bulk endpoints (POST /generate-farm-plan/stream).
+#
+# The request body is read chunk by chunk and split into records as it
+# arrives, records are grouped into micro-batches of BULK_BATCH_SIZE, and the
+# endpoint writes each batch's results out before reading further. Memory
+# therefore stays at about one batch (plus one line of at most
+# BULK_MAX_LINE_BYTES) however large the upload is.
+#
+# Two input formats:
+#   ndjson  one JSON object per line
+#   csv     a header line, then one farm per line (fields may be quoted, but
+#           a quoted field must not span lines)
+#
+# Every record carries its 1-based data row number (CSV header excluded) so
+# results can be matched to input rows. A record that can't be parsed is
+# passed on with an error message instead of stopping the stream (an
+# unreadable CSV header is reported as row 0 and ends it).
+#
+# Configuration (environment variables):
+#   BULK_BATCH_SIZE      rows per micro-batch (default 256)
+#   BULK_MAX_LINE_BYTES  longest accepted input line (default 65536)
+
+import csv
+import json
+import os
+from typing import Any, AsyncIterator
+
+from starlette.responses import StreamingResponse
+
+BULK_BATCH_SIZE     = int(os.getenv("BULK_BATCH_SIZE", "256"))
+BULK_MAX_LINE_BYTES = int(os.getenv("BULK_MAX_LINE_BYTES", "65536"))
+
+FORMATS = ("ndjson", "csv")
+
+# (row number, parsed record or None, error message or None)
+Record = tuple[int, dict[str, Any] | None, str | None]
+
+
+def stream_format(requested: str | None, content_type: str) -> str:
+    """
+    Input format from an explicit ?format= or the request's Content-Type
+    (text/csv → csv; anything else, e.g. application/x-ndjson → ndjson).
+
+    Raises:
+        ValueError: If `requested` is not a supported format.
+    """
+    if requested:
+        requested = requested.strip().lower()
+        if requested not in FORMATS:
+            raise ValueError(f"Unsupported format '{requested}'. Supported: {list(FORMATS)}")
+        return requested
+    media_type = content_type.split(";")[0].strip().lower()
+    return "csv" if media_type in ("text/csv", "application/csv") else "ndjson"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = BULK_MAX_LINE_BYTES) -> AsyncIterator[bytes | None]:
+    """
+    Splits a byte stream into lines (without line terminators). A line longer
+    than `max_line_bytes` is dropped while reading and yielded as None.
+    """
+    buffer = bytearray()
+    too_long = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            piece = chunk[start:] if end < 0 else chunk[start:end]
+            if not too_long:
+                buffer += piece
+                if len(buffer) > max_line_bytes:
+                    too_long = True
+                    buffer.clear()
+            if end < 0:
+                break
+            yield None if too_long else bytes(buffer.rstrip(b"\r"))
+            buffer.clear()
+            too_long = False
+            start = end + 1
+    if too_long:
+        yield None
+    elif buffer.strip():
+        yield bytes(buffer.rstrip(b"\r"))
+
+
+def _decode(line: bytes) -> str:
+    return line.decode("utf-8-sig").strip()
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Record]:
+    """
+    Parses an NDJSON or CSV byte stream into records. Blank lines are skipped.
+    CSV values are left as strings (the endpoint's schema converts them).
+    """
+    header: list[str] | None = None
+    row = 0
+    async for line in iter_lines(chunks):
+        if line is not None and not line.strip():
+            continue
+        if fmt == "csv" and header is None:
+            if line is None:
+                yield 0, None, f"CSV header is longer than {BULK_MAX_LINE_BYTES} bytes"
+                return
+            try:
+                header = [name.strip() for name in next(csv.reader([_decode(line)]))]
+            except UnicodeDecodeError:
+                yield 0, None, "CSV header is not valid UTF-8"
+                return
+            continue
+
+        row += 1
+        if line is None:
+            yield row, None, f"Line is longer than {BULK_MAX_LINE_BYTES} bytes"
+            continue
+        try:
+            text = _decode(line)
+        except UnicodeDecodeError:
+            yield row, None, "Line is not valid UTF-8"
+            continue
+
+        if fmt == "csv":
+            values = next(csv.reader([text]))
+            if len(values) != len(header):
+                yield row, None, f"Expected {len(header)} CSV fields, got {len(values)}"
+                continue
+            yield row, dict(zip(header, values)), None
+            continue
+
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError as e:
+            yield row, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row, None, "Each NDJSON line must be a JSON object"
+            continue
+        yield row, record, None
+
+
+async def micro_batches(records: AsyncIterator[Record], size: int = BULK_BATCH_SIZE) -> AsyncIterator[list[Record]]:
+    """Groups records into lists of at most `size`."""
+    batch: list[Record] = []
+    async for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body generator is still reading the request body.
+    Starlette's version concurrently waits for a client disconnect on
+    `receive`, which would swallow the request body chunks; here a disconnect
+    surfaces instead as ClientDisconnect in the request stream or as a failed
+    send.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def ndjson(items: list[dict[str, Any]]) -> bytes:
+    """Serializes results as NDJSON (one object per line)."""
+    return "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items).encode("utf-8")
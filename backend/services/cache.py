@@ -0,0 +1,173 @@
+# ─── services/cache.py ────────────────────────────────────────────────────────
+# Bounded, thread-safe LRU + TTL caches in front of the model-backed services
+# (crop prediction, yield prediction, environment analysis).
+#
+# Keys are canonical tuples of the preprocessed features: categoricals are
+# normalized (stripped, lower-cased) and numerics can optionally be snapped to
+# a grid (e.g. 0.1°C, 1 mm rainfall) so near-identical requests share entries.
+# When quantization is on, the snapped values are also what the model sees, so
+# a cached answer never depends on which request happened to fill the entry.
+#
+# Configuration (environment variables):
+#   PREDICTION_CACHE_SIZE      max entries per cache (default 4096, 0 disables)
+#   PREDICTION_CACHE_TTL       entry lifetime in seconds (default 3600, 0 = no expiry)
+#   PREDICTION_CACHE_QUANTIZE  "1" to snap numeric inputs to QUANTIZATION_STEPS
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from services.encoding import normalize_category
+
+CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+CACHE_TTL  = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+QUANTIZE   = os.getenv("PREDICTION_CACHE_QUANTIZE", "0") == "1"
+
+# Grid step per numeric feature when quantization is enabled
+QUANTIZATION_STEPS: dict[str, float] = {
+    "Farm_Area_acres":               0.01,
+    "Water_Availability_L_per_week": 1.0,
+    "Fertilizer_Used_kg":            0.1,
+    "Rainfall_mm":                   1.0,
+    "Temperature_C":                 0.1,
+    "Soil_pH":                       0.01,
+}
+
+
+# Sentinel for "not in cache" (None is a valid cached value)
+_MISSING = object()
+
+
+def _snap(value: float, step: float) -> float:
+    return round(round(value / step) * step, 6)
+
+
+def canonicalize(input_data: dict[str, Any], columns: list[str]) -> tuple[tuple, dict[str, Any]]:
+    """
+    Builds the cache key for `input_data` restricted to `columns`.
+
+    Returns (key, data) where `data` is `input_data` with numeric columns
+    snapped to QUANTIZATION_STEPS if quantization is enabled (otherwise the
+    input unchanged). Values that are neither numeric nor string are keyed
+    by repr so that invalid input still reaches the model and fails there.
+    """
+    data = input_data
+    if QUANTIZE:
+        data = dict(input_data)
+
+    key = []
+    for col in columns:
+        value = input_data.get(col)
+        if isinstance(value, str):
+            key.append(normalize_category(value))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            if QUANTIZE and col in QUANTIZATION_STEPS:
+                value = _snap(float(value), QUANTIZATION_STEPS[col])
+                data[col] = value
+            key.append(float(value))
+        else:
+            key.append(repr(value))
+    return tuple(key), data
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache with optional per-entry TTL and hit/miss/eviction
+    counters. `maxsize=0` turns the cache into a pass-through.
+    """
+
+    def __init__(self, name: str, maxsize: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.name    = name
+        self.maxsize = maxsize
+        self.ttl     = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock   = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if self.maxsize <= 0:
+            return default
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else 0.0
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for `key`, computing and storing it on a miss.
+        The computation runs outside the lock; concurrent misses on the same
+        key may both compute, and the last one wins.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size":        len(self._data),
+                "maxsize":     self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits":        self.hits,
+                "misses":      self.misses,
+                "evictions":   self.evictions,
+                "expirations": self.expirations,
+                "hit_rate":    round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# ─── Registry ──────────────────────────────────────────────────────────────────
+_caches: dict[str, PredictionCache] = {}
+_registry_lock = threading.Lock()
+
+
+def get_cache(name: str) -> PredictionCache:
+    """Returns the process-wide cache called `name`, creating it on first use."""
+    with _registry_lock:
+        if name not in _caches:
+            _caches[name] = PredictionCache(name)
+        return _caches[name]
+
+
+def cache_stats() -> dict[str, Any]:
+    """Counters for every cache, plus the active configuration."""
+    return {
+        "quantize": QUANTIZE,
+        "caches":   {name: cache.stats() for name, cache in _caches.items()},
+    }
+
+
+def invalidate_all() -> None:
+    """Drops every cached prediction. Must be called whenever models are reloaded."""
+    for cache in list(_caches.values()):
+        cache.clear()
@@ -0,0 +1,198 @@
+# ─── services/dataset_cache.py ────────────────────────────────────────────────
+# Columnar binary cache for the training datasets.
+#
+# load_dataset() parses a CSV once and stores it as a directory with one
+# .npy file per column plus meta.json:
+#   string columns   stripped (as the training scripts did on every run) and
+#                    stored as small-int codes into a sorted category list
+#   integer columns  downcast to the smallest integer type that holds them
+#   float columns    float64, unchanged
+# Later loads read the binary columns back — no text parsing, no string
+# stripping — as a DataFrame whose string columns are pandas categoricals.
+# Sorted categories make the codes exactly what LabelEncoder would assign,
+# so label_encode() reuses them instead of re-encoding strings.
+#
+# The cache records the CSV's size, mtime and SHA-256. A size/mtime match is
+# trusted; otherwise the hash decides (a touched but unchanged file, e.g.
+# after a git checkout, is re-stamped rather than re-converted).
+#
+# Configuration (environment variables):
+#   DATASET_CACHE      "0" to always parse the CSV (default "1")
+#   DATASET_CACHE_DIR  where caches live (default: .cache/ next to the CSV)
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+DATASET_CACHE     = os.getenv("DATASET_CACHE", "1") != "0"
+DATASET_CACHE_DIR = os.getenv("DATASET_CACHE_DIR", "")
+
+_META_FILE = "meta.json"
+_FORMAT_VERSION = 1
+
+
+def cache_path(csv_path: str) -> str:
+    """Cache directory of a CSV: <cache dir>/<csv name without extension>."""
+    cache_dir = DATASET_CACHE_DIR or os.path.join(os.path.dirname(os.path.abspath(csv_path)), ".cache")
+    return os.path.join(cache_dir, os.path.splitext(os.path.basename(csv_path))[0])
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_signature(csv_path: str) -> dict[str, Any]:
+    stat = os.stat(csv_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": _file_sha256(csv_path)}
+
+
+def read_csv_normalized(csv_path: str) -> pd.DataFrame:
+    """
+    Parses a CSV the way the training scripts expect it: column names and
+    string values stripped, string columns as categoricals with sorted
+    categories.
+    """
+    df = pd.read_csv(csv_path)
+    df.columns = [str(col).strip() for col in df.columns]
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        values = df[col].astype(str).str.strip()
+        df[col] = pd.Categorical(values, categories=sorted(values.unique()))
+    return df
+
+
+def _save(df: pd.DataFrame, path: str, source: dict[str, Any]) -> None:
+    """Writes the cache under a temporary name and renames it into place."""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    columns = []
+    for i, (name, column) in enumerate(df.items()):
+        file = f"col{i}.npy"
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            array = column.cat.codes.to_numpy()
+            columns.append({"name": name, "file": file, "categories": [str(c) for c in column.cat.categories]})
+        else:
+            if pd.api.types.is_integer_dtype(column.dtype):
+                column = pd.to_numeric(column, downcast="integer")
+            array = column.to_numpy()
+            columns.append({"name": name, "file": file})
+        np.save(os.path.join(tmp_path, file), np.ascontiguousarray(array), allow_pickle=False)
+    with open(os.path.join(tmp_path, _META_FILE), "w") as f:
+        json.dump({"format": _FORMAT_VERSION, "rows": len(df), "source": source, "columns": columns}, f)
+
+    old_path = None
+    if os.path.exists(path):
+        old_path = f"{path}.old-{os.getpid()}-{time.time_ns()}"
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    if old_path is not None:
+        shutil.rmtree(old_path, ignore_errors=True)
+
+
+def _read_meta(path: str) -> dict[str, Any] | None:
+    try:
+        with open(os.path.join(path, _META_FILE)) as f:
+            meta = json.load(f)
+    except (FileNotFoundError, NotADirectoryError, json.JSONDecodeError):
+        return None
+    return meta if meta.get("format") == _FORMAT_VERSION else None
+
+
+def _is_fresh(meta: dict[str, Any], path: str, csv_path: str) -> bool:
+    """
+    True if the cache was built from the CSV's current contents. Re-stamps
+    the cache's mtime when only the CSV's mtime changed.
+    """
+    stat = os.stat(csv_path)
+    source = meta["source"]
+    if source["size"] != stat.st_size:
+        return False
+    if source["mtime_ns"] == stat.st_mtime_ns:
+        return True
+    if _file_sha256(csv_path) != source["sha256"]:
+        return False
+    meta["source"]["mtime_ns"] = stat.st_mtime_ns
+    with open(os.path.join(path, _META_FILE), "w") as f:
+        json.dump(meta, f)
+    return True
+
+
+def _load(meta: dict[str, Any], path: str) -> pd.DataFrame:
+    data = {}
+    for column in meta["columns"]:
+        array = np.load(os.path.join(path, column["file"]), allow_pickle=False)
+        if "categories" in column:
+            data[column["name"]] = pd.Categorical.from_codes(array, categories=column["categories"])
+        else:
+            data[column["name"]] = array
+    return pd.DataFrame(data)
+
+
+def load_dataset(csv_path: str) -> pd.DataFrame:
+    """
+    Loads a training CSV through the columnar cache, building or rebuilding
+    the cache if it is missing or stale.
+
+    Args:
+        csv_path: Path of the source CSV.
+
+    Returns:
+        The dataset as normalized by read_csv_normalized() — string
+        columns are categoricals with sorted categories.
+    """
+    if not DATASET_CACHE:
+        return read_csv_normalized(csv_path)
+
+    path = cache_path(csv_path)
+    start = time.perf_counter()
+    meta = _read_meta(path)
+    if meta is not None and _is_fresh(meta, path, csv_path):
+        df = _load(meta, path)
+        print(f"📦 Dataset cache hit: {path} ({len(df)} rows, {(time.perf_counter() - start) * 1000:.0f} ms)")
+        return df
+
+    source = _source_signature(csv_path)
+    df = read_csv_normalized(csv_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _save(df, path, source)
+    print(f"📦 Dataset cache built: {path} ({len(df)} rows, {(time.perf_counter() - start) * 1000:.0f} ms)")
+    return df
+
+
+def label_encode(df: pd.DataFrame, columns: list[str]) -> tuple[pd.DataFrame, dict[str, LabelEncoder]]:
+    """
+    Replaces `columns` with label codes and returns the fitted encoders.
+    Categorical columns (as returned by load_dataset) reuse their codes
+    directly; other columns are encoded with LabelEncoder as strings.
+
+    Args:
+        df: DataFrame to encode (modified in place).
+        columns: Columns to encode.
+
+    Returns:
+        (df, {column: LabelEncoder})
+    """
+    encoders = {}
+    for col in columns:
+        encoder = LabelEncoder()
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            # Sorted categories, all present: the codes are LabelEncoder's
+            column = df[col].cat.remove_unused_categories()
+            encoder.fit(np.asarray(column.cat.categories, dtype=object))
+            df[col] = column.cat.codes
+        else:
+            df[col] = encoder.fit_transform(df[col].astype(str))
+        encoders[col] = encoder
+    return df, encoders
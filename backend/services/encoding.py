@@ -0,0 +1,115 @@
+# ─── services/encoding.py ─────────────────────────────────────────────────────
+# Compiles the fitted LabelEncoders saved by the training scripts into plain
+# dict lookup tables, so request-time encoding is a dict hit per field instead
+# of a LabelEncoder.transform call (which runs np.unique / searchsorted), and
+# builds model input rows as plain NumPy arrays without going through pandas.
+
+from typing import Any, Iterable
+
+import numpy as np
+
+
+def normalize_category(value: Any) -> str:
+    """Canonical lookup key for a categorical value: stripped and lower-cased."""
+    return str(value).strip().lower()
+
+
+class CategoryLookup:
+    """
+    Precomputed value → code table for one label-encoded column.
+
+    Codes match the fitted LabelEncoder exactly (index into `classes_`);
+    lookups ignore surrounding whitespace and letter case.
+    """
+
+    def __init__(self, column: str, classes: Iterable[Any]):
+        self.column  = column
+        self.classes = [str(c) for c in classes]
+        self.codes: dict[str, int] = {}
+
+        for code, label in enumerate(self.classes):
+            key = normalize_category(label)
+            if key in self.codes:
+                raise ValueError(
+                    f"Encoder for column '{column}' has classes that differ only "
+                    f"by case/whitespace: '{self.classes[self.codes[key]]}' and '{label}'"
+                )
+            self.codes[key] = code
+
+    def encode(self, value: Any) -> int:
+        """
+        Returns the integer code for `value`.
+        Raises ValueError if the value was not seen during training.
+        """
+        code = self.codes.get(normalize_category(value))
+        if code is None:
+            raise ValueError(
+                f"Unknown value '{value}' for column '{self.column}'. "
+                f"Accepted values: {self.classes}"
+            )
+        return code
+
+    def encode_many(self, values: Iterable[Any]) -> np.ndarray:
+        """Encodes many values at once; unseen values are returned as -1."""
+        codes = self.codes
+        return np.fromiter(
+            (codes.get(normalize_category(v), -1) for v in values),
+            dtype=np.int64,
+        )
+
+    def decode(self, code: int) -> str:
+        """Returns the original class label for an integer code."""
+        return self.classes[int(code)]
+
+
+def compile_encoders(encoders: dict[str, Any]) -> dict[str, CategoryLookup]:
+    """
+    Compiles a {column: LabelEncoder} dict (as saved in encoders.pkl /
+    yield_encoders.pkl) into {column: CategoryLookup}.
+    """
+    return {col: CategoryLookup(col, le.classes_) for col, le in encoders.items()}
+
+
+class FeatureEncoder:
+    """
+    Builds contiguous float64 feature rows in the exact column order a model
+    was trained on, encoding categorical columns via their CategoryLookup.
+    """
+
+    def __init__(self, feature_order: list[str], lookups: dict[str, CategoryLookup]):
+        self.feature_order = list(feature_order)
+        self._columns = [(col, lookups.get(col)) for col in self.feature_order]
+
+    def row(self, input_data: dict[str, Any]) -> np.ndarray:
+        """
+        Returns a (1, n_features) float64 array for a single input dict.
+        Raises ValueError on an unknown category or non-numeric value.
+        """
+        row = np.empty((1, len(self._columns)), dtype=np.float64)
+        for j, (col, lookup) in enumerate(self._columns):
+            value = input_data[col]
+            if lookup is not None:
+                row[0, j] = lookup.encode(value)
+            else:
+                try:
+                    row[0, j] = float(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid numeric value {value!r} for column '{col}'")
+        return row
+
+
+def strip_feature_names(estimator: Any, feature_order: list[str]) -> None:
+    """
+    Checks that a fitted sklearn estimator was trained on `feature_order`,
+    then drops its stored feature names so it accepts plain NumPy rows
+    without per-call column-name validation (and its warning).
+    """
+    names = getattr(estimator, "feature_names_in_", None)
+    if names is None:
+        return
+    if list(names) != list(feature_order):
+        raise ValueError(
+            f"Model was trained on columns {list(names)}, "
+            f"expected {list(feature_order)}"
+        )
+    del estimator.feature_names_in_
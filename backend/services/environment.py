@@ -2,7 +2,13 @@
 # Evaluates environmental suitability for a given crop and adjusts yield
 # based on temperature, rainfall, and soil pH stress factors.
 
-from typing import Any
+import string
+from functools import lru_cache
+from typing import Any, Callable
+
+import numpy as np
+
+from services.cache import canonicalize, get_cache
 
 # ─── Crop-Specific Optimal Ranges ──────────────────────────────────────────────
 # Each crop defines: (min, ideal_min, ideal_max, max)
@@ -105,82 +111,209 @@ def _stress_factor(value: float, mn: float, ideal_min: float, ideal_max: float,
     return 0.0
 
 
-def _temperature_penalty(temp: float, ranges: dict) -> tuple[float, str | None]:
+# ─── Vectorized Engine ─────────────────────────────────────────────────────────
+# CROP_RANGES as a (crops × factors × 4) array; the last crop row holds
+# DEFAULT_RANGES for crops without their own ranges. Penalties, retention,
+# risk level and advisory bitmasks are computed for many (farm, crop) pairs at
+# once. Each factor also yields a small status code, from which the scalar
+# warning and advisory messages are rendered.
+
+FACTORS = ("temperature", "rainfall", "soil_ph")
+ENGINE_CROPS = list(CROP_RANGES)
+RANGE_TABLE = np.array(
+    [[CROP_RANGES[crop][factor] for factor in FACTORS] for crop in ENGINE_CROPS]
+    + [[DEFAULT_RANGES[factor] for factor in FACTORS]],
+    dtype=np.float64,
+)
+_CROP_ROW = {crop: i for i, crop in enumerate(ENGINE_CROPS)}
+_DEFAULT_ROW = len(ENGINE_CROPS)
+
+# Status codes per factor (0 = no stress)
+TEMP_OK, TEMP_COLD, TEMP_FREEZING, TEMP_HOT, TEMP_SCORCHING = range(5)
+RAIN_OK, RAIN_ABOVE_IDEAL, RAIN_EXCESSIVE = range(3)
+PH_OK, PH_LOW, PH_HIGH = range(3)
+
+RISK_LEVELS = np.array(["Low", "Medium", "High"])
+
+
+def crop_rows(crop_names: list[str]) -> np.ndarray:
+    """Maps crop names to RANGE_TABLE rows (unknown crops → DEFAULT_RANGES row)."""
+    return np.array([_CROP_ROW.get(name, _DEFAULT_ROW) for name in crop_names], dtype=np.intp)
+
+
+def _python_round(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    np.round with the results of Python's round(): exact decimal rounding of
+    the binary value. They only disagree next to a tie, so those few entries
+    are rounded in Python.
+    """
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie):
+        rounded[i] = round(float(values[i]), ndigits)
+    return rounded
+
+
+def _temperature_kernel(temp: np.ndarray, ranges: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
     """
-    Returns (penalty_fraction, warning).
+    Returns (unrounded penalty, status code) per row; `ranges` is (n, 4).
     - Within ideal range         → 0% penalty
     - Outside ideal, within viable → 10–30% penalty (linearly interpolated)
     - Outside viable range       → 30% penalty (capped)
     """
-    mn, ideal_min, ideal_max, mx = ranges["temperature"]
-    warning = None
-
-    if ideal_min <= temp <= ideal_max:
-        return 0.0, None
+    mn, ideal_min, ideal_max, mx = ranges.T
+
+    ideal = (ideal_min <= temp) & (temp <= ideal_max)
+    cold = ~ideal & (temp < ideal_min)
+    hot = ~ideal & ~cold
+    freezing = cold & (temp < mn)
+    scorching = hot & (temp > mx)
+
+    # Interpolate penalty from 10% at the ideal bound to 30% at the viable bound
+    cold_ratio = (ideal_min - temp) / (ideal_min - mn + 1e-9)
+    hot_ratio = (temp - ideal_max) / (mx - ideal_max + 1e-9)
+    penalty = np.where(ideal, 0.0,
+              np.where(freezing | scorching, 0.30,
+              np.where(cold, 0.10 + 0.20 * cold_ratio, 0.10 + 0.20 * hot_ratio)))
+    code = np.where(ideal, TEMP_OK,
+           np.where(freezing, TEMP_FREEZING,
+           np.where(cold, TEMP_COLD,
+           np.where(scorching, TEMP_SCORCHING, TEMP_HOT))))
+    return penalty, code
+
+
+def _rainfall_kernel(rain: np.ndarray, ranges: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (penalty, status code) per row.
+    - Excess rainfall (above ideal or max viable) → 15% penalty
+    - Within or below range                       → 0% penalty (drought handled via irrigation)
+    """
+    code = np.where(rain > ranges[:, 3], RAIN_EXCESSIVE,
+                    np.where(rain > ranges[:, 2], RAIN_ABOVE_IDEAL, RAIN_OK))
+    return np.where(code != RAIN_OK, 0.15, 0.0), code
 
-    if temp < ideal_min:
-        if temp < mn:
-            penalty = 0.30
-            warning = f"Temperature {temp}°C is below the survivable minimum ({mn}°C). Severe cold stress. Yield reduced 30%."
-        else:
-            # Interpolate penalty from 10% at ideal_min to 30% at mn
-            ratio = (ideal_min - temp) / (ideal_min - mn + 1e-9)
-            penalty = 0.10 + 0.20 * ratio
-            warning = f"Temperature {temp}°C is too cold (ideal: {ideal_min}–{ideal_max}°C). Yield reduced ~{penalty*100:.0f}%."
-
-    else:  # temp > ideal_max
-        if temp > mx:
-            penalty = 0.30
-            warning = f"Temperature {temp}°C exceeds the survivable maximum ({mx}°C). Severe heat stress. Yield reduced 30%."
-        else:
-            # Interpolate penalty from 10% at ideal_max to 30% at mx
-            ratio = (temp - ideal_max) / (mx - ideal_max + 1e-9)
-            penalty = 0.10 + 0.20 * ratio
-            warning = f"Temperature {temp}°C is too hot (ideal: {ideal_min}–{ideal_max}°C). Yield reduced ~{penalty*100:.0f}%."
 
-    return round(penalty, 4), warning
+def _ph_kernel(ph: np.ndarray, ranges: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (penalty, status code) per row.
+    - Outside ideal pH range → 10% penalty
+    - Within ideal range     → 0% penalty
+    """
+    code = np.where(ph < ranges[:, 1], PH_LOW, np.where(ph > ranges[:, 2], PH_HIGH, PH_OK))
+    return np.where(code != PH_OK, 0.10, 0.0), code
 
 
-def _rainfall_penalty(rain: float, ranges: dict) -> tuple[float, str | None]:
+def score_environment(
+    temperature: np.ndarray,
+    rainfall: np.ndarray,
+    soil_ph: np.ndarray,
+    crop_names: list[str],
+    predicted_yield: np.ndarray
+) -> dict[str, np.ndarray]:
     """
-    Returns (penalty_fraction, warning).
-    - Excess rainfall (above max viable) → 15% penalty
-    - Within or below range             → 0% penalty (drought handled via irrigation)
+    Computes environmental penalties for n (farm, crop) pairs at once.
+
+    Args:
+        temperature, rainfall, soil_ph (np.ndarray): Farm conditions, shape (n,).
+        crop_names (list[str]): Crop per pair.
+        predicted_yield (np.ndarray): Base yield per pair in tons/acre.
+
+    Returns:
+        dict of arrays: temp_penalty, rain_penalty, ph_penalty (as applied),
+        temp_penalty_raw (unrounded, for warning text), retention,
+        adjusted_yield, risk (index into RISK_LEVELS) and codes (n, 3) with
+        the temperature / rainfall / pH status codes.
     """
-    _, _, ideal_max, mx = ranges["rainfall"]
+    ranges = RANGE_TABLE[crop_rows(crop_names)]
+
+    temp_raw, temp_code = _temperature_kernel(temperature, ranges[:, 0])
+    temp_p = _python_round(temp_raw, 4)
+    rain_p, rain_code = _rainfall_kernel(rainfall, ranges[:, 1])
+    ph_p, ph_code = _ph_kernel(soil_ph, ranges[:, 2])
 
-    if rain > mx:
-        return 0.15, (
+    # Combine multiplicatively: each penalty compounds on the remaining yield
+    retention = (1 - temp_p) * (1 - rain_p) * (1 - ph_p)
+    total_loss = 1 - retention
+
+    return {
+        "temp_penalty":     temp_p,
+        "temp_penalty_raw": temp_raw,
+        "rain_penalty":     rain_p,
+        "ph_penalty":       ph_p,
+        "retention":        retention,
+        "adjusted_yield":   _python_round(predicted_yield * retention, 3),
+        "risk":             (~(total_loss <= 0.10)).astype(np.intp) + ~(total_loss <= 0.30),
+        "codes":            np.stack([temp_code, rain_code, ph_code], axis=1),
+    }
+
+
+def _temperature_warning(code: int, temp: float, penalty: float, ranges: dict) -> str | None:
+    mn, ideal_min, ideal_max, mx = ranges["temperature"]
+    if code == TEMP_FREEZING:
+        return f"Temperature {temp}°C is below the survivable minimum ({mn}°C). Severe cold stress. Yield reduced 30%."
+    if code == TEMP_COLD:
+        return f"Temperature {temp}°C is too cold (ideal: {ideal_min}–{ideal_max}°C). Yield reduced ~{penalty*100:.0f}%."
+    if code == TEMP_SCORCHING:
+        return f"Temperature {temp}°C exceeds the survivable maximum ({mx}°C). Severe heat stress. Yield reduced 30%."
+    if code == TEMP_HOT:
+        return f"Temperature {temp}°C is too hot (ideal: {ideal_min}–{ideal_max}°C). Yield reduced ~{penalty*100:.0f}%."
+    return None
+
+
+def _rainfall_warning(code: int, rain: float, ranges: dict) -> str | None:
+    _, _, ideal_max, mx = ranges["rainfall"]
+    if code == RAIN_EXCESSIVE:
+        return (
             f"Rainfall {rain}mm is excessively high (max viable: {mx}mm). "
             f"Risk of waterlogging and root rot. Yield reduced 15%."
         )
-    if rain > ideal_max:
-        return 0.15, (
+    if code == RAIN_ABOVE_IDEAL:
+        return (
             f"Rainfall {rain}mm exceeds the ideal range (ideal max: {ideal_max}mm). "
             f"Moderate waterlogging risk. Yield reduced 15%."
         )
-    return 0.0, None
+    return None
 
 
-def _ph_penalty(ph: float, ranges: dict) -> tuple[float, str | None]:
-    """
-    Returns (penalty_fraction, warning).
-    - Outside ideal pH range → 10% penalty
-    - Within ideal range     → 0% penalty
-    """
+def _ph_warning(code: int, ph: float, ranges: dict) -> str | None:
     _, ideal_min, ideal_max, _ = ranges["soil_ph"]
-
-    if ph < ideal_min:
-        return 0.10, (
+    if code == PH_LOW:
+        return (
             f"Soil pH {ph} is below the ideal range ({ideal_min}–{ideal_max}). "
             f"Nutrient deficiencies likely. Yield reduced 10%."
         )
-    if ph > ideal_max:
-        return 0.10, (
+    if code == PH_HIGH:
+        return (
             f"Soil pH {ph} is above the ideal range ({ideal_min}–{ideal_max}). "
             f"Micronutrient lockout possible. Yield reduced 10%."
         )
-    return 0.0, None
+    return None
+
+
+# ─── Scalar Penalties (single-value wrappers around the engine) ────────────────
+
+def _range_row(ranges: dict, factor: str) -> np.ndarray:
+    return np.array([ranges[factor]], dtype=np.float64)
+
+
+def _temperature_penalty(temp: float, ranges: dict) -> tuple[float, str | None]:
+    """Returns (penalty_fraction, warning). See _temperature_kernel."""
+    raw, code = _temperature_kernel(np.array([float(temp)]), _range_row(ranges, "temperature"))
+    penalty = float(_python_round(raw, 4)[0])
+    return penalty, _temperature_warning(int(code[0]), temp, float(raw[0]), ranges)
+
+
+def _rainfall_penalty(rain: float, ranges: dict) -> tuple[float, str | None]:
+    """Returns (penalty_fraction, warning). See _rainfall_kernel."""
+    penalty, code = _rainfall_kernel(np.array([float(rain)]), _range_row(ranges, "rainfall"))
+    return float(penalty[0]), _rainfall_warning(int(code[0]), rain, ranges)
+
+
+def _ph_penalty(ph: float, ranges: dict) -> tuple[float, str | None]:
+    """Returns (penalty_fraction, warning). See _ph_kernel."""
+    penalty, code = _ph_kernel(np.array([float(ph)]), _range_row(ranges, "soil_ph"))
+    return float(penalty[0]), _ph_warning(int(code[0]), ph, ranges)
 
 
 def _risk_from_loss(loss_pct: float) -> str:
@@ -193,6 +326,11 @@ def _risk_from_loss(loss_pct: float) -> str:
         return "High"
 
 
+# Inputs analyze_environment depends on (besides crop and predicted yield)
+_ENVIRONMENT_COLUMNS = ["Temperature_C", "Rainfall_mm", "Soil_pH"]
+_cache = get_cache("analyze_environment")
+
+
 def analyze_environment(
     input_data: dict[str, Any],
     crop_name: str,
@@ -222,181 +360,419 @@ def analyze_environment(
     Returns:
         dict: adjusted_yield, risk_level, warnings (list of advisory messages).
     """
-    ranges = CROP_RANGES.get(crop_name, DEFAULT_RANGES)
+    key, data = canonicalize(input_data, _ENVIRONMENT_COLUMNS)
+    result = _cache.get_or_compute(
+        key + (crop_name, float(predicted_yield)),
+        lambda: _analyze_environment(data, crop_name, predicted_yield),
+    )
+    # Hand out a copy so callers can't mutate the cached warnings list
+    return {**result, "warnings": list(result["warnings"])}
+
+
+def _analyze_environment(
+    input_data: dict[str, Any],
+    crop_name: str,
+    predicted_yield: float
+) -> dict[str, Any]:
+    return analyze_environment_batch([input_data], [crop_name], [predicted_yield])[0]
 
-    temperature = float(input_data.get("Temperature_C", 27.0))
-    rainfall    = float(input_data.get("Rainfall_mm", 850.0))
-    soil_ph     = float(input_data.get("Soil_pH", 7.0))
 
-    # Compute individual penalties
-    temp_p, temp_warn = _temperature_penalty(temperature, ranges)
-    rain_p, rain_warn = _rainfall_penalty(rainfall, ranges)
-    ph_p,   ph_warn   = _ph_penalty(soil_ph, ranges)
+def _condition_column(rows: list[dict[str, Any]], column: str, default: float) -> np.ndarray:
+    return np.array([float(row.get(column, default)) for row in rows], dtype=np.float64)
 
-    # Combine multiplicatively: each penalty compounds on the remaining yield
-    retention = (1 - temp_p) * (1 - rain_p) * (1 - ph_p)
-    adjusted_yield = round(predicted_yield * retention, 3)
 
-    # Total loss percentage for risk classification
-    total_loss = 1 - retention
-    risk_level = _risk_from_loss(total_loss)
+def analyze_environment_batch(
+    rows: list[dict[str, Any]],
+    crop_names: list[str],
+    predicted_yields: list[float]
+) -> list[dict[str, Any]]:
+    """
+    Vectorized analyze_environment for many (farm, crop) pairs: the i-th
+    result is analyze_environment(rows[i], crop_names[i], predicted_yields[i]).
 
-    # Collect warnings (skip None entries)
-    warnings = [w for w in [temp_warn, rain_warn, ph_warn] if w]
+    Args:
+        rows (list[dict]): Farm conditions with Temperature_C, Rainfall_mm, Soil_pH.
+        crop_names (list[str]): Crop name per row.
+        predicted_yields (list[float]): Base ML-predicted yield per row in tons/acre.
 
-    return {
-        "adjusted_yield": adjusted_yield,
-        "risk_level":     risk_level,
-        "warnings":       warnings
-    }
+    Returns:
+        list[dict]: adjusted_yield, risk_level, warnings per row.
+    """
+    if not (len(rows) == len(crop_names) == len(predicted_yields)):
+        raise ValueError("rows, crop_names and predicted_yields must have the same length")
+
+    temperature = _condition_column(rows, "Temperature_C", 27.0)
+    rainfall    = _condition_column(rows, "Rainfall_mm", 850.0)
+    soil_ph     = _condition_column(rows, "Soil_pH", 7.0)
+    scores = score_environment(
+        temperature, rainfall, soil_ph, crop_names,
+        np.asarray(predicted_yields, dtype=np.float64)
+    )
+
+    adjusted = scores["adjusted_yield"].tolist()
+    risk     = RISK_LEVELS[scores["risk"]].tolist()
+    codes    = scores["codes"].tolist()
+    temp_raw = scores["temp_penalty_raw"].tolist()
+    temperature, rainfall, soil_ph = temperature.tolist(), rainfall.tolist(), soil_ph.tolist()
+
+    results = []
+    for i, crop_name in enumerate(crop_names):
+        warnings: list[str] = []
+        temp_code, rain_code, ph_code = codes[i]
+        if temp_code or rain_code or ph_code:
+            ranges = CROP_RANGES.get(crop_name, DEFAULT_RANGES)
+            if temp_code:
+                warnings.append(_temperature_warning(temp_code, temperature[i], temp_raw[i], ranges))
+            if rain_code:
+                warnings.append(_rainfall_warning(rain_code, rainfall[i], ranges))
+            if ph_code:
+                warnings.append(_ph_warning(ph_code, soil_ph[i], ranges))
+        results.append({
+            "adjusted_yield": adjusted[i],
+            "risk_level":     risk[i],
+            "warnings":       warnings
+        })
+    return results
 
 
 # ─── Advisory Generator ─────────────────────────────────────────────────────────
+# Advisories are a declarative rule table compiled once at import. Evaluating
+# it yields a bitmask / list of advisory IDs per (farm, crop) pair; messages
+# are rendered from ADVISORY_TEMPLATES only when text is requested, and each
+# rendered message is cached per (template, crop, params).
+
+ADVISORY_TEMPLATES: dict[str, str] = {
+    # Temperature
+    "high_temperature": (
+        "🌡️ High temperature detected. Consider mulching to retain soil moisture "
+        "and reduce surface heat stress on roots."
+    ),
+    "extreme_heat": (
+        "☀️ Extreme heat alert. Use shade nets or row covers during peak afternoon "
+        "hours to protect crops from scorching."
+    ),
+    "low_temperature": (
+        "🥶 Low temperature detected. Use frost covers or plastic mulch at night "
+        "to retain ground warmth and protect seedlings."
+    ),
+    "frost_risk": (
+        "❄️ Frost risk. Delay sowing until temperatures stabilize. "
+        "Consider a greenhouse start for seedlings."
+    ),
+    # Rainfall
+    "excessive_rainfall": (
+        "🌧️ Excessive rainfall. Reduce irrigation frequency and ensure proper "
+        "field drainage to prevent waterlogging and root rot."
+    ),
+    "drainage_channels": (
+        "💧 Consider creating raised beds or drainage channels to channel "
+        "excess water away from the root zone."
+    ),
+    "above_ideal_rainfall": (
+        "🌦️ Above-ideal rainfall. Reduce irrigation frequency and monitor "
+        "fields for early signs of waterlogging."
+    ),
+    "low_rainfall": (
+        "🏜️ Critically low rainfall. Increase irrigation frequency and consider "
+        "drip irrigation to conserve water and maintain root moisture."
+    ),
+    # Soil pH
+    "acidic_soil": (
+        "🧪 Soil is too acidic (pH {soil_ph}). Apply agricultural lime (calcium "
+        "carbonate) to raise pH towards the ideal range of {ideal_min_ph}–{ideal_max_ph}."
+    ),
+    "alkaline_soil": (
+        "🧪 Soil is too alkaline (pH {soil_ph}). Apply elemental sulfur or "
+        "acidifying fertilizers to lower pH towards {ideal_min_ph}–{ideal_max_ph}."
+    ),
+    # Irrigation type
+    "switch_from_flood": (
+        "🚿 Switch from flood irrigation to drip or sprinkler systems during "
+        "high-rainfall periods to avoid over-saturation."
+    ),
+    "rainfed_drought": (
+        "💦 Rainfed irrigation is insufficient under current drought conditions. "
+        "Install supplemental drip or sprinkler irrigation urgently."
+    ),
+    # Fertilizer
+    "high_fertilizer": (
+        "⚗️ Fertilizer usage is very high. Excess nitrogen can cause leaf burn "
+        "and runoff pollution. Consider a split application schedule."
+    ),
+    "low_fertilizer": (
+        "🌿 Fertilizer level is low for {crop}. Increase application "
+        "gradually and consider a soil nutrient test before the next season."
+    ),
+    # Soil type
+    "sandy_soil": (
+        "🪨 Sandy soil drains quickly. Add organic compost or mulch to improve "
+        "water retention and nutrient-holding capacity."
+    ),
+    "clay_soil": (
+        "🟤 Clay soil retains excess moisture. Improve aeration by adding "
+        "organic matter or sand to prevent compaction and root rot."
+    ),
+    "peaty_soil": (
+        "🌱 Peaty soil is naturally acidic. Monitor pH closely and apply lime "
+        "periodically, especially for pH-sensitive crops."
+    ),
+    # Season
+    "off_season_summer": (
+        "📅 {crop} is generally not ideal for summer growing. "
+        "Consider switching to a Rabi or Kharif season for better yield."
+    ),
+    "potato_kharif": (
+        "📅 Potato performs best in Rabi season (cool weather). "
+        "Kharif planting may reduce tuber quality and yield."
+    ),
+    # No issues found
+    "conditions_good": (
+        "✅ Farm conditions look good for {crop}. "
+        "Maintain current practices and monitor the crop weekly."
+    ),
+}
+# ─── Advisory Rules ───────────────────────────────────────────────────────────
+# (template id, conditions, crop filter), in display order. A rule fires when
+# all of its conditions hold and the crop passes the filter (None = any crop).
+# Each condition is (field, operator, threshold):
+#   field      temperature | rainfall | soil_ph | fertilizer      (numeric)
+#              irrigation | soil_type | season                   (lower-cased text)
+#   operator   ">", "<", "<=", "==", or "contains" (substring, text fields only)
+#   threshold  a number or string, or (bound, offset) for temperature / rainfall /
+#              soil_ph, where bound is one of the crop's CROP_RANGES values:
+#              "min" | "ideal_min" | "ideal_max" | "max"
+# FALLBACK_ADVISORY is returned when no rule fires.
+
+ADVISORY_RULES: list[tuple[str, list[tuple], tuple[str, ...] | None]] = [
+    # Temperature
+    ("high_temperature",     [("temperature", ">", ("ideal_max", 0))], None),
+    ("extreme_heat",         [("temperature", ">", ("ideal_max", 5))], None),
+    ("low_temperature",      [("temperature", "<", ("ideal_min", 0))], None),
+    ("frost_risk",           [("temperature", "<", ("ideal_min", -5))], None),
+    # Rainfall
+    ("excessive_rainfall",   [("rainfall", ">", ("max", 0))], None),
+    ("drainage_channels",    [("rainfall", ">", ("max", 0))], None),
+    ("above_ideal_rainfall", [("rainfall", ">", ("ideal_max", 0)),
+                              ("rainfall", "<=", ("max", 0))], None),
+    ("low_rainfall",         [("rainfall", "<", ("min", 0))], None),
+    # Soil pH
+    ("acidic_soil",          [("soil_ph", "<", ("ideal_min", 0))], None),
+    ("alkaline_soil",        [("soil_ph", ">", ("ideal_max", 0))], None),
+    # Irrigation type
+    ("switch_from_flood",    [("rainfall", ">", ("ideal_max", 0)),
+                              ("irrigation", "==", "flood")], None),
+    ("rainfed_drought",      [("irrigation", "==", "rainfed"),
+                              ("rainfall", "<", ("min", 0))], None),
+    # Fertilizer
+    ("high_fertilizer",      [("fertilizer", ">", 180)], None),
+    ("low_fertilizer",       [("fertilizer", "<", 40)], None),
+    # Soil type
+    ("sandy_soil",           [("soil_type", "==", "sandy")], None),
+    ("clay_soil",            [("soil_type", "==", "clay")], None),
+    ("peaty_soil",           [("soil_type", "==", "peaty")], None),
+    # Season
+    ("off_season_summer",    [("season", "contains", "summer")], ("Wheat", "Potato")),
+    ("potato_kharif",        [("season", "contains", "kharif")], ("Potato",)),
+]
+FALLBACK_ADVISORY = "conditions_good"
+
+# field → (input column, default value, numeric?)
+_RULE_FIELDS: dict[str, tuple[str, Any, bool]] = {
+    "temperature": ("Temperature_C",      27.0,  True),
+    "rainfall":    ("Rainfall_mm",        850.0, True),
+    "soil_ph":     ("Soil_pH",            7.0,   True),
+    "fertilizer":  ("Fertilizer_Used_kg", 110.0, True),
+    "irrigation":  ("Irrigation_Type",    "",    False),
+    "soil_type":   ("Soil_Type",          "",    False),
+    "season":      ("Season",             "",    False),
+}
+_RANGE_BOUNDS = ("min", "ideal_min", "ideal_max", "max")
+_OPERATORS = {">": np.greater, "<": np.less, "<=": np.less_equal, "==": np.equal}
 
-def generate_advisories(input_data: dict[str, Any], crop_name: str) -> list[str]:
+
+class AdvisoryRuleTable:
+    """
+    ADVISORY_RULES compiled for vectorized evaluation: range-bound thresholds
+    become per-RANGE_TABLE-row arrays and crop filters per-row boolean masks,
+    so a rule costs a few array operations regardless of the batch size.
+    Rule i sets bit i; the fallback advisory takes the bit after the last rule.
     """
-    Generates farmer-friendly actionable advisory messages based on
-    farm conditions and crop-specific thresholds.
 
-    Covers: temperature, rainfall, soil pH, irrigation, fertilizer,
-            soil type, and seasonal guidance.
+    def __init__(self, rules: list[tuple[str, list[tuple], tuple[str, ...] | None]], fallback: str):
+        if len(rules) + 1 > 32:
+            raise ValueError("At most 31 advisory rules fit in a uint32 mask")
+
+        self.ids = [template_id for template_id, _, _ in rules] + [fallback]
+        self.fallback_bit = np.uint32(1 << len(rules))
+        self._fields: set[str] = set()
+        self._rules = []
+        for template_id, conditions, crops in rules:
+            if template_id not in ADVISORY_TEMPLATES:
+                raise ValueError(f"Advisory rule references unknown template '{template_id}'")
+            compiled = [self._compile_condition(*condition) for condition in conditions]
+            crop_mask = None
+            if crops is not None:
+                crop_mask = np.array([crop in crops for crop in ENGINE_CROPS] + [False])
+            self._rules.append((compiled, crop_mask))
+
+    def _compile_condition(self, field: str, operator: str, threshold: Any) -> tuple:
+        if field not in _RULE_FIELDS:
+            raise ValueError(f"Unknown advisory rule field '{field}'")
+        numeric = _RULE_FIELDS[field][2]
+        if operator == "contains":
+            if numeric:
+                raise ValueError(f"'contains' needs a text field, got '{field}'")
+        elif operator not in _OPERATORS:
+            raise ValueError(f"Unknown advisory rule operator '{operator}'")
+
+        if isinstance(threshold, tuple):
+            bound, offset = threshold
+            if field not in FACTORS or bound not in _RANGE_BOUNDS:
+                raise ValueError(f"Invalid range bound {threshold!r} for field '{field}'")
+            # One threshold per RANGE_TABLE row, picked per pair by crop row
+            threshold = RANGE_TABLE[:, FACTORS.index(field), _RANGE_BOUNDS.index(bound)] + offset
+            by_crop = True
+        else:
+            by_crop = False
+
+        self._fields.add(field)
+        return field, operator, threshold, by_crop
+
+    def _columns(self, rows: list[dict[str, Any]]) -> dict[str, Any]:
+        columns = {}
+        for field in self._fields:
+            column, default, numeric = _RULE_FIELDS[field]
+            if numeric:
+                columns[field] = _condition_column(rows, column, default)
+            else:
+                columns[field] = [str(row.get(column, default)).lower() for row in rows]
+        return columns
+
+    def masks(self, rows: list[dict[str, Any]], crop_names: list[str]) -> np.ndarray:
+        """uint32 bitmask per (farm, crop) pair; bit i set ⇔ self.ids[i] applies."""
+        crop_row = crop_rows(crop_names)
+        columns = self._columns(rows)
+        text_arrays: dict[str, np.ndarray] = {}
+
+        bits = np.zeros((len(rows), 32), dtype=bool)
+        for i, (conditions, crop_mask) in enumerate(self._rules):
+            fired = np.ones(len(rows), dtype=bool) if crop_mask is None else crop_mask[crop_row]
+            for field, operator, threshold, by_crop in conditions:
+                values = columns[field]
+                if operator == "contains":
+                    hit = np.array([threshold in value for value in values], dtype=bool)
+                else:
+                    if isinstance(values, list):
+                        if field not in text_arrays:
+                            text_arrays[field] = np.array(values, dtype=str)
+                        values = text_arrays[field]
+                    hit = _OPERATORS[operator](values, threshold[crop_row] if by_crop else threshold)
+                fired &= hit
+            bits[:, i] = fired
+
+        # Pack the bool columns little-endian into one uint32 per pair
+        mask = np.packbits(bits, axis=1, bitorder="little").view("<u4")[:, 0].copy()
+        mask[mask == 0] = self.fallback_bit
+        return mask
+
+    def ids_for(self, mask: int) -> list[str]:
+        """Advisory IDs for the bits set in `mask`, in display order."""
+        return [advisory_id for i, advisory_id in enumerate(self.ids) if mask >> i & 1]
+
+
+_ADVISORY_TABLE = AdvisoryRuleTable(ADVISORY_RULES, FALLBACK_ADVISORY)
+ADVISORY_IDS = _ADVISORY_TABLE.ids
+ADVISORY_BITS = {advisory_id: 1 << i for i, advisory_id in enumerate(ADVISORY_IDS)}
+
+
+# ─── Message Rendering ────────────────────────────────────────────────────────
+# Values the templates may reference, computed from (farm row, crop)
+_TEMPLATE_PARAMS: dict[str, Callable[[dict[str, Any], str], Any]] = {
+    "crop":         lambda row, crop: crop,
+    "soil_ph":      lambda row, crop: float(row.get("Soil_pH", 7.0)),
+    "ideal_min_ph": lambda row, crop: CROP_RANGES.get(crop, DEFAULT_RANGES)["soil_ph"][1],
+    "ideal_max_ph": lambda row, crop: CROP_RANGES.get(crop, DEFAULT_RANGES)["soil_ph"][2],
+}
+# Placeholders used by each template, in order
+_TEMPLATE_FIELDS: dict[str, tuple[str, ...]] = {
+    template_id: tuple(dict.fromkeys(
+        name for _, name, _, _ in string.Formatter().parse(template) if name
+    ))
+    for template_id, template in ADVISORY_TEMPLATES.items()
+}
 
-    Args:
-        input_data (dict): Preprocessed farm condition fields.
-        crop_name  (str):  Target crop name.
+
+@lru_cache(maxsize=8192)
+def _render(template_id: str, params: tuple) -> str:
+    """Formats one advisory message; `params` are the values of its placeholders."""
+    return ADVISORY_TEMPLATES[template_id].format(**dict(zip(_TEMPLATE_FIELDS[template_id], params)))
+
+
+def render_advisories(advisory_ids: list[str], input_data: dict[str, Any], crop_name: str) -> list[str]:
+    """Renders advisory IDs (from advisory_ids_batch) into farmer-facing messages."""
+    return [
+        _render(advisory_id, tuple(
+            _TEMPLATE_PARAMS[name](input_data, crop_name) for name in _TEMPLATE_FIELDS[advisory_id]
+        ))
+        for advisory_id in advisory_ids
+    ]
+
+
+def advisory_masks(rows: list[dict[str, Any]], crop_names: list[str]) -> np.ndarray:
+    """
+    Evaluates every advisory rule for n (farm, crop) pairs at once.
 
     Returns:
-        list[str]: Ordered list of plain-language advisory suggestions.
+        np.ndarray: uint32 bitmask per pair; bit i set ⇔ ADVISORY_IDS[i] applies.
     """
-    advisories: list[str] = []
-    ranges = CROP_RANGES.get(crop_name, DEFAULT_RANGES)
-    ideal  = IDEAL_CONDITIONS.get(crop_name, {})
-
-    temp       = float(input_data.get("Temperature_C", 27.0))
-    rainfall   = float(input_data.get("Rainfall_mm", 850.0))
-    soil_ph    = float(input_data.get("Soil_pH", 7.0))
-    irrigation = str(input_data.get("Irrigation_Type", "")).lower()
-    fertilizer = float(input_data.get("Fertilizer_Used_kg", 110.0))
-    soil_type  = str(input_data.get("Soil_Type", "")).lower()
-    season     = str(input_data.get("Season", "")).lower()
-
-    _, ideal_min_temp, ideal_max_temp, _ = ranges["temperature"]
-    _, _, ideal_max_rain, max_rain       = ranges["rainfall"]
-    _, ideal_min_ph, ideal_max_ph, _     = ranges["soil_ph"]
-
-    # ── Temperature advisories ────────────────────────────────────────────────
-    if temp > ideal_max_temp:
-        advisories.append(
-            "🌡️ High temperature detected. Consider mulching to retain soil moisture "
-            "and reduce surface heat stress on roots."
-        )
-        if temp > ideal_max_temp + 5:
-            advisories.append(
-                "☀️ Extreme heat alert. Use shade nets or row covers during peak afternoon "
-                "hours to protect crops from scorching."
-            )
-    elif temp < ideal_min_temp:
-        advisories.append(
-            "🥶 Low temperature detected. Use frost covers or plastic mulch at night "
-            "to retain ground warmth and protect seedlings."
-        )
-        if temp < ideal_min_temp - 5:
-            advisories.append(
-                "❄️ Frost risk. Delay sowing until temperatures stabilize. "
-                "Consider a greenhouse start for seedlings."
-            )
-
-    # ── Rainfall advisories ───────────────────────────────────────────────────
-    if rainfall > max_rain:
-        advisories.append(
-            "🌧️ Excessive rainfall. Reduce irrigation frequency and ensure proper "
-            "field drainage to prevent waterlogging and root rot."
-        )
-        advisories.append(
-            "💧 Consider creating raised beds or drainage channels to channel "
-            "excess water away from the root zone."
-        )
-    elif rainfall > ideal_max_rain:
-        advisories.append(
-            "🌦️ Above-ideal rainfall. Reduce irrigation frequency and monitor "
-            "fields for early signs of waterlogging."
-        )
-    elif rainfall < ranges["rainfall"][0]:
-        advisories.append(
-            "🏜️ Critically low rainfall. Increase irrigation frequency and consider "
-            "drip irrigation to conserve water and maintain root moisture."
-        )
+    return _ADVISORY_TABLE.masks(rows, crop_names)
 
-    # ── Soil pH advisories ────────────────────────────────────────────────────
-    if soil_ph < ideal_min_ph:
-        advisories.append(
-            f"🧪 Soil is too acidic (pH {soil_ph}). Apply agricultural lime (calcium "
-            f"carbonate) to raise pH towards the ideal range of {ideal_min_ph}–{ideal_max_ph}."
-        )
-    elif soil_ph > ideal_max_ph:
-        advisories.append(
-            f"🧪 Soil is too alkaline (pH {soil_ph}). Apply elemental sulfur or "
-            f"acidifying fertilizers to lower pH towards {ideal_min_ph}–{ideal_max_ph}."
-        )
 
-    # ── Irrigation type advisories ────────────────────────────────────────────
-    if rainfall > ideal_max_rain and irrigation == "flood":
-        advisories.append(
-            "🚿 Switch from flood irrigation to drip or sprinkler systems during "
-            "high-rainfall periods to avoid over-saturation."
-        )
-    if irrigation == "rainfed" and rainfall < ranges["rainfall"][0]:
-        advisories.append(
-            "💦 Rainfed irrigation is insufficient under current drought conditions. "
-            "Install supplemental drip or sprinkler irrigation urgently."
-        )
+def advisory_ids_batch(rows: list[dict[str, Any]], crop_names: list[str]) -> list[list[str]]:
+    """Triggered advisory IDs per (farm, crop) pair, in display order."""
+    if len(rows) != len(crop_names):
+        raise ValueError("rows and crop_names must have the same length")
+    return [_ids_for_mask(mask) for mask in advisory_masks(rows, crop_names).tolist()]
 
-    # ── Fertilizer advisories ─────────────────────────────────────────────────
-    if fertilizer > 180:
-        advisories.append(
-            "⚗️ Fertilizer usage is very high. Excess nitrogen can cause leaf burn "
-            "and runoff pollution. Consider a split application schedule."
-        )
-    elif fertilizer < 40:
-        advisories.append(
-            f"🌿 Fertilizer level is low for {crop_name}. Increase application "
-            f"gradually and consider a soil nutrient test before the next season."
-        )
 
-    # ── Soil type advisories ──────────────────────────────────────────────────
-    if soil_type == "sandy":
-        advisories.append(
-            "🪨 Sandy soil drains quickly. Add organic compost or mulch to improve "
-            "water retention and nutrient-holding capacity."
-        )
-    elif soil_type == "clay":
-        advisories.append(
-            "🟤 Clay soil retains excess moisture. Improve aeration by adding "
-            "organic matter or sand to prevent compaction and root rot."
-        )
-    elif soil_type == "peaty":
-        advisories.append(
-            "🌱 Peaty soil is naturally acidic. Monitor pH closely and apply lime "
-            "periodically, especially for pH-sensitive crops."
-        )
+@lru_cache(maxsize=4096)
+def _ids_for_mask(mask: int) -> tuple[str, ...]:
+    return tuple(_ADVISORY_TABLE.ids_for(mask))
 
-    # ── Seasonal advisories ───────────────────────────────────────────────────
-    if "summer" in season and crop_name in ("Wheat", "Potato"):
-        advisories.append(
-            f"📅 {crop_name} is generally not ideal for summer growing. "
-            f"Consider switching to a Rabi or Kharif season for better yield."
-        )
-    if "kharif" in season and crop_name == "Potato":
-        advisories.append(
-            "📅 Potato performs best in Rabi season (cool weather). "
-            "Kharif planting may reduce tuber quality and yield."
-        )
 
-    # ── No issues found ───────────────────────────────────────────────────────
-    if not advisories:
-        advisories.append(
-            f"✅ Farm conditions look good for {crop_name}. "
-            f"Maintain current practices and monitor the crop weekly."
-        )
+def generate_advisories_batch(
+    rows: list[dict[str, Any]],
+    crop_names: list[str],
+    ids_only: bool = False
+) -> list[list[str]]:
+    """
+    Vectorized generate_advisories: the i-th list is
+    generate_advisories(rows[i], crop_names[i], ids_only).
+    """
+    ids = advisory_ids_batch(rows, crop_names)
+    if ids_only:
+        return [list(advisory_ids) for advisory_ids in ids]
+    return [
+        render_advisories(advisory_ids, row, crop_name)
+        for advisory_ids, row, crop_name in zip(ids, rows, crop_names)
+    ]
+
+
+def generate_advisories(input_data: dict[str, Any], crop_name: str, ids_only: bool = False) -> list[str]:
+    """
+    Generates farmer-friendly actionable advisory messages based on
+    farm conditions and crop-specific thresholds.
+
+    Covers: temperature, rainfall, soil pH, irrigation, fertilizer,
+            soil type, and seasonal guidance.
+
+    Args:
+        input_data (dict): Preprocessed farm condition fields.
+        crop_name  (str):  Target crop name.
+        ids_only   (bool): Return advisory IDs (keys of ADVISORY_TEMPLATES)
+                           instead of rendered messages.
 
-    return advisories
+    Returns:
+        list[str]: Ordered list of plain-language advisory suggestions (or IDs).
+    """
+    return generate_advisories_batch([input_data], [crop_name], ids_only)[0]
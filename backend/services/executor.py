@@ -0,0 +1,182 @@
+# ─── services/executor.py ─────────────────────────────────────────────────────
+# Executor layer for CPU-bound endpoint work.
+#
+# FastAPI endpoints are `async def`, so calling model inference, pandas or the
+# optimizer directly blocks the event loop and stalls every other request on
+# the worker. Endpoints instead dispatch that work here:
+#   run_in_thread(fn, ...)   → thread pool (NumPy / sklearn release the GIL)
+#   run_in_process(fn, ...)  → process pool with the optimizer preloaded in
+#                              each worker; falls back to the thread pool when
+#                              no process workers are configured
+#
+# Each pool has a bounded queue: once `workers + EXECUTOR_MAX_QUEUE` tasks are
+# in flight, new submissions raise ExecutorSaturated (mapped to HTTP 503).
+#
+# Configuration (environment variables):
+#   EXECUTOR_THREADS    thread pool size (default 8)
+#   EXECUTOR_PROCESSES  process pool size (default 0 = run optimizer in threads)
+#   EXECUTOR_MAX_QUEUE  tasks allowed to wait per pool beyond its workers (default 64)
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+EXECUTOR_THREADS   = int(os.getenv("EXECUTOR_THREADS", "8"))
+EXECUTOR_PROCESSES = int(os.getenv("EXECUTOR_PROCESSES", "0"))
+EXECUTOR_MAX_QUEUE = int(os.getenv("EXECUTOR_MAX_QUEUE", "64"))
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when a pool already has its maximum number of queued tasks."""
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict) -> tuple[float, Any]:
+    """Runs fn in the worker and reports when it actually started (wall clock)."""
+    started_at = time.time()
+    return started_at, fn(*args, **kwargs)
+
+
+def _init_process_worker() -> None:
+    """Process pool initializer: import the optimizer (builds its vertex tables)."""
+    import services.optimizer  # noqa: F401
+
+
+class BoundedPool:
+    """
+    Wraps a concurrent.futures executor with admission control and counters.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Executor], workers: int, max_queue: int):
+        self.name      = name
+        self.workers   = workers
+        self.capacity  = workers + max_queue
+        self._factory  = factory
+        self._executor: Executor | None = None
+        self._lock     = threading.Lock()
+
+        self.in_flight = self.peak_in_flight = 0
+        self.submitted = self.completed = self.failed = self.rejected = 0
+        self.wait_seconds = self.run_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._factory()
+        return self._executor
+
+    async def run(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                self.rejected += 1
+                raise ExecutorSaturated(
+                    f"Server is busy ({self.name} pool has {self.in_flight} tasks in flight). "
+                    "Please retry shortly."
+                )
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.submitted += 1
+
+        # _on_done releases the slot, but only once a future exists: if the
+        # executor can't be created or refuses the task (broken process pool,
+        # shut down during a reload), release it here
+        submitted_at = time.time()
+        try:
+            with self._lock:
+                executor = self._get_executor()
+            future = executor.submit(_timed_call, fn, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self.in_flight -= 1
+                self.failed += 1
+            raise
+        future.add_done_callback(functools.partial(self._on_done, submitted_at))
+        _, result = await asyncio.wrap_future(future)
+        return result
+
+    def _on_done(self, submitted_at: float, future: Future) -> None:
+        finished_at = time.time()
+        with self._lock:
+            self.in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+                return
+            started_at, _ = future.result()
+            self.completed += 1
+            self.wait_seconds += max(0.0, started_at - submitted_at)
+            self.run_seconds  += max(0.0, finished_at - started_at)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            done = self.completed or 1
+            return {
+                "workers":         self.workers,
+                "capacity":        self.capacity,
+                "in_flight":       self.in_flight,
+                "peak_in_flight":  self.peak_in_flight,
+                "saturation":      round(self.in_flight / self.capacity, 4) if self.capacity else 0.0,
+                "submitted":       self.submitted,
+                "completed":       self.completed,
+                "failed":          self.failed,
+                "rejected":        self.rejected,
+                "avg_wait_ms":     round(self.wait_seconds / done * 1000, 3),
+                "avg_run_ms":      round(self.run_seconds / done * 1000, 3),
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_thread_pool = BoundedPool(
+    "thread",
+    lambda: ThreadPoolExecutor(max_workers=EXECUTOR_THREADS, thread_name_prefix="cpu"),
+    workers=EXECUTOR_THREADS,
+    max_queue=EXECUTOR_MAX_QUEUE,
+)
+
+# "spawn" avoids forking a process that already runs the event loop and threads
+_process_pool = BoundedPool(
+    "process",
+    lambda: ProcessPoolExecutor(
+        max_workers=EXECUTOR_PROCESSES,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_process_worker,
+    ),
+    workers=EXECUTOR_PROCESSES,
+    max_queue=EXECUTOR_MAX_QUEUE,
+) if EXECUTOR_PROCESSES > 0 else None
+
+
+async def run_in_thread(fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Runs fn(*args, **kwargs) in the thread pool without blocking the event loop."""
+    return await _thread_pool.run(fn, *args, **kwargs)
+
+
+async def run_in_process(fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    """
+    Runs fn(*args, **kwargs) in the process pool (fn and its arguments must be
+    picklable). Uses the thread pool when EXECUTOR_PROCESSES is 0.
+    """
+    pool = _process_pool or _thread_pool
+    return await pool.run(fn, *args, **kwargs)
+
+
+def executor_stats() -> dict[str, Any]:
+    """Pool sizes, queue depth and saturation counters for every pool."""
+    stats = {"thread": _thread_pool.stats()}
+    if _process_pool is not None:
+        stats["process"] = _process_pool.stats()
+    return stats
+
+
+def shutdown() -> None:
+    """Stops all pools; called from the app's lifespan on shutdown."""
+    _thread_pool.shutdown()
+    if _process_pool is not None:
+        _process_pool.shutdown()
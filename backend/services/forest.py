@@ -0,0 +1,405 @@
+# ─── services/forest.py ───────────────────────────────────────────────────────
+# Flat-array random forest evaluator.
+#
+# compile_forest() packs every tree of a fitted sklearn RandomForestClassifier /
+# RandomForestRegressor into shared node arrays (feature, threshold, interleaved
+# children, value). FlatForest walks all trees for a whole batch of rows at once
+# with NumPy fancy indexing, skipping sklearn's per-call validation and joblib
+# dispatch. Results match sklearn exactly: features are compared as float32
+# (like sklearn's tree code) and per-tree outputs are accumulated in tree order.
+#
+# A compiled forest is saved as a directory with one uncompressed .npy file
+# per array plus meta.json. load_forest() memory-maps the arrays read-only,
+# so every uvicorn/gunicorn worker on a host shares the same page-cache
+# copy of the trees instead of holding a private unpickled model each.
+#
+# Export options for memory-constrained hosts (compile_models.py flags):
+#   quantize  (compile_forest(quantize=True)) stores features as int16,
+#             children as int32 and thresholds as float32 rounded down.
+#             Inputs are compared as float32, so `x > t` and
+#             `x > float32_floor(t)` always agree. Classifier leaves hold
+#             integer class counts instead of float64 fractions, but only
+#             when count / total reproduces every fraction bit for bit.
+#             Otherwise, and for regressor leaves that float32 can't hold
+#             exactly, values stay float64.
+#   prune     (prune_forest) removes splits that can't change any prediction:
+#             branches that the ancestors' thresholds on the same feature make
+#             unreachable, and splits whose two children are leaves with the
+#             same output.
+#   truncate  (prune_forest(max_trees=n)) keeps the first n trees. Unlike the
+#             other two options, this changes predictions.
+
+import json
+import os
+import shutil
+import time
+from typing import Any
+
+import numpy as np
+
+# Arrays stored in the compiled artifact, one <key>.npy file each
+_ARRAY_KEYS = ("feature", "threshold", "children", "value", "roots", "classes")
+_META_FILE = "meta.json"
+_FORMAT_VERSION = 2
+
+# Batches at least this large are evaluated tree-by-tree instead of all at once
+_PER_TREE_MIN_ROWS = 512
+
+
+class FlatForest:
+    """
+    A compiled random forest. Mirrors the sklearn methods the services use:
+    `predict`, `predict_proba` (classifier only) and `classes_`.
+
+    Leaf nodes point to themselves (left == right == node) with an infinite
+    threshold, so every row can take the same number of steps (max_depth).
+    Arrays may be read-only memory maps; they are never written to.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        classes: np.ndarray,
+        max_depth: int,
+    ):
+        if kind not in ("classifier", "regressor"):
+            raise ValueError(f"Unknown forest kind '{kind}'")
+        self.kind      = kind
+        self.feature   = feature
+        self.threshold = threshold
+        self.children  = children       # interleaved [left, right]: next = children[2 * node + went_right]
+        self.value     = value          # (n_nodes or n_leaves, n_outputs) per-tree leaf output
+        self.roots     = roots          # root node index of each tree
+        self.classes_  = classes
+        self.max_depth = int(max_depth)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the node arrays (what a worker maps or loads)."""
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.children, self.value, self.roots))
+
+    def leaf_output(self, nodes: np.ndarray) -> np.ndarray:
+        """Per-tree output of `nodes`: class probabilities or regression values."""
+        rows = self.value[nodes]
+        if rows.dtype.kind in "iu":
+            # Quantized classifier leaves hold class counts
+            rows = rows / rows.sum(axis=-1, keepdims=True)
+        return rows
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        """Returns the (n_rows, n_trees) leaf index reached in every tree."""
+        X = np.asarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_base = np.arange(n_rows, dtype=np.int64) * n_features
+
+        if n_rows < _PER_TREE_MIN_ROWS:
+            # Small batches: step every (row, tree) pair together
+            row_base = row_base[:, None]
+            node = np.repeat(self.roots[None, :].astype(np.int64), n_rows, axis=0)
+            for _ in range(self.max_depth):
+                x = flat_X.take(row_base + self.feature.take(node))
+                node = self.children.take(2 * node + (x > self.threshold.take(node)))
+            return node
+
+        # Large batches: one tree at a time keeps its nodes cache-resident
+        leaves = np.empty((n_rows, self.n_trees), dtype=np.int64)
+        for t, root in enumerate(self.roots):
+            node = np.full(n_rows, root, dtype=np.int64)
+            for _ in range(self.max_depth):
+                x = flat_X.take(row_base + self.feature.take(node))
+                node = self.children.take(2 * node + (x > self.threshold.take(node)))
+            leaves[:, t] = node
+        return leaves
+
+    def _accumulate(self, X: np.ndarray) -> np.ndarray:
+        """Averages per-tree leaf outputs, summing in tree order like sklearn."""
+        leaves = self._leaves(X)
+        total = np.zeros((leaves.shape[0], self.value.shape[1]), dtype=np.float64)
+        if self.value.dtype.kind in "iu":
+            # Class counts: normalize every (row, tree) at once, then sum in order
+            outputs = self.leaf_output(leaves)
+            for t in range(self.n_trees):
+                total += outputs[:, t]
+        else:
+            for t in range(self.n_trees):
+                total += self.value[leaves[:, t]]
+        total /= self.n_trees
+        return total
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if self.kind != "classifier":
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._accumulate(X)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        output = self._accumulate(X)
+        if self.kind == "classifier":
+            return self.classes_.take(output.argmax(axis=1))
+        return output[:, 0]
+
+
+def _float32_floor(threshold: np.ndarray) -> np.ndarray:
+    """Largest float32 <= each threshold: `x > t` is unchanged for every float32 x."""
+    rounded = threshold.astype(np.float32)
+    return np.where(rounded > threshold, np.nextafter(rounded, np.float32(-np.inf)), rounded)
+
+
+def _class_counts(fractions: np.ndarray, weighted_samples: np.ndarray) -> np.ndarray | None:
+    """
+    Integer class counts whose count / total reproduces `fractions` bit for
+    bit, or None (fractional sample weights, or counts too large for uint32).
+    """
+    counts = np.rint(fractions * weighted_samples[:, None])
+    if counts.max(initial=0) > np.iinfo(np.uint32).max:
+        return None
+    if not np.array_equal(counts / counts.sum(axis=1, keepdims=True), fractions):
+        return None
+    return counts.astype(np.uint16 if counts.max(initial=0) <= np.iinfo(np.uint16).max else np.uint32)
+
+
+def compile_forest(estimator: Any, quantize: bool = False) -> FlatForest:
+    """
+    Packs a fitted single-output sklearn random forest into a FlatForest.
+
+    Classifier leaf values become class probabilities exactly as
+    DecisionTreeClassifier.predict_proba returns them; regressor leaf values
+    are the raw leaf means.
+
+    Args:
+        estimator: Fitted RandomForestClassifier / RandomForestRegressor.
+        quantize: Store compact dtypes (see the module header); predictions
+            are unchanged.
+    """
+    is_classifier = hasattr(estimator, "classes_")
+    if getattr(estimator, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output forests can be compiled")
+
+    features, thresholds, lefts, rights, values, class_counts, roots = [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for tree_est in estimator.estimators_:
+        tree = tree_est.tree_
+        n = tree.node_count
+        node_ids = np.arange(n, dtype=np.int32)
+        is_leaf = tree.children_left == -1
+
+        feature = np.where(is_leaf, 0, tree.feature).astype(np.int32)
+        threshold = np.where(is_leaf, np.inf, tree.threshold).astype(np.float64)
+        left  = np.where(is_leaf, node_ids, tree.children_left).astype(np.int32) + offset
+        right = np.where(is_leaf, node_ids, tree.children_right).astype(np.int32) + offset
+
+        value = tree.value[:, 0, :].astype(np.float64)
+        if is_classifier:
+            # Older sklearn stores class counts and normalizes in predict_proba;
+            # newer versions already store fractions, which are kept bit-exact.
+            normalizer = value.sum(axis=1)
+            counts = ~np.isclose(normalizer, 1.0) & (normalizer > 0.0)
+            value[counts] /= normalizer[counts][:, None]
+            if quantize:
+                class_counts.append(_class_counts(value, tree.weighted_n_node_samples))
+
+        features.append(feature)
+        thresholds.append(threshold)
+        lefts.append(left)
+        rights.append(right)
+        values.append(value)
+        roots.append(offset)
+        offset += n
+        max_depth = max(max_depth, tree.max_depth)
+
+    classes = np.asarray(estimator.classes_) if is_classifier else np.empty(0)
+
+    children = np.empty(2 * offset, dtype=np.int32 if quantize else np.int64)
+    children[0::2] = np.concatenate(lefts)
+    children[1::2] = np.concatenate(rights)
+
+    feature = np.concatenate(features)
+    threshold = np.concatenate(thresholds)
+    value = np.concatenate(values)
+    if quantize:
+        if feature.max(initial=0) <= np.iinfo(np.int16).max:
+            feature = feature.astype(np.int16)
+        threshold = _float32_floor(threshold)
+        if is_classifier and all(c is not None for c in class_counts):
+            value = np.concatenate(class_counts)
+        elif np.array_equal(value.astype(np.float32).astype(np.float64), value):
+            value = value.astype(np.float32)
+
+    return FlatForest(
+        kind="classifier" if is_classifier else "regressor",
+        feature=feature,
+        threshold=threshold,
+        children=children,
+        value=np.ascontiguousarray(value),
+        roots=np.asarray(roots, dtype=np.int32),
+        classes=classes,
+        max_depth=max_depth,
+    )
+
+
+def prune_forest(forest: FlatForest, max_trees: int | None = None) -> FlatForest:
+    """
+    Rebuilds a forest without splits that can't change its output (see the
+    module header), keeping the node arrays' dtypes.
+
+    Nodes are renumbered leaves first (tree by tree), then internal nodes,
+    so `value` only needs a row per leaf: internal nodes' values are never
+    read.
+
+    Args:
+        forest: Compiled forest.
+        max_trees: Keep only the first `max_trees` trees (changes predictions).
+    """
+    n_trees = forest.n_trees if max_trees is None else max(1, min(max_trees, forest.n_trees))
+    children = forest.children
+
+    def simplify(node: int, bounds: dict[int, tuple[float, float]]):
+        """Returns node (a leaf) or (node, left subtree, right subtree); x in (lo, hi] per feature."""
+        if children[2 * node] == node:
+            return node
+        f, t = int(forest.feature[node]), forest.threshold[node]
+        lo, hi = bounds.get(f, (-np.inf, np.inf))
+        if hi <= t:    # every x that reaches here is <= t
+            return simplify(int(children[2 * node]), bounds)
+        if lo >= t:    # every x that reaches here is > t
+            return simplify(int(children[2 * node + 1]), bounds)
+        left = simplify(int(children[2 * node]), {**bounds, f: (lo, min(hi, t))})
+        right = simplify(int(children[2 * node + 1]), {**bounds, f: (max(lo, t), hi)})
+        if (
+            not isinstance(left, tuple) and not isinstance(right, tuple)
+            and np.array_equal(forest.leaf_output(left), forest.leaf_output(right))
+        ):
+            return left
+        return node, left, right
+
+    def count(subtree) -> tuple[int, int]:
+        if not isinstance(subtree, tuple):
+            return 1, 0
+        (l_leaves, l_splits), (r_leaves, r_splits) = count(subtree[1]), count(subtree[2])
+        return l_leaves + r_leaves, l_splits + r_splits + 1
+
+    trees = [simplify(int(root), {}) for root in forest.roots[:n_trees]]
+    sizes = [count(tree) for tree in trees]
+    n_leaves = sum(leaves for leaves, _ in sizes)
+    n_nodes = n_leaves + sum(splits for _, splits in sizes)
+
+    feature = np.zeros(n_nodes, dtype=forest.feature.dtype)
+    threshold = np.full(n_nodes, np.inf, dtype=forest.threshold.dtype)
+    new_children = np.empty(2 * n_nodes, dtype=children.dtype)
+    value = np.empty((n_leaves, forest.value.shape[1]), dtype=forest.value.dtype)
+    next_id = {"leaf": 0, "split": n_leaves}
+
+    def emit(subtree, depth: int) -> tuple[int, int]:
+        """Writes a subtree's nodes; returns (new index, subtree depth)."""
+        if not isinstance(subtree, tuple):
+            index = next_id["leaf"]
+            next_id["leaf"] += 1
+            new_children[2 * index] = new_children[2 * index + 1] = index
+            value[index] = forest.value[subtree]
+            return index, depth
+        index = next_id["split"]
+        next_id["split"] += 1
+        feature[index] = forest.feature[subtree[0]]
+        threshold[index] = forest.threshold[subtree[0]]
+        new_children[2 * index], left_depth = emit(subtree[1], depth + 1)
+        new_children[2 * index + 1], right_depth = emit(subtree[2], depth + 1)
+        return index, max(left_depth, right_depth)
+
+    roots, max_depth = [], 0
+    for tree in trees:
+        root, depth = emit(tree, 0)
+        roots.append(root)
+        max_depth = max(max_depth, depth)
+
+    return FlatForest(
+        kind=forest.kind,
+        feature=feature,
+        threshold=threshold,
+        children=new_children,
+        value=value,
+        roots=np.asarray(roots, dtype=forest.roots.dtype),
+        classes=forest.classes_,
+        max_depth=max_depth,
+    )
+
+
+def _source_signature(source_path: str) -> list[int]:
+    """Size and mtime of the .pkl a forest was compiled from."""
+    stat = os.stat(source_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def save_forest(forest: FlatForest, path: str, source_path: str) -> None:
+    """
+    Saves a compiled forest as a directory of .npy files next to the model
+    it was compiled from, recording the source file's size/mtime in
+    meta.json to detect stale artifacts.
+
+    The directory is written under a temporary name and renamed into place:
+    workers still mapping the previous arrays keep reading the old (now
+    unlinked) files instead of seeing them rewritten underneath them.
+    """
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    for key in _ARRAY_KEYS:
+        array = forest.classes_ if key == "classes" else getattr(forest, key)
+        np.save(os.path.join(tmp_path, f"{key}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+    with open(os.path.join(tmp_path, _META_FILE), "w") as f:
+        json.dump({
+            "format":    _FORMAT_VERSION,
+            "kind":      forest.kind,
+            "max_depth": forest.max_depth,
+            "source":    _source_signature(source_path),
+        }, f)
+
+    old_path = None
+    if os.path.exists(path):
+        old_path = f"{path}.old-{os.getpid()}-{time.time_ns()}"
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    if old_path is not None:
+        shutil.rmtree(old_path, ignore_errors=True)
+
+
+def forest_meta_path(path: str) -> str:
+    """meta.json of a saved forest — written last, so its mtime marks a new build."""
+    return os.path.join(path, _META_FILE)
+
+
+def load_forest(path: str, source_path: str, mmap: bool = True) -> FlatForest | None:
+    """
+    Loads a compiled forest, memory-mapping its arrays read-only unless
+    `mmap` is False. Returns None if it is missing, in an older format, or
+    was compiled from a different version of `source_path` (i.e. the model
+    was retrained without re-running compile_models.py).
+    """
+    try:
+        with open(forest_meta_path(path)) as f:
+            meta = json.load(f)
+        if meta.get("format") != _FORMAT_VERSION or meta["source"] != _source_signature(source_path):
+            return None
+        arrays = {
+            key: np.load(os.path.join(path, f"{key}.npy"), mmap_mode="r" if mmap else None, allow_pickle=False)
+            for key in _ARRAY_KEYS
+        }
+    except (FileNotFoundError, NotADirectoryError):
+        # Missing artifact, or the directory was swapped out mid-load
+        return None
+    return FlatForest(kind=meta["kind"], max_depth=meta["max_depth"], **arrays)
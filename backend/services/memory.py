@@ -0,0 +1,83 @@
+# ─── services/memory.py ───────────────────────────────────────────────────────
+# Per-worker memory report: how much of this process's resident memory is
+# private to it and how much is shared with other processes (e.g. the
+# memory-mapped forest arrays every uvicorn worker reads from the page cache).
+#
+# Reads /proc/self/smaps_rollup and /proc/self/smaps, so it is Linux-only;
+# elsewhere the report just says it is unavailable.
+
+import os
+from typing import Any
+
+_ROLLUP_PATH = "/proc/self/smaps_rollup"
+_SMAPS_PATH  = "/proc/self/smaps"
+_ROLLUP_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def _kb_fields(lines: list[str], fields: tuple[str, ...]) -> dict[str, int]:
+    values = dict.fromkeys(fields, 0)
+    for line in lines:
+        name, _, rest = line.partition(":")
+        if name in values:
+            values[name] += int(rest.split()[0])
+    return values
+
+
+def _mapped_files(prefix: str) -> dict[str, int]:
+    """Rss / shared kB of all mappings of files under `prefix`."""
+    totals = {"files": 0, "Size": 0, "Rss": 0, "Shared": 0}
+    in_prefix = False
+    with open(_SMAPS_PATH) as f:
+        for line in f:
+            head = line.split(maxsplit=5)
+            if len(head) >= 5 and "-" in head[0] and ":" not in head[0]:
+                # Mapping header: "start-end perms offset dev inode [path]"
+                in_prefix = len(head) == 6 and head[5].strip().startswith(prefix)
+                totals["files"] += in_prefix
+                continue
+            if not in_prefix:
+                continue
+            name, _, rest = line.partition(":")
+            if name == "Size" or name == "Rss":
+                totals[name] += int(rest.split()[0])
+            elif name in ("Shared_Clean", "Shared_Dirty"):
+                totals["Shared"] += int(rest.split()[0])
+    return totals
+
+
+def memory_report(mapped_prefix: str | None = None) -> dict[str, Any]:
+    """
+    Resident memory of this process, split into private and shared pages.
+
+    Args:
+        mapped_prefix (str): Optional directory; also reports how much of the
+            files mapped from under it (e.g. models/) is resident / shared.
+
+    Returns:
+        dict: pid, rss_mb, pss_mb (RSS with shared pages divided among the
+        processes sharing them), private_mb, shared_mb and, with
+        mapped_prefix, mapped_files / mapped_mb / mapped_rss_mb / mapped_shared_mb.
+    """
+    if not os.path.exists(_ROLLUP_PATH):
+        return {"pid": os.getpid(), "available": False}
+
+    with open(_ROLLUP_PATH) as f:
+        kb = _kb_fields(f.readlines(), _ROLLUP_FIELDS)
+
+    report: dict[str, Any] = {
+        "pid":        os.getpid(),
+        "available":  True,
+        "rss_mb":     round(kb["Rss"] / 1024, 1),
+        "pss_mb":     round(kb["Pss"] / 1024, 1),
+        "private_mb": round((kb["Private_Clean"] + kb["Private_Dirty"]) / 1024, 1),
+        "shared_mb":  round((kb["Shared_Clean"] + kb["Shared_Dirty"]) / 1024, 1),
+    }
+    if mapped_prefix:
+        mapped = _mapped_files(os.path.abspath(mapped_prefix))
+        report.update({
+            "mapped_files":     mapped["files"],
+            "mapped_mb":        round(mapped["Size"] / 1024, 1),
+            "mapped_rss_mb":    round(mapped["Rss"] / 1024, 1),
+            "mapped_shared_mb": round(mapped["Shared"] / 1024, 1),
+        })
+    return report
@@ -0,0 +1,227 @@
+# ─── services/metrics.py ──────────────────────────────────────────────────────
+# In-process request and pipeline metrics, exposed at GET /metrics in the
+# Prometheus text exposition format (no client library needed).
+#
+#   REQUESTS / REQUEST_SECONDS   HTTP requests by endpoint, method and status
+#   STAGE_SECONDS                time per pipeline stage (preprocess,
+#                                predict_crop, optimize_allocation, ...)
+#   MODEL_CALLS / MODEL_ROWS     forest evaluations per model, and yield grid
+#                                lookups as model="yield_grid" (cache misses only)
+#   OPTIMIZER_SOLVE_SECONDS      LP solves per backend (memo misses only)
+#
+# Instrumented code calls `stage(name)`, `Counter.inc()` or
+# `Histogram.observe()`. With METRICS_ENABLED=0 each of those returns right
+# after one module-level flag check, and `stage()` hands back a shared no-op
+# context manager.
+#
+# Metrics are per process: with several uvicorn workers, Prometheus scrapes
+# whichever worker answers, so labels are summed per scrape target. Optimizer
+# solves that run in EXECUTOR_PROCESSES workers are recorded in those
+# processes and do not show up here; the optimize_allocation stage still does.
+#
+# Configuration (environment variables):
+#   METRICS_ENABLED  "0" to disable collection and the /metrics endpoint (default "1")
+
+import bisect
+import contextlib
+import math
+import os
+import threading
+import time
+from typing import Any
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# Latency buckets in seconds (upper bounds; +Inf is implicit)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Family:
+    """A named metric with a fixed set of label names; one series per label combination."""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name      = name
+        self.help_text = help_text
+        self.labels    = labels
+        self._series: dict[tuple, Any] = {}
+        self._lock     = threading.Lock()
+        _FAMILIES.append(self)
+
+    def _key(self, labels: dict[str, Any]) -> tuple:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = sorted(self._series.items())
+            lines.extend(self._render_series(key, value) for key, value in series)
+        return lines
+
+    def _render_series(self, key: tuple, value: Any) -> str:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Counter(_Family):
+    """Monotonic count, e.g. requests served."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def _render_series(self, key: tuple, value: float) -> str:
+        return f"{self.name}{_label_text(self.labels, key)} {_format_value(value)}"
+
+
+class Histogram(_Family):
+    """Bucketed distribution of observed values (cumulative buckets, sum and count)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [count per bucket..., +Inf bucket, sum]
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def _render_series(self, key: tuple, series: list) -> str:
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_label_text(self.labels, key, le)} {cumulative}")
+        labels = _label_text(self.labels, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return "\n".join(lines)
+
+    def time(self, **labels: Any):
+        """Context manager observing the elapsed wall time of its block."""
+        if not METRICS_ENABLED:
+            return _NOOP
+        return _Timer(self, labels)
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: dict[str, Any]):
+        self.histogram = histogram
+        self.labels    = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+_NOOP = contextlib.nullcontext()
+_FAMILIES: list[_Family] = []
+
+
+# ─── Metrics ───────────────────────────────────────────────────────────────────
+
+REQUESTS = Counter(
+    "kisansaathi_http_requests_total",
+    "HTTP requests by endpoint (route template), method and status code.",
+    ("endpoint", "method", "status"),
+)
+REQUEST_SECONDS = Histogram(
+    "kisansaathi_http_request_duration_seconds",
+    "HTTP request latency by endpoint (route template) and method.",
+    ("endpoint", "method"),
+)
+STAGE_SECONDS = Histogram(
+    "kisansaathi_stage_duration_seconds",
+    "Time spent per request pipeline stage.",
+    ("stage",),
+)
+MODEL_CALLS = Counter(
+    "kisansaathi_model_inference_calls_total",
+    "Forest evaluations per model, yield grid lookups as yield_grid (prediction cache misses only).",
+    ("model",),
+)
+MODEL_ROWS = Counter(
+    "kisansaathi_model_inference_rows_total",
+    "Rows scored by each model (prediction cache misses only).",
+    ("model",),
+)
+OPTIMIZER_SOLVE_SECONDS = Histogram(
+    "kisansaathi_optimizer_solve_duration_seconds",
+    "LP solve time per backend (memo misses; batch solves cover many farms).",
+    ("backend",),
+)
+
+
+def stage(name: str):
+    """Context manager timing one pipeline stage into STAGE_SECONDS."""
+    if not METRICS_ENABLED:
+        return _NOOP
+    return _Timer(STAGE_SECONDS, {"stage": name})
+
+
+def record_inference(model: str, rows: int) -> None:
+    """Counts one forest evaluation of `rows` rows."""
+    if not METRICS_ENABLED:
+        return
+    MODEL_CALLS.inc(model=model)
+    MODEL_ROWS.inc(rows, model=model)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines: list[str] = []
+    for family in _FAMILIES:
+        lines.extend(family.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics() -> None:
+    """Drops every recorded series (used by benchmarks between runs)."""
+    for family in _FAMILIES:
+        family.clear()
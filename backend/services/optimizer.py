@@ -1,5 +1,17 @@
-import pulp
-from typing import Dict, Any, List
+import functools
+import itertools
+import os
+from typing import Callable, Dict, Any, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from services.metrics import OPTIMIZER_SOLVE_SECONDS
+
+# LP solver backend used by optimize_allocation:
+#   "vertex" — exact in-process vertex enumeration in NumPy (default)
+#   "highs"  — scipy.optimize.linprog with the HiGHS solver
+#   "pulp"   — PuLP + CBC subprocess (original implementation)
+OPTIMIZER_BACKEND = os.getenv("OPTIMIZER_BACKEND", "vertex")
 
 # Hardcoded crop data (per acre basis)
 CROP_DATA = {
@@ -31,27 +43,237 @@ CROP_DATA = {
 }
 
 
-def optimize_allocation(
-    land_area: float, 
-    water_available: float, 
-    fertilizer_available: float, 
-    crop_names: List[str]
-) -> Dict[str, Any]:
+# Resources constrained by the LP, in constraint-row order
+RESOURCES = ("land", "water", "fertilizer")
+
+# Relative slack allowed when checking a candidate vertex against constraints
+_FEASIBILITY_TOL = 1e-7
+
+# Max memoized (crop set, land, water, fertilizer) solutions (0 disables)
+OPTIMIZER_MEMO_SIZE = int(os.getenv("OPTIMIZER_MEMO_SIZE", "4096"))
+
+
+def _lp_matrices(crop_names: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
     """
-    Optimizes crop allocation to maximize profit under given constraints using PuLP.
-    
-    Args:
-        land_area (float): Total available land in acres.
-        water_available (float): Total available water (e.g., in liters or gallons).
-        fertilizer_available (float): Total available fertilizer in kg.
-        crop_names (list of str): List of crop names to consider for allocation.
-            
-    Returns:
-        dict: A dictionary containing:
-            - 'allocation': A dict mapping crop names to allocated acres.
-            - 'profit': Total maximum profit achievable.
+    Returns (profit, A) for the allocation LP over `crop_names`:
+        maximize  profit · x
+        s.t.      A x <= [land, water, fertilizer],  x >= 0
     """
-    
+    profit = np.array([CROP_DATA[name]["profit"] for name in crop_names], dtype=np.float64)
+    A = np.array([
+        [1.0] * len(crop_names),
+        [CROP_DATA[name]["water"] for name in crop_names],
+        [CROP_DATA[name]["fertilizer"] for name in crop_names],
+    ], dtype=np.float64)
+    return profit, A
+
+
+def _best_vertices(X: np.ndarray, feasible: np.ndarray, profit: np.ndarray, A: np.ndarray) -> np.ndarray:
+    """
+    For each farm f, the index of the most profitable feasible candidate
+    allocation X[f, k]. X is (farms, K, n); feasible is a (farms, K) mask
+    with at least one True per farm.
+
+    Alternative optima are common (Tomato and Potato earn the same profit
+    per litre of water), so ties within 1e-9 relative are broken
+    deterministically: least fertilizer used, then least water used.
+    """
+    objective = np.where(feasible, X @ profit, -np.inf)
+    top = objective.max(axis=1, keepdims=True)
+    tied = objective >= top - 1e-9 * np.maximum(1.0, np.abs(top))
+
+    fertilizer = np.where(tied, X @ A[2], np.inf)
+    tied &= fertilizer == fertilizer.min(axis=1, keepdims=True)
+    water = np.where(tied, X @ A[1], np.inf)
+    return water.argmin(axis=1)
+
+
+class VertexTable:
+    """
+    Closed-form solution table for the allocation LP over one crop set.
+
+    CROP_DATA coefficients are static, so every candidate vertex of
+    {A x <= b, x >= 0} is a fixed linear map of the resource vector b:
+    choosing n active constraints out of the 3 resource rows and n
+    non-negativity bounds gives x = Minv · h_active, and h_active only picks
+    entries of b. The maps are precomputed once per crop set; answering a
+    request is one (K, n, 3) @ (3,) product, a feasibility mask and an argmax.
+    """
+
+    def __init__(self, crops: tuple[str, ...]):
+        self.crops = crops
+        self.profit, self.A = _lp_matrices(crops)
+        m, n = self.A.shape
+
+        G = np.vstack([self.A, -np.eye(n)])          # all constraints as G x <= h
+        active = np.array(list(itertools.combinations(range(m + n), n)))
+        M = G[active]                                 # (K, n, n)
+        active = active[np.abs(np.linalg.det(M)) > 1e-9]
+        Minv = np.linalg.inv(G[active])
+
+        # h_active = S · b, where S selects the active resource rows
+        S = np.zeros((len(active), n, m))
+        rows, slots = np.nonzero(active < m)
+        S[rows, slots, active[rows, slots]] = 1.0
+        self.vertex_maps = Minv @ S                   # (K, n, m): x_k = maps[k] @ b
+
+    def solve(self, b: np.ndarray) -> Optional[np.ndarray]:
+        """Optimal x (in self.crops order) for resources b, or None if infeasible."""
+        solutions, ok = self.solve_many(b[None, :])
+        return solutions[0] if ok[0] else None
+
+    def solve_many(self, B: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Solves the LP for many resource vectors at once.
+
+        Args:
+            B (np.ndarray): (farms, 3) rows of [land, water, fertilizer].
+
+        Returns:
+            (solutions, feasible): (farms, n) optimal acres in self.crops
+            order (zeros where infeasible) and a (farms,) feasibility mask.
+        """
+        n_farms, n = len(B), len(self.crops)
+        if not len(self.vertex_maps):
+            return np.zeros((n_farms, n)), np.zeros(n_farms, dtype=bool)
+
+        X = np.einsum("knm,fm->fkn", self.vertex_maps, B)             # (farms, K, n)
+        tol = _FEASIBILITY_TOL * np.maximum(1.0, np.abs(B))[:, None, :]
+        feasible = (
+            (X >= -_FEASIBILITY_TOL).all(axis=2)
+            & (X @ self.A.T <= B[:, None, :] + tol).all(axis=2)
+        )                                                               # (farms, K)
+        ok = feasible.any(axis=1)
+
+        solutions = np.zeros((n_farms, n))
+        if ok.any():
+            best = _best_vertices(X[ok], feasible[ok], self.profit, self.A)
+            solutions[ok] = np.clip(X[ok][np.arange(len(best)), best], 0.0, None)
+        return solutions, ok
+
+
+_vertex_tables: Dict[frozenset, VertexTable] = {}
+
+
+def vertex_table(crops: Iterable[str]) -> VertexTable:
+    """Returns the (cached) VertexTable for a crop set, building it on first use."""
+    key = frozenset(crops)
+    table = _vertex_tables.get(key)
+    if table is None:
+        table = _vertex_tables[key] = VertexTable(_canonical_order(key))
+    return table
+
+
+def _canonical_order(crops: Iterable[str]) -> tuple[str, ...]:
+    """Crop set in CROP_DATA order, so equal sets share tables and memo entries."""
+    crops = set(crops)
+    return tuple(name for name in CROP_DATA if name in crops)
+
+
+def precompute_vertex_tables(crop_sets: Iterable[Iterable[str]] | None = None) -> int:
+    """
+    Builds vertex tables ahead of time. With no argument every non-empty
+    subset of CROP_DATA is prepared (31 subsets for five crops).
+    Returns the number of tables now cached.
+    """
+    if crop_sets is None:
+        names = list(CROP_DATA)
+        crop_sets = (
+            subset
+            for size in range(1, len(names) + 1)
+            for subset in itertools.combinations(names, size)
+        )
+    for crops in crop_sets:
+        vertex_table(crops)
+    return len(_vertex_tables)
+
+
+def _solve_vertex(crops: tuple[str, ...], b: np.ndarray) -> Optional[np.ndarray]:
+    """Exact LP solve from the precomputed vertex table. Returns None if infeasible."""
+    return vertex_table(crops).solve(b)
+
+
+def _solve_highs(crops: tuple[str, ...], b: np.ndarray) -> Optional[np.ndarray]:
+    """LP solve with scipy's HiGHS backend. Returns None if infeasible."""
+    from scipy.optimize import linprog
+
+    profit, A = _lp_matrices(crops)
+    res = linprog(-profit, A_ub=A, b_ub=b, bounds=(0, None), method="highs")
+    if res.status != 0:
+        return None
+    return np.clip(res.x, 0.0, None)
+
+
+def _solve_pulp(crops: tuple[str, ...], b: np.ndarray) -> Optional[np.ndarray]:
+    """LP solve with PuLP and the CBC subprocess. Returns None if infeasible."""
+    import pulp
+
+    profit, A = _lp_matrices(crops)
+    n = len(profit)
+
+    # 1. Initialize the Optimization Problem
+    prob = pulp.LpProblem("Crop_Allocation_Optimization", pulp.LpMaximize)
+
+    # 2. Define Decision Variables (acres per crop, lower bound 0)
+    crop_vars = [pulp.LpVariable(f"Acres_{i}", lowBound=0, cat='Continuous') for i in range(n)]
+
+    # 3. Define Objective Function: maximize total profit
+    prob += pulp.lpSum(crop_vars[i] * profit[i] for i in range(n)), "Total_Profit"
+
+    # 4. Define Constraints (land, water, fertilizer)
+    for row, resource in enumerate(RESOURCES):
+        prob += pulp.lpSum(crop_vars[i] * A[row, i] for i in range(n)) <= b[row], f"Total_{resource}_Constraint"
+
+    # 5. Solve the problem using the default CBC solver
+    prob.solve(pulp.PULP_CBC_CMD(msg=False))
+
+    status = pulp.LpStatus[prob.status]
+    if status in ("Infeasible", "Undefined", "Not Solved"):
+        return None
+    return np.array([v.varValue or 0.0 for v in crop_vars], dtype=np.float64)
+
+
+SOLVERS: Dict[str, Callable[[tuple, np.ndarray], Optional[np.ndarray]]] = {
+    "vertex": _solve_vertex,
+    "highs":  _solve_highs,
+    "pulp":   _solve_pulp,
+}
+
+
+def _solve_uncached(backend: str, crops: tuple[str, ...], land: float, water: float, fertilizer: float):
+    with OPTIMIZER_SOLVE_SECONDS.time(backend=backend):
+        x = SOLVERS[backend](crops, np.array([land, water, fertilizer], dtype=np.float64))
+    return None if x is None else tuple(float(v) for v in x)
+
+
+# Memo of solutions keyed on (backend, crop set, land, water, fertilizer);
+# crops arrive in canonical order so equal sets share one entry.
+_solve = (
+    functools.lru_cache(maxsize=OPTIMIZER_MEMO_SIZE)(_solve_uncached)
+    if OPTIMIZER_MEMO_SIZE > 0 else _solve_uncached
+)
+
+
+def memo_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the solution memo and the number of vertex tables."""
+    info = _solve.cache_info() if hasattr(_solve, "cache_info") else None
+    return {
+        "vertex_tables": len(_vertex_tables),
+        "hits":          info.hits if info else 0,
+        "misses":        info.misses if info else 0,
+        "size":          info.currsize if info else 0,
+        "maxsize":       OPTIMIZER_MEMO_SIZE,
+    }
+
+
+_INFEASIBLE_MESSAGE = (
+    "Optimization failed: Infeasible. "
+    "Resources (land, water, or fertilizer) may be insufficient to allocate any crop."
+)
+
+
+def _validate_crops(crop_names: List[str]) -> None:
+    """Raises ValueError for an empty crop list or crops missing from CROP_DATA."""
     # Validate: reject any crop not found in CROP_DATA
     unknown_crops = [name for name in crop_names if name not in CROP_DATA]
     if unknown_crops:
@@ -63,64 +285,24 @@ def optimize_allocation(
     # Guard: at least one valid crop must be requested
     if not crop_names:
         raise ValueError("No crops provided. Please supply at least one crop name.")
-    
-    valid_crops = list(crop_names)  # all are valid at this point
-    
-    # 1. Initialize the Optimization Problem
-    prob = pulp.LpProblem("Crop_Allocation_Optimization", pulp.LpMaximize)
-    
-    # 2. Define Decision Variables
-    # We create a variable for each crop representing the acres allocated to it.
-    # The lower bound is 0 (can't allocate negative acres).
-    crop_vars = pulp.LpVariable.dicts(
-        "Acres", 
-        valid_crops, 
-        lowBound=0, 
-        cat='Continuous'
-    )
-    
-    # 3. Define Objective Function
-    # Maximize total profit: sum(acres_i * profit_per_acre_i)
-    prob += pulp.lpSum([crop_vars[name] * CROP_DATA[name]['profit'] for name in valid_crops]), "Total_Profit"
-    
-    # 4. Define Constraints
-    
-    # Land constraint: Total acres allocated cannot exceed available land
-    prob += pulp.lpSum([crop_vars[name] for name in valid_crops]) <= land_area, "Total_Land_Constraint"
-    
-    # Water constraint: Total water used cannot exceed available water
-    prob += pulp.lpSum([crop_vars[name] * CROP_DATA[name]['water'] for name in valid_crops]) <= water_available, "Total_Water_Constraint"
-    
-    # Fertilizer constraint: Total fertilizer used cannot exceed available fertilizer
-    prob += pulp.lpSum([crop_vars[name] * CROP_DATA[name]['fertilizer'] for name in valid_crops]) <= fertilizer_available, "Total_Fertilizer_Constraint"
-    
-    # 5. Solve the problem using the default CBC solver
-    prob.solve(pulp.PULP_CBC_CMD(msg=False))
-    
-    # Check solver status — raise an error if infeasible or undefined
-    status = pulp.LpStatus[prob.status]
-    if status in ("Infeasible", "Undefined", "Not Solved"):
-        raise ValueError(
-            f"Optimization failed: {status}. "
-            "Resources (land, water, or fertilizer) may be insufficient to allocate any crop."
-        )
-    
-    # 6. Extract Results
+
+
+def _allocation_result(valid_crops: List[str], crops: tuple[str, ...], solution: Sequence[float]) -> Dict[str, Any]:
+    """Builds the optimize_allocation response from a solution in `crops` order."""
     allocation = {}
     total_water_used = 0.0
     total_fertilizer_used = 0.0
     
+    acres_by_crop = dict(zip(crops, solution))
     for name in valid_crops:
-        var = crop_vars[name]
-        # Round to 2 decimal places for cleaner output if desired, or keep exact
-        allocated_acres = round(var.varValue, 2) if var.varValue is not None else 0.0
+        allocated_acres = round(float(acres_by_crop[name]), 2)
         allocation[name] = allocated_acres
         
         # Calculate resources used based on allocation
         total_water_used += allocated_acres * CROP_DATA[name]['water']
         total_fertilizer_used += allocated_acres * CROP_DATA[name]['fertilizer']
         
-    total_profit = pulp.value(prob.objective) if pulp.value(prob.objective) is not None else 0.0
+    total_profit = sum(float(acres) * CROP_DATA[name]["profit"] for name, acres in acres_by_crop.items())
     
     return {
         "allocation": allocation,
@@ -130,3 +312,106 @@ def optimize_allocation(
         },
         "total_profit": round(total_profit, 2)
     }
+
+
+def optimize_allocation(
+    land_area: float, 
+    water_available: float, 
+    fertilizer_available: float, 
+    crop_names: List[str],
+    backend: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Optimizes crop allocation to maximize profit under given constraints.
+    
+    Args:
+        land_area (float): Total available land in acres.
+        water_available (float): Total available water (e.g., in liters or gallons).
+        fertilizer_available (float): Total available fertilizer in kg.
+        crop_names (list of str): List of crop names to consider for allocation.
+        backend (str, optional): LP solver from SOLVERS; defaults to OPTIMIZER_BACKEND.
+            
+    Returns:
+        dict: A dictionary containing:
+            - 'allocation': A dict mapping crop names to allocated acres.
+            - 'resource_usage': Water and fertilizer used by the allocation.
+            - 'total_profit': Total maximum profit achievable.
+    """
+    _validate_crops(crop_names)
+
+    backend = backend or OPTIMIZER_BACKEND
+    if backend not in SOLVERS:
+        raise ValueError(f"Unknown optimizer backend '{backend}'. Available: {list(SOLVERS)}")
+    
+    valid_crops = list(dict.fromkeys(crop_names))  # all are valid at this point
+
+    crops = _canonical_order(valid_crops)
+    solution = _solve(backend, crops, float(land_area), float(water_available), float(fertilizer_available))
+    if solution is None:
+        raise ValueError(_INFEASIBLE_MESSAGE)
+    
+    return _allocation_result(valid_crops, crops, solution)
+
+
+def optimize_allocation_batch(
+    land_area: Sequence[float],
+    water_available: Sequence[float],
+    fertilizer_available: Sequence[float],
+    crop_sets: Sequence[List[str]],
+) -> List[Dict[str, Any]]:
+    """
+    Solves the allocation LP for many farms at once.
+
+    Farms are grouped by crop set and each group is solved in one vectorized
+    pass over its precomputed VertexTable, so the cost is a few NumPy calls
+    per distinct crop set rather than one solve per farm. Results are
+    identical to calling optimize_allocation(..., backend="vertex") per farm.
+
+    Args:
+        land_area, water_available, fertilizer_available: One value per farm.
+        crop_sets: Candidate crops per farm (same length as the resource
+            arrays), or a single crop list shared by every farm.
+
+    Returns:
+        list[dict]: One optimize_allocation-style result per farm, in input
+            order, or {"error": str} for farms with invalid crops or
+            infeasible resources.
+    """
+    B = np.column_stack([
+        np.asarray(land_area, dtype=np.float64),
+        np.asarray(water_available, dtype=np.float64),
+        np.asarray(fertilizer_available, dtype=np.float64),
+    ])
+    n_farms = len(B)
+    if len(crop_sets) == 1 and n_farms != 1:
+        crop_sets = list(crop_sets) * n_farms
+    if len(crop_sets) != n_farms:
+        raise ValueError(
+            f"Got {n_farms} farms but {len(crop_sets)} crop sets; "
+            "pass one crop set per farm or a single shared crop set."
+        )
+
+    results: List[Dict[str, Any]] = [{} for _ in range(n_farms)]
+    groups: Dict[tuple, List[int]] = {}
+    for i, crop_names in enumerate(crop_sets):
+        try:
+            _validate_crops(crop_names)
+        except ValueError as e:
+            results[i] = {"error": str(e)}
+            continue
+        groups.setdefault(_canonical_order(crop_names), []).append(i)
+
+    for crops, farm_ids in groups.items():
+        with OPTIMIZER_SOLVE_SECONDS.time(backend="vertex_batch"):
+            solutions, ok = vertex_table(crops).solve_many(B[farm_ids])
+        for i, solution, feasible in zip(farm_ids, solutions, ok):
+            if not feasible:
+                results[i] = {"error": _INFEASIBLE_MESSAGE}
+                continue
+            valid_crops = list(dict.fromkeys(crop_sets[i]))
+            results[i] = _allocation_result(valid_crops, crops, solution.tolist())
+    return results
+
+
+# Crop sets are few (31 for five crops), so build every table at import
+precompute_vertex_tables()
@@ -1,21 +1,19 @@
-import joblib
-import pandas as pd
+import numpy as np
 import os
 
+from services.cache import canonicalize, get_cache
+from services.forest import forest_meta_path, load_forest
+from services.metrics import record_inference
+from services.encoding import FeatureEncoder, compile_encoders, strip_feature_names
+from services.registry import SMOKE_FARMS, registry
+
 # Define paths to model files
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODELS_DIR = os.path.join(BASE_DIR, "models")
 MODEL_PATH = os.path.join(MODELS_DIR, "crop_model.pkl")
 ENCODERS_PATH = os.path.join(MODELS_DIR, "encoders.pkl")
 CROP_ENCODER_PATH = os.path.join(MODELS_DIR, "crop_encoder.pkl")
-
-# Load models and encoders
-try:
-    model = joblib.load(MODEL_PATH)
-    encoders = joblib.load(ENCODERS_PATH)
-    crop_encoder = joblib.load(CROP_ENCODER_PATH)
-except FileNotFoundError as e:
-    raise FileNotFoundError(f"Model files not found. Please run train_model.py first. Error: {e}")
+FLAT_MODEL_PATH = os.path.join(MODELS_DIR, "crop_forest")
 
 # Define expected feature order (matching training data)
 FEATURE_ORDER = [
@@ -30,38 +28,173 @@ FEATURE_ORDER = [
     "Soil_pH"
 ]
 
+# Categorical columns label-encoded during training
+CATEGORICAL_COLUMNS = ["Soil_Type", "Irrigation_Type", "Season"]
+
+
+class CropModel:
+    """
+    One loaded set of crop model artifacts and everything derived from it.
+    Served through the model registry so it can be swapped as a unit.
+    """
+
+    def __init__(self, encoders: dict, crop_encoder, estimator):
+        self.crop_encoder = crop_encoder
+        self.estimator    = estimator  # FlatForest (memory-mapped) or the sklearn model
+
+        # Compile encoders into dict lookup tables once per load
+        self.lookups         = compile_encoders(encoders)
+        self.feature_encoder = FeatureEncoder(FEATURE_ORDER, self.lookups)
+
+        # Crop name for each model output class (model classes are crop_encoder codes)
+        self.labels = [str(crop_encoder.classes_[int(code)]) for code in estimator.classes_]
+        self.version = None  # set by the registry
+
+
+def load_crop_model() -> CropModel:
+    """
+    Loads the encoders and the compiled forest from compile_models.py. The
+    sklearn model is only unpickled when the compiled forest is missing or
+    stale: the forest's arrays are memory-mapped and shared between workers,
+    while an unpickled model is private to each of them.
+    """
+    import joblib  # deferred (with the sklearn import it triggers) for fast cold starts
+
+    try:
+        encoders = joblib.load(ENCODERS_PATH)
+        crop_encoder = joblib.load(CROP_ENCODER_PATH)
+        estimator = load_forest(FLAT_MODEL_PATH, source_path=MODEL_PATH)
+        if estimator is None:
+            estimator = joblib.load(MODEL_PATH, mmap_mode="r")
+            # The model is fed plain float64 rows in FEATURE_ORDER, not DataFrames
+            strip_feature_names(estimator, FEATURE_ORDER)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Model files not found. Please run train_model.py first. Error: {e}")
+
+    return CropModel(encoders, crop_encoder, estimator)
+
+
+def validate_crop_model(bundle: CropModel) -> None:
+    """Smoke-tests a freshly loaded bundle before it is swapped in."""
+    X = np.vstack([bundle.feature_encoder.row(farm) for farm in SMOKE_FARMS])
+    proba = bundle.estimator.predict_proba(X)
+    if proba.shape != (len(X), len(bundle.labels)) or not np.allclose(proba.sum(axis=1), 1.0):
+        raise ValueError(f"Crop model returned malformed probabilities with shape {proba.shape}")
+
+
+registry.register(
+    "crop",
+    load=load_crop_model,
+    validate=validate_crop_model,
+    sources=[MODEL_PATH, ENCODERS_PATH, CROP_ENCODER_PATH],
+    derived=[forest_meta_path(FLAT_MODEL_PATH)],
+)
+registry.preload("crop")  # eager mode: load now so missing artifacts fail fast
+
+# LRU cache of single-row predictions keyed on (model version, canonical feature tuple)
+_cache = get_cache("predict_crop")
+
 def predict_crop(input_data: dict) -> str:
     """
     Predicts the best crop type based on environmental input data.
+    Repeated inputs are served from the prediction cache.
     """
-    # 1. Convert input_data into pandas DataFrame and ensure column order
-    df = pd.DataFrame([input_data])
-    
-    # Clean input data (strip strings)
-    for col in df.columns:
-        if df[col].dtype == "object":
-            df[col] = df[col].str.strip()
-
-    # Ensure all required features are present and in the correct order
-    df = df[FEATURE_ORDER]
-
-    # 2. Apply saved label encoders on categorical columns
-    categorical_cols = ["Soil_Type", "Irrigation_Type", "Season"]
-    
-    for col in categorical_cols:
-        if col in df.columns:
-            le = encoders[col]
-            df[col] = le.transform(df[col])
+    bundle = registry.get("crop")
+    key, data = canonicalize(input_data, FEATURE_ORDER)
+    return _cache.get_or_compute((bundle.version,) + key, lambda: _predict_crop(bundle, data))
+
+
+def _predict_crop(bundle: CropModel, input_data: dict) -> str:
+    # 1-2. Build a float64 feature row in FEATURE_ORDER, encoding categoricals
+    row = bundle.feature_encoder.row(input_data)
 
     # 3. Predict crop using trained RandomForest model
-    prediction_idx = model.predict(df)[0]
+    prediction_idx = bundle.estimator.predict(row)[0]
+    record_inference("crop", 1)
 
-    # 4. Decode prediction using crop_encoder
-    predicted_crop = crop_encoder.inverse_transform([prediction_idx])[0]
+    # 4. Decode prediction using crop_encoder classes
+    predicted_crop = bundle.crop_encoder.classes_[int(prediction_idx)]
 
     # 5. Return predicted crop name
     return str(predicted_crop)
 
+
+def predict_crop_batch(rows: list[dict], return_proba: bool = False) -> list[dict]:
+    """
+    Predicts the best crop for many farms with a single forest call.
+
+    Rows are validated and encoded column-by-column in one vectorized pass.
+    A row with a missing field, a non-numeric value or an unknown category
+    gets an "error" entry instead of failing the whole batch.
+
+    Args:
+        rows (list[dict]): Farm condition dicts with the FEATURE_ORDER keys.
+        return_proba (bool): Include per-crop class probabilities per row.
+
+    Returns:
+        list[dict]: One result per input row, in input order. Each result is
+            either {"recommended_crop": str[, "probabilities": {crop: p}]}
+            or {"error": str}.
+    """
+    results: list[dict] = [{} for _ in rows]
+    if not rows:
+        return results
+    import pandas as pd  # only the batch path needs pandas; keeps it off the import path
+    bundle = registry.get("crop")
+
+    # 1. Flag rows missing any required feature
+    errors: dict[int, str] = {}
+    for i, row in enumerate(rows):
+        missing = [col for col in FEATURE_ORDER if row.get(col) is None]
+        if missing:
+            errors[i] = f"Missing value(s) for: {missing}"
+
+    # 2. Build one DataFrame for the whole batch (missing keys become NaN)
+    df = pd.DataFrame.from_records(rows, columns=FEATURE_ORDER)
+
+    # 3. Coerce numeric columns; anything non-numeric becomes NaN
+    for col in FEATURE_ORDER:
+        if col in CATEGORICAL_COLUMNS:
+            continue
+        values = pd.to_numeric(df[col], errors="coerce")
+        for i in np.flatnonzero(values.isna().to_numpy()):
+            errors.setdefault(int(i), f"Invalid numeric value {rows[i].get(col)!r} for column '{col}'")
+        df[col] = values
+
+    # 4. Encode categoricals once per column, flagging unseen values
+    for col in CATEGORICAL_COLUMNS:
+        lookup = bundle.lookups[col]
+        codes = lookup.encode_many(df[col])
+        for i in np.flatnonzero(codes < 0):
+            errors.setdefault(
+                int(i),
+                f"Unknown value {rows[i].get(col)!r} for column '{col}'. "
+                f"Accepted values: {lookup.classes}"
+            )
+        df[col] = codes
+
+    # 5. Predict all valid rows with one forest call
+    valid = np.array([i not in errors for i in range(len(rows))])
+    if valid.any():
+        X = np.ascontiguousarray(df[valid].to_numpy(dtype=np.float64))
+        proba = bundle.estimator.predict_proba(X)
+        record_inference("crop", len(X))
+        best = proba.argmax(axis=1)
+
+        for out_idx, i in enumerate(np.flatnonzero(valid)):
+            result = {"recommended_crop": bundle.labels[best[out_idx]]}
+            if return_proba:
+                result["probabilities"] = {
+                    crop: round(float(p), 4)
+                    for crop, p in zip(bundle.labels, proba[out_idx])
+                }
+            results[i] = result
+
+    for i, message in errors.items():
+        results[i] = {"error": message}
+
+    return results
+
 if __name__ == "__main__":
     # Sample Test Case (Updated to match new schema)
     test_input = {
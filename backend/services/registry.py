@@ -0,0 +1,336 @@
+# ─── services/registry.py ─────────────────────────────────────────────────────
+# Model registry: holds the active version of each model bundle (crop model,
+# yield model) and swaps in retrained artifacts without restarting uvicorn.
+#
+# Services register a loader and a validator for their artifacts and call
+# `registry.get(name)` once per prediction, so a request keeps using the
+# bundle it started with even if a reload swaps in a new one mid-request.
+#
+# A reload loads the new artifacts off the request path, validates them on
+# SMOKE_FARMS, then replaces the active bundle with a single reference
+# assignment and clears the prediction caches. If loading or validation
+# fails, the previous bundle keeps serving and the error is reported in
+# status().
+#
+# Reloads are triggered by the watcher (polls the artifact files for size /
+# mtime changes) or by an explicit reload() call (POST /admin/reload-models).
+#
+# When models are first loaded depends on MODEL_LOADING:
+#   eager       load while the service module is imported (missing artifacts
+#               fail the import; the default)
+#   lazy        load on the first request that needs the model
+#   background  load in a warm-up thread started at app startup; requests
+#               arriving earlier load on demand (readiness() reports progress)
+#
+# Configuration (environment variables):
+#   MODEL_WATCH_INTERVAL  seconds between artifact checks (default 10, 0 disables)
+#   MODEL_LOADING         eager | lazy | background (default eager)
+
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+from services.cache import invalidate_all
+
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "10"))
+MODEL_LOADING        = os.getenv("MODEL_LOADING", "eager").strip().lower()
+
+if MODEL_LOADING not in ("eager", "lazy", "background"):
+    raise ValueError(f"MODEL_LOADING must be eager, lazy or background, got '{MODEL_LOADING}'")
+
+# Farms every model must be able to score before it is swapped in
+SMOKE_FARMS: list[dict[str, Any]] = [
+    {
+        "Soil_Type": "Loamy", "Farm_Area_acres": 7.66, "Water_Availability_L_per_week": 1364,
+        "Irrigation_Type": "Sprinkler", "Fertilizer_Used_kg": 174.0, "Season": "Summer",
+        "Rainfall_mm": 1110.0, "Temperature_C": 23.0, "Soil_pH": 7.9,
+    },
+    {
+        "Soil_Type": "Clay", "Farm_Area_acres": 12.0, "Water_Availability_L_per_week": 5000,
+        "Irrigation_Type": "Drip", "Fertilizer_Used_kg": 60.0, "Season": "Kharif",
+        "Rainfall_mm": 1600.0, "Temperature_C": 30.0, "Soil_pH": 6.2,
+    },
+    {
+        "Soil_Type": "Sandy", "Farm_Area_acres": 2.5, "Water_Availability_L_per_week": 800,
+        "Irrigation_Type": "Flood", "Fertilizer_Used_kg": 120.0, "Season": "Rabi",
+        "Rainfall_mm": 450.0, "Temperature_C": 16.0, "Soil_pH": 7.2,
+    },
+]
+
+
+def _signature(paths: Iterable[str]) -> tuple:
+    """(size, mtime_ns) per file — cheap change detection for the watcher."""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_size, stat.st_mtime_ns))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def _content_version(paths: Iterable[str]) -> str:
+    """Short content hash of the model's source artifacts (same files ⇒ same version)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+class _Entry:
+    """One registered model: how to load and validate it, and what is active."""
+
+    def __init__(self, name: str, load: Callable[[], Any], validate: Callable[[Any], None],
+                 sources: list[str], derived: list[str]):
+        self.name     = name
+        self.load     = load
+        self.validate = validate
+        self.sources  = sources            # files that define the model version
+        self.watched  = sources + derived  # files whose change triggers a reload
+
+        self.bundle: Any = None
+        self.version: str | None = None
+        self.signature: tuple | None = None
+        self.loaded_at: float | None = None
+        self.load_seconds: float | None = None
+        self.loading = False
+        self.reloads = self.failures = 0
+        self.last_error: str | None = None
+
+    @property
+    def state(self) -> str:
+        if self.bundle is not None:
+            return "loaded"
+        if self.loading:
+            return "loading"
+        return "failed" if self.last_error else "unloaded"
+
+
+class ModelRegistry:
+    """
+    Named model bundles with atomic swap-on-reload. Bundles get a `version`
+    attribute (content hash of their source artifacts).
+    """
+
+    def __init__(self):
+        self._entries: dict[str, _Entry] = {}
+        self._reload_lock = threading.Lock()
+        self._watcher: threading.Thread | None = None
+        self._warm_up: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def register(self, name: str, load: Callable[[], Any], validate: Callable[[Any], None],
+                 sources: list[str], derived: list[str] | None = None) -> None:
+        """
+        Registers a model.
+
+        Args:
+            name (str): Registry key, e.g. "crop".
+            load (callable): Builds a bundle from the artifacts on disk.
+            validate (callable): Raises (ValueError) if a bundle is unusable.
+            sources (list[str]): Artifact files that define the version.
+            derived (list[str]): Generated files (e.g. compiled forests) that
+                trigger a reload when they change but don't change the version.
+        """
+        self._entries[name] = _Entry(name, load, validate, list(sources), list(derived or []))
+
+    def preload(self, name: str) -> None:
+        """
+        Called by a service right after register(): loads the model now in
+        eager mode so missing artifacts fail fast, and defers it otherwise.
+        """
+        if MODEL_LOADING == "eager":
+            self.get(name)
+
+    def get(self, name: str) -> Any:
+        """Returns the active bundle for `name`, loading it on first use."""
+        entry = self._entries[name]
+        bundle = entry.bundle
+        if bundle is None:
+            with self._reload_lock:
+                if entry.bundle is None:
+                    self._first_load(entry)
+            bundle = entry.bundle
+        return bundle
+
+    def _first_load(self, entry: _Entry) -> None:
+        entry.loading = True
+        start = time.perf_counter()
+        try:
+            bundle = self._build(entry)
+        except Exception as e:
+            entry.failures += 1
+            entry.last_error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            entry.loading = False
+        entry.load_seconds = time.perf_counter() - start
+        self._swap_in(entry, bundle)
+
+    def versions(self) -> dict[str, str | None]:
+        """Active version per model (None if not loaded yet)."""
+        return {name: entry.version for name, entry in self._entries.items()}
+
+    def version_header(self) -> str:
+        """Value for the X-Model-Version response header, e.g. "crop=1a2b3c; yield=4d5e6f"."""
+        return "; ".join(f"{name}={version or 'unloaded'}" for name, version in self.versions().items())
+
+    # ─── Reload ────────────────────────────────────────────────────────────────
+
+    def _build(self, entry: _Entry) -> Any:
+        signature = _signature(entry.watched)
+        bundle = entry.load()
+        entry.validate(bundle)
+        bundle.version = _content_version(entry.sources)
+        bundle.signature = signature
+        return bundle
+
+    def _swap_in(self, entry: _Entry, bundle: Any) -> None:
+        entry.bundle    = bundle  # single reference assignment: readers see old or new, never a mix
+        entry.version   = bundle.version
+        entry.signature = bundle.signature
+        entry.loaded_at = time.time()
+        entry.last_error = None
+
+    def reload(self, names: Iterable[str] | None = None, force: bool = False) -> dict[str, dict[str, Any]]:
+        """
+        Reloads models whose artifacts changed on disk (all of them if
+        `force`). Blocking; run it off the event loop.
+
+        Returns:
+            dict: {name: {"status": "reloaded" | "unchanged" | "failed",
+                          "version": active version, "error"?: str}}
+        """
+        report: dict[str, dict[str, Any]] = {}
+        with self._reload_lock:
+            swapped = False
+            for name in (names or list(self._entries)):
+                if name not in self._entries:
+                    raise ValueError(f"Unknown model '{name}'. Registered: {list(self._entries)}")
+                entry = self._entries[name]
+                if not force and entry.bundle is not None and _signature(entry.watched) == entry.signature:
+                    report[name] = {"status": "unchanged", "version": entry.version}
+                    continue
+                try:
+                    bundle = self._build(entry)
+                except Exception as e:
+                    entry.failures += 1
+                    entry.last_error = f"{type(e).__name__}: {e}"
+                    # Don't retry the same broken files on every watcher tick
+                    entry.signature = _signature(entry.watched)
+                    report[name] = {"status": "failed", "version": entry.version, "error": entry.last_error}
+                    continue
+                self._swap_in(entry, bundle)
+                entry.reloads += 1
+                swapped = True
+                report[name] = {"status": "reloaded", "version": entry.version}
+
+            if swapped:
+                # Cache keys include the model version, so stale entries can no
+                # longer be hit; this just frees them
+                invalidate_all()
+        return report
+
+    def status(self) -> dict[str, dict[str, Any]]:
+        """Version, load time, reload/failure counts and last error per model."""
+        return {
+            name: {
+                "state":      entry.state,
+                "version":    entry.version,
+                "loaded_at":  entry.loaded_at,
+                "reloads":    entry.reloads,
+                "failures":   entry.failures,
+                "last_error": entry.last_error,
+            }
+            for name, entry in self._entries.items()
+        }
+
+    # ─── Warm-up / readiness ──────────────────────────────────────────────────
+
+    def start_warm_up(self, then: Callable[[], None] | None = None) -> None:
+        """
+        Loads every registered model in a background thread (MODEL_LOADING=
+        background), then runs `then` (e.g. more imports to get out of the way).
+        A model that fails to load is reported by readiness() and retried on
+        its first request.
+        """
+        if self._warm_up is not None:
+            return
+        self._warm_up = threading.Thread(
+            target=self._run_warm_up, args=(then,), name="model-warm-up", daemon=True
+        )
+        self._warm_up.start()
+
+    def _run_warm_up(self, then: Callable[[], None] | None) -> None:
+        for name in list(self._entries):
+            try:
+                self.get(name)
+            except Exception:
+                pass  # recorded on the entry by _first_load
+        if then is not None:
+            then()
+
+    def readiness(self) -> dict[str, Any]:
+        """
+        Whether every registered model is loaded ("hot"), with each model's
+        state (unloaded / loading / loaded / failed) and first-load time.
+        """
+        models = {
+            name: {
+                "state":        entry.state,
+                "load_seconds": None if entry.load_seconds is None else round(entry.load_seconds, 3),
+                "last_error":   entry.last_error,
+            }
+            for name, entry in self._entries.items()
+        }
+        return {
+            "ready":   all(m["state"] == "loaded" for m in models.values()),
+            "loading": MODEL_LOADING,
+            "models":  models,
+        }
+
+    # ─── Watcher ───────────────────────────────────────────────────────────────
+
+    def start_watcher(self, interval: float = MODEL_WATCH_INTERVAL) -> None:
+        """Polls the artifacts every `interval` seconds and reloads changed models."""
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="model-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def _watch(self, interval: float) -> None:
+        pending: dict[str, tuple] = {}
+        while not self._stop.wait(interval):
+            for name, entry in list(self._entries.items()):
+                if entry.bundle is None:
+                    continue
+                signature = _signature(entry.watched)
+                if signature == entry.signature:
+                    pending.pop(name, None)
+                    continue
+                # Only reload once the files stop changing (training writes
+                # several artifacts, and large pickles are written gradually)
+                if pending.get(name) != signature:
+                    pending[name] = signature
+                    continue
+                pending.pop(name, None)
+                self.reload([name])
+
+
+# Process-wide registry used by the prediction services
+registry = ModelRegistry()
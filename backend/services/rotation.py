@@ -0,0 +1,413 @@
+# ─── services/rotation.py ─────────────────────────────────────────────────────
+# Multi-season crop rotation planner.
+#
+# optimize_allocation splits one season's land continuously across crops.
+# plan_rotation instead assigns a crop (or fallow) to every plot of a farm for
+# several consecutive seasons, solved as one mixed-integer program. Plots
+# have whole-acre sizes; water and fertilizer per acre come from CROP_DATA,
+# and profit per acre and season is supplied by the caller (main.py derives
+# it from the yield model for each season's conditions).
+#
+# Plots of the same size are interchangeable, so instead of one binary per
+# plot, season and crop (which leaves CBC exploring many symmetric
+# solutions) the model counts plots moving between crops:
+#
+#   y[g, s, a, b] = number of g-acre plots growing a in season s-1 and b in s
+#                   (integer; a, b range over the candidate crops and fallow,
+#                   a → b pairs forbidden by ROTATION_RULES have no variable)
+#
+#   maximize   Σ  g · profit[s, b] · y[g, s, a, b]
+#   s.t.       Σb y[g, 0, a, b] = plots of size g that grew a before season 0
+#              Σb y[g, s, a, b] = Σa' y[g, s-1, a', a]                 (s >= 1)
+#              Σ  g · water[b] · y[g, s, a, b] <= water[s]      per-season budgets
+#              Σ  g · fertilizer[b] · y[g, s, a, b] <= fertilizer[s]
+#
+# Any solution maps back to one crop per plot and season (_plan_from_counts).
+#
+# The solve is warm-started with a rolling-horizon plan (rolling_plan): each
+# season solved on its own, starting from the previous season's solution.
+# CBC starts from that incumbent, so a solve stopped by the time limit is
+# never worse than planning one season at a time.
+#
+# Configuration (environment variables):
+#   ROTATION_TIME_LIMIT  Time limit per plan in seconds, warm start included
+#                        (default 10). It bounds CBC's search; building the
+#                        models and starting CBC add a little on top (up
+#                        to ~0.1 s), so solve_seconds may slightly
+#                        exceed it
+#   ROTATION_MIP_GAP     Relative optimality gap at which CBC stops
+#                        (default 0.001)
+
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.metrics import OPTIMIZER_SOLVE_SECONDS
+from services.optimizer import CROP_DATA, _validate_crops
+
+ROTATION_TIME_LIMIT = float(os.getenv("ROTATION_TIME_LIMIT", "10"))
+ROTATION_MIP_GAP = float(os.getenv("ROTATION_MIP_GAP", "0.001"))
+
+# Share of the time limit spent building the warm start
+WARM_START_SHARE = 0.25
+
+# Crops that may not follow each crop on the same plot in the next season.
+# Potato and Tomato are both nightshades and share soil-borne pests and
+# blight, so neither may follow itself or the other.
+ROTATION_RULES: Dict[str, tuple[str, ...]] = {
+    "Potato": ("Potato", "Tomato"),
+    "Tomato": ("Tomato", "Potato"),
+}
+
+# Plan entry for a plot left fallow
+FALLOW = None
+
+
+def _allowed(previous: Optional[str], crop: str, rules: Dict[str, Sequence[str]]) -> bool:
+    return previous is None or crop not in rules.get(previous, ())
+
+
+def check_plan(plan: Sequence[Sequence[Optional[str]]], plots: Sequence[int], crops: Sequence[str],
+               water: Sequence[float], fertilizer: Sequence[Optional[float]],
+               previous_crops: Sequence[Optional[str]],
+               rules: Dict[str, Sequence[str]] = ROTATION_RULES) -> List[str]:
+    """
+    Constraint violations of a plan (seasons × plots of crop names or None),
+    as messages; an empty list means the plan is feasible.
+    """
+    problems = []
+    for s, season in enumerate(plan):
+        if len(season) != len(plots):
+            problems.append(f"season {s}: {len(season)} plot entries for {len(plots)} plots")
+            continue
+        planted = [(acres, crop) for acres, crop in zip(plots, season) if crop is not None]
+        unknown = sorted({crop for _, crop in planted if crop not in crops})
+        if unknown:
+            problems.append(f"season {s}: crops {unknown} are not candidates")
+            continue
+        used = sum(acres * CROP_DATA[crop]["water"] for acres, crop in planted)
+        if used > water[s] * (1 + 1e-9):
+            problems.append(f"season {s}: water {used} exceeds {water[s]}")
+        used = sum(acres * CROP_DATA[crop]["fertilizer"] for acres, crop in planted)
+        if fertilizer[s] is not None and used > fertilizer[s] * (1 + 1e-9):
+            problems.append(f"season {s}: fertilizer {used} exceeds {fertilizer[s]}")
+        before = plan[s - 1] if s else previous_crops
+        for p, crop in enumerate(season):
+            if crop is not None and not _allowed(before[p], crop, rules):
+                problems.append(f"season {s}, plot {p}: {crop} may not follow {before[p]}")
+    return problems
+
+
+def greedy_plan(plots: Sequence[int], crops: Sequence[str], profit: np.ndarray,
+                water: Sequence[float], fertilizer: Sequence[Optional[float]],
+                previous_crops: Sequence[Optional[str]],
+                rules: Dict[str, Sequence[str]] = ROTATION_RULES) -> List[List[Optional[str]]]:
+    """
+    A feasible plan built one season at a time from the previous season's
+    solution: every plot first tries to keep its crop (when the rules allow
+    it and it fits the remaining budgets), then the remaining plots, largest
+    first, take the allowed crop with the highest profit per acre that fits.
+    Seeds the per-season solves in rolling_plan.
+    """
+    plan = []
+    before = list(previous_crops)
+    for s in range(len(water)):
+        water_left = water[s]
+        fertilizer_left = np.inf if fertilizer[s] is None else fertilizer[s]
+        season: List[Optional[str]] = [FALLOW] * len(plots)
+
+        def fits(p: int, crop: str) -> bool:
+            return (
+                profit[s, crops.index(crop)] > 0
+                and _allowed(before[p], crop, rules)
+                and plots[p] * CROP_DATA[crop]["water"] <= water_left
+                and plots[p] * CROP_DATA[crop]["fertilizer"] <= fertilizer_left
+            )
+
+        def plant(p: int, crop: str) -> None:
+            nonlocal water_left, fertilizer_left
+            season[p] = crop
+            water_left -= plots[p] * CROP_DATA[crop]["water"]
+            fertilizer_left -= plots[p] * CROP_DATA[crop]["fertilizer"]
+
+        for p in range(len(plots)):
+            if before[p] in crops and fits(p, before[p]):
+                plant(p, before[p])
+
+        ranked = [crops[i] for i in np.argsort(-profit[s], kind="stable")]
+        for p in sorted(range(len(plots)), key=lambda p: -plots[p]):
+            if season[p] is FALLOW:
+                crop = next((crop for crop in ranked if fits(p, crop)), FALLOW)
+                if crop is not FALLOW:
+                    plant(p, crop)
+
+        plan.append(season)
+        before = season
+    return plan
+
+
+def rolling_plan(plots: Sequence[int], crops: Sequence[str], profit: np.ndarray,
+                 water: Sequence[float], fertilizer: Sequence[Optional[float]],
+                 previous_crops: Sequence[Optional[str]], rules: Dict[str, Sequence[str]],
+                 time_limit: float) -> List[List[Optional[str]]]:
+    """
+    A feasible plan solved one season at a time: each season is the MILP
+    over that season alone, given the previous season's solution (and
+    warm-started with greedy_plan's). It ignores how a choice constrains
+    later seasons, so it is a lower bound for the full model and its warm
+    start. `time_limit` is split evenly across the seasons.
+    """
+    plan = []
+    before = list(previous_crops)
+    for s in range(len(water)):
+        args = (plots, crops, profit[s:s + 1], water[s:s + 1], fertilizer[s:s + 1], before)
+        seed = greedy_plan(*args, rules)
+        solved = _solve_milp(*args, rules, seed, time_limit / len(water))
+        season = solved[0][0] if solved is not None else seed[0]
+        plan.append(season)
+        before = season
+    return plan
+
+
+def plan_profit(plan: Sequence[Sequence[Optional[str]]], plots: Sequence[int],
+                crops: Sequence[str], profit: np.ndarray) -> float:
+    """Total profit of a plan under the per-season profit coefficients."""
+    return float(sum(
+        acres * profit[s, crops.index(crop)]
+        for s, season in enumerate(plan)
+        for acres, crop in zip(plots, season)
+        if crop is not None
+    ))
+
+
+def _solve_milp(plots: Sequence[int], crops: Sequence[str], profit: np.ndarray,
+                water: Sequence[float], fertilizer: Sequence[Optional[float]],
+                previous_crops: Sequence[Optional[str]], rules: Dict[str, Sequence[str]],
+                warm_start: Optional[List[List[Optional[str]]]], time_limit: float):
+    """
+    Builds and solves the transition-count MILP (see the module header) with
+    PuLP + CBC. Returns (plan, proven optimal), or None if no plan was found
+    within the time limit.
+
+    Raises:
+        ValueError: If CBC proves that no plan satisfies the budgets.
+    """
+    import pulp
+
+    n_seasons = len(water)
+    options = list(crops) + [FALLOW]
+    sizes = sorted(set(plots))
+
+    def sources(size: int, s: int) -> List[Optional[str]]:
+        if s:
+            return options
+        return list(dict.fromkeys(prev for acres, prev in zip(plots, previous_crops) if acres == size))
+
+    def plantable(s: int, crop: Optional[str]) -> bool:
+        return crop is FALLOW or profit[s, crops.index(crop)] > 0
+
+    # Posed as minimizing the negated profit: CBC mis-signs the objective of
+    # a warm start on maximization problems and would discard it
+    prob = pulp.LpProblem("Crop_Rotation_Planning", pulp.LpMinimize)
+    y = {}
+    for size in sizes:
+        count = plots.count(size)
+        for s in range(n_seasons):
+            for a in sources(size, s):
+                for b in options:
+                    if plantable(s, b) and _allowed(a, b, rules):
+                        y[size, s, a, b] = pulp.LpVariable(
+                            f"Plots_{size}_{s}_{a or 'Fallow'}_{b or 'Fallow'}",
+                            lowBound=0, upBound=count, cat="Integer",
+                        )
+
+    prob += -pulp.lpSum(
+        size * profit[s, crops.index(b)] * var for (size, s, a, b), var in y.items() if b is not FALLOW
+    ), "Negated_Total_Profit"
+
+    # Every plot moves from its previous state to exactly one option per season
+    for size in sizes:
+        for a in sources(size, 0):
+            count = sum(1 for acres, prev in zip(plots, previous_crops) if acres == size and prev == a)
+            prob += pulp.lpSum(var for (g, s, src, _), var in y.items()
+                               if g == size and s == 0 and src == a) == count, \
+                f"Start_{size}_{a or 'Fallow'}"
+        for s in range(1, n_seasons):
+            for a in options:
+                prob += pulp.lpSum(var for (g, ps, src, _), var in y.items()
+                                   if g == size and ps == s and src == a) == \
+                        pulp.lpSum(var for (g, ps, _, dst), var in y.items()
+                                   if g == size and ps == s - 1 and dst == a), \
+                    f"Flow_{size}_{s}_{a or 'Fallow'}"
+
+    for s in range(n_seasons):
+        for resource, budget in (("water", water[s]), ("fertilizer", fertilizer[s])):
+            if budget is not None:
+                prob += pulp.lpSum(
+                    size * CROP_DATA[b][resource] * var
+                    for (size, ps, _, b), var in y.items() if ps == s and b is not FALLOW
+                ) <= budget, f"Total_{resource}_{s}"
+
+    if warm_start is not None:
+        counts = _transition_counts(warm_start, plots, previous_crops)
+        for key, var in y.items():
+            var.setInitialValue(counts.get(key, 0))
+
+    prob.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit, gapRel=ROTATION_MIP_GAP,
+                                 warmStart=warm_start is not None))
+    if pulp.LpStatus[prob.status] == "Infeasible":
+        raise ValueError("Rotation planning failed: no plan fits the water and fertilizer budgets.")
+    if pulp.LpStatus[prob.status] != "Optimal":
+        return None
+
+    counts = {key: int(round(var.varValue or 0)) for key, var in y.items()}
+    return _plan_from_counts(counts, plots, previous_crops, options, n_seasons), \
+        prob.sol_status == pulp.LpSolutionOptimal
+
+
+def _transition_counts(plan: Sequence[Sequence[Optional[str]]], plots: Sequence[int],
+                       previous_crops: Sequence[Optional[str]]) -> Dict[tuple, int]:
+    """{(plot size, season, previous crop, crop): number of plots} of a plan."""
+    counts: Dict[tuple, int] = {}
+    before = previous_crops
+    for s, season in enumerate(plan):
+        for size, a, b in zip(plots, before, season):
+            counts[size, s, a, b] = counts.get((size, s, a, b), 0) + 1
+        before = season
+    return counts
+
+
+def _plan_from_counts(counts: Dict[tuple, int], plots: Sequence[int],
+                      previous_crops: Sequence[Optional[str]], options: Sequence[Optional[str]],
+                      n_seasons: int) -> List[List[Optional[str]]]:
+    """
+    Assigns transition counts back to individual plots, in plot order. Flow
+    conservation guarantees every plot finds a transition from its state.
+    """
+    plan = []
+    before = list(previous_crops)
+    for s in range(n_seasons):
+        season = []
+        for size, a in zip(plots, before):
+            b = next(b for b in options if counts.get((size, s, a, b), 0) > 0)
+            counts[size, s, a, b] -= 1
+            season.append(b)
+        plan.append(season)
+        before = season
+    return plan
+
+
+def plan_rotation(
+    plots: Sequence[int],
+    crop_names: List[str],
+    profit: np.ndarray,
+    water_available: Sequence[float],
+    fertilizer_available: Optional[Sequence[Optional[float]]] = None,
+    previous_crops: Optional[Sequence[Optional[str]]] = None,
+    season_names: Optional[Sequence[str]] = None,
+    rules: Dict[str, Sequence[str]] = ROTATION_RULES,
+    warm_start: bool = True,
+    time_limit: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Plans which crop each plot grows over consecutive seasons.
+
+    Args:
+        plots (list of int): Plot sizes in whole acres.
+        crop_names (list of str): Candidate crops (from CROP_DATA).
+        profit (np.ndarray): (seasons, crops) profit per acre, in crop_names
+            order; crops with profit <= 0 in a season are not planted in it.
+        water_available (list of float): Water budget per season.
+        fertilizer_available (list, optional): Fertilizer budget per season
+            (None entries or argument → unconstrained).
+        previous_crops (list, optional): Crop each plot grew in the season
+            before the first (None for fallow/unknown); subject to the rules.
+        season_names (list of str, optional): Labels for the response.
+        rules (dict): Crop → crops that may not follow it on the same plot.
+        warm_start (bool): Seed CBC with rolling_plan's solution.
+        time_limit (float, optional): Seconds, warm start included; defaults
+            to ROTATION_TIME_LIMIT. Approximate: model building and CBC
+            start-up are not counted against it.
+
+    Returns:
+        dict: 'status' ("optimal" within ROTATION_MIP_GAP, or "time_limit"
+            for the best plan found in time), 'seasons' (per-season plot crops, allocation,
+            resource usage and profit), 'total_profit', 'warm_start_profit'
+            and 'solve_seconds'.
+
+    Raises:
+        ValueError: On invalid plots, crops, budgets, previous crops or
+            time limit, if no plan fits the budgets, or if no plan is found
+            within the time limit.
+    """
+    _validate_crops(crop_names)
+    crops = list(dict.fromkeys(crop_names))
+    n_seasons = len(water_available)
+    if not plots or any(isinstance(acres, bool) or int(acres) != acres or acres <= 0 for acres in plots):
+        raise ValueError("plots must be a non-empty list of positive whole-acre sizes")
+    plots = [int(acres) for acres in plots]
+    if n_seasons == 0:
+        raise ValueError("Give a water budget for at least one season")
+    fertilizer = list(fertilizer_available) if fertilizer_available is not None else [None] * n_seasons
+    previous = list(previous_crops) if previous_crops is not None else [FALLOW] * len(plots)
+    profit = np.asarray(profit, dtype=np.float64)
+    if profit.shape != (n_seasons, len(crops)):
+        raise ValueError(f"profit must have shape (seasons, crops) = ({n_seasons}, {len(crops)}), got {profit.shape}")
+    if len(fertilizer) != n_seasons:
+        raise ValueError(f"Got {n_seasons} water budgets but {len(fertilizer)} fertilizer budgets")
+    if any(not budget >= 0 for budget in water_available) or \
+            any(budget is not None and not budget >= 0 for budget in fertilizer):
+        raise ValueError("Water and fertilizer budgets must be non-negative")
+    if len(previous) != len(plots):
+        raise ValueError(f"Got {len(plots)} plots but {len(previous)} previous crops")
+    unknown = sorted({crop for crop in previous if crop is not None and crop not in CROP_DATA})
+    if unknown:
+        raise ValueError(f"Unknown previous crop(s): {unknown}. Supported crops are: {list(CROP_DATA.keys())}")
+
+    time_limit = ROTATION_TIME_LIMIT if time_limit is None else time_limit
+    if not time_limit > 0:
+        raise ValueError(f"time_limit must be positive, got {time_limit}")
+    start = time.perf_counter()
+    with OPTIMIZER_SOLVE_SECONDS.time(backend="rotation_milp"):
+        initial = None
+        if warm_start:
+            initial = rolling_plan(plots, crops, profit, water_available, fertilizer, previous, rules,
+                                   time_limit * WARM_START_SHARE)
+        # The full model gets whatever the warm start left; if nothing is
+        # left, or it finds no plan in that time, the warm start is the answer
+        remaining = time_limit - (time.perf_counter() - start)
+        solved = None
+        if remaining > 0:
+            solved = _solve_milp(plots, crops, profit, water_available, fertilizer, previous, rules,
+                                 initial, remaining)
+    solve_seconds = time.perf_counter() - start
+    if solved is None and initial is None:
+        raise ValueError(f"Rotation planning failed: no plan found within the time limit of {time_limit:g} s.")
+    plan, optimal = solved if solved is not None else (initial, False)
+
+    seasons = []
+    for s, season in enumerate(plan):
+        allocation = {crop: 0 for crop in crops}
+        for acres, crop in zip(plots, season):
+            if crop is not None:
+                allocation[crop] += acres
+        seasons.append({
+            "season": season_names[s] if season_names else s + 1,
+            "plots": season,
+            "allocation": allocation,
+            "resource_usage": {
+                "water_used":      round(sum(a * CROP_DATA[c]["water"] for c, a in allocation.items()), 2),
+                "fertilizer_used": round(sum(a * CROP_DATA[c]["fertilizer"] for c, a in allocation.items()), 2),
+            },
+            "profit": round(plan_profit([season], plots, crops, profit[s:s + 1]), 2),
+        })
+
+    return {
+        "status": "optimal" if optimal else "time_limit",
+        "seasons": seasons,
+        "total_profit": round(plan_profit(plan, plots, crops, profit), 2),
+        "warm_start_profit": round(plan_profit(initial, plots, crops, profit), 2) if initial else None,
+        "solve_seconds": round(solve_seconds, 3),
+    }
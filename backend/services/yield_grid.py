@@ -0,0 +1,190 @@
+# ─── services/yield_grid.py ───────────────────────────────────────────────────
+# Precomputed lookup surface for the yield model.
+#
+# The yield model's categorical inputs have few values (soil × irrigation ×
+# season × crop) and its numeric inputs have bounded ranges. build_grid.py
+# evaluates the model on a grid over the numeric features for every
+# categorical combination and stores the result as one float32 array:
+#
+#   values[soil, irrigation, season, crop, area, water, fertilizer, rainfall, temperature, ph]
+#
+# Categorical axes are indexed by encoder code; each numeric axis is a sorted
+# list of grid points. YieldGrid.predict_row() answers a request inside the
+# grid by multilinear interpolation between the 2^6 surrounding points and
+# returns None outside it (the caller then uses the forest).
+#
+# The artifact is a directory (values.npy + meta.json, with the axes, the
+# categories it was built for and the accuracy report). It is memory-mapped
+# like the compiled forests, and ignored when yield_model.pkl has changed
+# since it was built.
+#
+# Configuration (environment variables):
+#   YIELD_GRID  "1" to serve /predict-yield from the grid when it is present
+#               (default "0": always use the forest)
+
+import json
+import os
+import shutil
+import time
+from itertools import product
+from typing import Any
+
+import numpy as np
+
+YIELD_GRID = os.getenv("YIELD_GRID", "0") == "1"
+
+_META_FILE = "meta.json"
+_VALUES_FILE = "values.npy"
+_FORMAT_VERSION = 1
+
+
+class YieldGrid:
+    """
+    Yield model evaluated on a grid; see the module header.
+
+    Args:
+        categorical_columns: Categorical feature names, in values' axis order.
+        numeric_columns: Numeric feature names, in values' axis order.
+        axes: Sorted grid points per numeric column (at least 2 each).
+        values: float32 array, shape (n categories per column..., n points per axis...).
+        feature_columns: Model feature order (the layout of encoded rows).
+    """
+
+    def __init__(self, categorical_columns: list[str], numeric_columns: list[str],
+                 axes: dict[str, np.ndarray], values: np.ndarray, feature_columns: list[str]):
+        self.categorical_columns = categorical_columns
+        self.numeric_columns = numeric_columns
+        self.axes = [np.asarray(axes[col], dtype=np.float64) for col in numeric_columns]
+        self.values = values
+        self._categorical_index = [feature_columns.index(col) for col in categorical_columns]
+        self._numeric_index = [feature_columns.index(col) for col in numeric_columns]
+        self._low = np.array([axis[0] for axis in self.axes])
+        self._high = np.array([axis[-1] for axis in self.axes])
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+    def predict_row(self, row: np.ndarray) -> float | None:
+        """
+        Interpolated prediction for one encoded feature row (shape (1, n) or
+        (n,), as built by FeatureEncoder), or None if it lies outside the grid.
+        """
+        row = np.asarray(row, dtype=np.float64).ravel()
+        x = row[self._numeric_index]
+        if not (np.all(x >= self._low) and np.all(x <= self._high)):
+            return None
+
+        # Lower grid index and fractional position along every numeric axis
+        block_index = [int(code) for code in row[self._categorical_index]]
+        fractions = []
+        for axis, value in zip(self.axes, x):
+            i = min(int(np.searchsorted(axis, value, side="right")) - 1, len(axis) - 2)
+            block_index.append(slice(i, i + 2))
+            fractions.append((value - axis[i]) / (axis[i + 1] - axis[i]))
+
+        # Collapse the 2×2×…×2 block one axis at a time
+        block = self.values[tuple(block_index)].astype(np.float64)
+        for t in fractions:
+            block = block[0] + (block[1] - block[0]) * t
+        return float(block)
+
+
+def grid_points(low: float, high: float, points: int) -> np.ndarray:
+    """`points` evenly spaced grid points from low to high (at least 2)."""
+    if points < 2:
+        raise ValueError("A grid axis needs at least 2 points")
+    return np.linspace(low, high, points)
+
+
+def evaluate_grid(estimator: Any, feature_columns: list[str], categories: dict[str, list[str]],
+                  axes: dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Evaluates `estimator` on every grid point, one model call per
+    categorical combination.
+
+    Args:
+        estimator: Model with predict(X) on encoded rows in feature_columns order.
+        feature_columns: Model feature order.
+        categories: Classes per categorical column, in encoder code order.
+        axes: Grid points per numeric column.
+
+    Returns:
+        float32 array shaped (categories..., points...), in the dict orders.
+    """
+    categorical_columns = list(categories)
+    numeric_columns = list(axes)
+    mesh = np.meshgrid(*(axes[col] for col in numeric_columns), indexing="ij")
+    n_points = mesh[0].size
+
+    X = np.zeros((n_points, len(feature_columns)), dtype=np.float64)
+    for col, coordinate in zip(numeric_columns, mesh):
+        X[:, feature_columns.index(col)] = coordinate.ravel()
+
+    shape = tuple(len(categories[col]) for col in categorical_columns) + mesh[0].shape
+    values = np.empty(shape, dtype=np.float32)
+    for codes in product(*(range(len(categories[col])) for col in categorical_columns)):
+        for col, code in zip(categorical_columns, codes):
+            X[:, feature_columns.index(col)] = code
+        values[codes] = estimator.predict(X).reshape(mesh[0].shape)
+    return values
+
+
+def _source_signature(source_path: str) -> list[int]:
+    stat = os.stat(source_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def save_grid(path: str, values: np.ndarray, categories: dict[str, list[str]],
+              axes: dict[str, np.ndarray], source_path: str, report: dict[str, Any]) -> None:
+    """Writes the grid directory under a temporary name and renames it into place."""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    np.save(os.path.join(tmp_path, _VALUES_FILE), np.ascontiguousarray(values), allow_pickle=False)
+    with open(os.path.join(tmp_path, _META_FILE), "w") as f:
+        json.dump({
+            "format":     _FORMAT_VERSION,
+            "source":     _source_signature(source_path),
+            "categories": categories,
+            "axes":       {col: [float(v) for v in points] for col, points in axes.items()},
+            "report":     report,
+        }, f, indent=1)
+
+    old_path = None
+    if os.path.exists(path):
+        old_path = f"{path}.old-{os.getpid()}-{time.time_ns()}"
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    if old_path is not None:
+        shutil.rmtree(old_path, ignore_errors=True)
+
+
+def grid_meta_path(path: str) -> str:
+    """meta.json of a saved grid — written last, so its mtime marks a new build."""
+    return os.path.join(path, _META_FILE)
+
+
+def load_grid(path: str, source_path: str, categories: dict[str, list[str]],
+              feature_columns: list[str]) -> YieldGrid | None:
+    """
+    Memory-maps a saved grid. Returns None if it is missing, in another
+    format, built from a different version of `source_path`, or for other
+    encoder classes than `categories`.
+    """
+    try:
+        with open(grid_meta_path(path)) as f:
+            meta = json.load(f)
+        if (
+            meta.get("format") != _FORMAT_VERSION
+            or meta["source"] != _source_signature(source_path)
+            or meta["categories"] != categories
+        ):
+            return None
+        values = np.load(os.path.join(path, _VALUES_FILE), mmap_mode="r", allow_pickle=False)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return YieldGrid(list(meta["categories"]), list(meta["axes"]),
+                     {col: np.asarray(points) for col, points in meta["axes"].items()},
+                     values, feature_columns)
@@ -1,21 +1,19 @@
 import os
-import joblib
-import pandas as pd
+import numpy as np
+
+from services.cache import canonicalize, get_cache
+from services.forest import forest_meta_path, load_forest
+from services.metrics import record_inference
+from services.encoding import FeatureEncoder, compile_encoders, normalize_category, strip_feature_names
+from services.registry import SMOKE_FARMS, registry
+from services.yield_grid import YIELD_GRID, grid_meta_path, load_grid
 
 # ─── Paths ─────────────────────────────────────────────────────────────────────
 BASE_DIR       = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODEL_PATH     = os.path.join(BASE_DIR, "models", "yield_model.pkl")
 ENCODERS_PATH  = os.path.join(BASE_DIR, "models", "yield_encoders.pkl")
-
-# ─── Load model and encoders at module level (once on startup) ──────────────────
-try:
-    _model    = joblib.load(MODEL_PATH)
-    _encoders = joblib.load(ENCODERS_PATH)
-except FileNotFoundError as e:
-    raise FileNotFoundError(
-        f"Yield model or encoders not found. "
-        f"Please run train_yield_model.py first.\nError: {e}"
-    )
+FLAT_MODEL_PATH = os.path.join(BASE_DIR, "models", "yield_forest")
+GRID_PATH      = os.path.join(BASE_DIR, "models", "yield_grid")
 
 # Columns expected by the model (in exact order used during training)
 FEATURE_COLUMNS = [
@@ -34,6 +32,71 @@ FEATURE_COLUMNS = [
 # Categorical columns (must match what was encoded during training)
 CATEGORICAL_COLUMNS = ["Soil_Type", "Irrigation_Type", "Season", "Crop"]
 
+_CROP_INDEX = FEATURE_COLUMNS.index("Crop")
+_CONDITION_COLUMNS = [col for col in FEATURE_COLUMNS if col != "Crop"]
+
+
+# ─── Model bundle (loaded and hot-swapped through the model registry) ─────────
+class YieldModel:
+    """One loaded set of yield model artifacts and everything derived from it."""
+
+    def __init__(self, encoders: dict, estimator):
+        self.estimator = estimator  # FlatForest (memory-mapped) or the sklearn model
+
+        # Compile encoders into dict lookup tables once per load
+        self.lookups         = compile_encoders(encoders)
+        self.feature_encoder = FeatureEncoder(FEATURE_COLUMNS, self.lookups)
+        self.version = None  # set by the registry
+
+        # Precomputed surface for single predictions (build_grid.py), if enabled and current
+        self.grid = load_grid(GRID_PATH, MODEL_PATH, self.categories(), FEATURE_COLUMNS) if YIELD_GRID else None
+
+    def categories(self) -> dict[str, list[str]]:
+        """Encoder classes per categorical column, in code order."""
+        return {col: self.lookups[col].classes for col in CATEGORICAL_COLUMNS}
+
+
+def load_yield_model() -> YieldModel:
+    """
+    Loads the encoders and the compiled (memory-mapped, worker-shared) forest;
+    the sklearn model is only unpickled when that is missing or stale.
+    """
+    import joblib  # deferred (with the sklearn import it triggers) for fast cold starts
+
+    try:
+        encoders  = joblib.load(ENCODERS_PATH)
+        estimator = load_forest(FLAT_MODEL_PATH, source_path=MODEL_PATH)
+        if estimator is None:
+            estimator = joblib.load(MODEL_PATH, mmap_mode="r")
+            # The model is fed plain float64 rows in FEATURE_COLUMNS order, not DataFrames.
+            # Single-row predictions are faster without joblib's thread fan-out.
+            strip_feature_names(estimator, FEATURE_COLUMNS)
+            estimator.n_jobs = 1
+    except FileNotFoundError as e:
+        raise FileNotFoundError(
+            f"Yield model or encoders not found. "
+            f"Please run train_yield_model.py first.\nError: {e}"
+        )
+
+    return YieldModel(encoders, estimator)
+
+
+def validate_yield_model(bundle: YieldModel) -> None:
+    """Smoke-tests a freshly loaded bundle before it is swapped in."""
+    crops = [crop for crop in MARKET_PRICE if crop in bundle.lookups["Crop"].classes]
+    if not crops:
+        raise ValueError("Yield encoders know none of the crops in MARKET_PRICE")
+    X = np.vstack([
+        bundle.feature_encoder.row({**farm, "Crop": crop}) for farm in SMOKE_FARMS for crop in crops
+    ])
+    predictions = bundle.estimator.predict(X)
+    if predictions.shape != (len(X),) or not np.all(np.isfinite(predictions)) or np.any(predictions < 0):
+        raise ValueError("Yield model returned non-finite or negative yields on the smoke set")
+
+
+# LRU cache of per-crop yield predictions keyed on (model version, farm conditions, crop)
+_cache = get_cache("predict_yield")
+
 # ─── Market Prices (₹ per ton) ─────────────────────────────────────────────────
 MARKET_PRICE = {
     "Tomato": 12000,
@@ -43,6 +106,15 @@ MARKET_PRICE = {
     "Maize":   6000,
 }
 
+registry.register(
+    "yield",
+    load=load_yield_model,
+    validate=validate_yield_model,
+    sources=[MODEL_PATH, ENCODERS_PATH],
+    derived=[forest_meta_path(FLAT_MODEL_PATH), grid_meta_path(GRID_PATH)],
+)
+registry.preload("yield")  # eager mode: load now so missing artifacts fail fast
+
 
 def calculate_profit(yield_per_acre: float, acres: float, crop_name: str) -> float:
     """
@@ -69,25 +141,6 @@ def calculate_profit(yield_per_acre: float, acres: float, crop_name: str) -> flo
     return round(total_profit, 2)
 
 
-def _encode_input(input_df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Apply saved LabelEncoders to categorical columns.
-    Raises ValueError if an unseen category is encountered.
-    """
-    for col in CATEGORICAL_COLUMNS:
-        if col not in _encoders:
-            continue
-        le = _encoders[col]
-        unseen = set(input_df[col].astype(str)) - set(le.classes_)
-        if unseen:
-            raise ValueError(
-                f"Unknown value(s) {unseen} for column '{col}'. "
-                f"Accepted values: {list(le.classes_)}"
-            )
-        input_df[col] = le.transform(input_df[col].astype(str))
-    return input_df
-
-
 def predict_yield(input_data: dict, crop_name: str) -> float:
     """
     Predict crop yield in tons per acre for given farm conditions.
@@ -107,16 +160,108 @@ def predict_yield(input_data: dict, crop_name: str) -> float:
 
     Returns:
         float: Predicted yield in tons per acre, rounded to 3 decimal places.
+            With YIELD_GRID=1 and a current grid, in-grid conditions are
+            interpolated from the precomputed surface instead.
     """
+    bundle = registry.get("yield")
+    key, conditions = canonicalize(input_data, _CONDITION_COLUMNS)
+    # Grid-served values differ from the forest's, so they get their own keys
+    path = "forest" if bundle.grid is None else "grid"
+    return _cache.get_or_compute(
+        (bundle.version, path) + key + (normalize_category(crop_name),),
+        lambda: _predict_yield(bundle, conditions, crop_name),
+    )
+
+
+def _predict_yield(bundle: YieldModel, input_data: dict, crop_name: str) -> float:
     # Merge crop_name into the input dict
     data = {**input_data, "Crop": crop_name}
 
-    # Build a single-row DataFrame with the correct column order
-    row = pd.DataFrame([data])[FEATURE_COLUMNS]
+    # Build a float64 feature row in FEATURE_COLUMNS order, encoding categoricals
+    row = bundle.feature_encoder.row(data)
 
-    # Encode categoricals
-    row = _encode_input(row)
-
-    # Predict and return
-    prediction = _model.predict(row)[0]
+    # Interpolate from the precomputed grid when in range, else run the forest
+    prediction = bundle.grid.predict_row(row) if bundle.grid is not None else None
+    if prediction is not None:
+        record_inference("yield_grid", 1)
+    else:
+        prediction = bundle.estimator.predict(row)[0]
+        record_inference("yield", 1)
     return round(float(prediction), 3)
+
+
+def predict_yields_for_crops(input_data: dict, crops: list[str]) -> dict[str, float]:
+    """
+    Predict yield per acre for several crops under the same farm conditions
+    with a single model call.
+
+    The rows differ only in the Crop column, so one encoded base row is
+    repeated per crop and the forest is evaluated once for all of them.
+
+    Args:
+        input_data (dict): Farm condition parameters (see predict_yield).
+        crops (list[str]): Crop names to predict.
+
+    Returns:
+        dict[str, float]: {crop_name: yield in tons per acre (3 d.p.)}.
+    """
+    if not crops:
+        return {}
+
+    # Serve what we can from the cache; predict only the misses
+    bundle = registry.get("yield")
+    key, conditions = canonicalize(input_data, _CONDITION_COLUMNS)
+    key = (bundle.version, "forest") + key
+    results: dict[str, float] = {}
+    missing: list[str] = []
+    for crop in crops:
+        cached = _cache.get(key + (normalize_category(crop),))
+        if cached is None:
+            missing.append(crop)
+        else:
+            results[crop] = cached
+
+    if missing:
+        crop_lookup = bundle.lookups["Crop"]
+        crop_codes = [crop_lookup.encode(crop) for crop in missing]
+
+        base = bundle.feature_encoder.row({**conditions, "Crop": missing[0]})
+        rows = np.repeat(base, len(missing), axis=0)
+        rows[:, _CROP_INDEX] = crop_codes
+
+        predictions = bundle.estimator.predict(rows)
+        record_inference("yield", len(rows))
+        for crop, p in zip(missing, predictions):
+            results[crop] = round(float(p), 3)
+            _cache.put(key + (normalize_category(crop),), results[crop])
+
+    return {crop: results[crop] for crop in crops}
+
+
+def predict_yields_batch(rows: list[dict], crops: list[str]) -> list[float]:
+    """
+    Predict yield per acre for many (farm, crop) pairs with a single model
+    call, for bulk planning. Bypasses the prediction cache and always runs
+    the forest, so the i-th value equals predict_yield(rows[i], crops[i])
+    only when the grid is off (YIELD_GRID=0 or no current grid).
+
+    Args:
+        rows (list[dict]): Farm condition dicts (see predict_yield).
+        crops (list[str]): Crop name per row.
+
+    Returns:
+        list[float]: Yield in tons per acre (3 d.p.) per pair.
+
+    Raises:
+        ValueError: On an unknown category or non-numeric value in any row.
+    """
+    if not rows:
+        return []
+    bundle = registry.get("yield")
+    X = np.vstack([
+        bundle.feature_encoder.row({**canonicalize(row, _CONDITION_COLUMNS)[1], "Crop": crop})
+        for row, crop in zip(rows, crops)
+    ])
+    predictions = bundle.estimator.predict(X)
+    record_inference("yield", len(X))
+    return [round(float(p), 3) for p in predictions]
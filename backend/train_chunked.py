@@ -0,0 +1,242 @@
+"""
+Memory-bounded training for datasets too large for train_model.py /
+train_yield_model.py to load in one piece.
+
+  Pass 1  streams the CSV in chunks (categoricals as `category`, numerics as
+          float32 / int32) and collects every category's classes and the
+          row count → label encoders.
+  Pass 2  streams it again, label-encodes each chunk and keeps a uniform
+          random sample of at most --max-rows rows in a preallocated
+          float32 matrix.
+  Fit     the same RandomForest (and 80/20 split) as the original scripts,
+          on the sample.
+
+Memory is bounded by --max-rows × features plus one chunk, whatever the
+size of the CSV. When the dataset has no more than --max-rows rows, every
+row is used and the model is identical to the one the original script
+trains (scikit-learn fits trees on float32 features anyway).
+
+Artifacts are written to the same files as the original scripts, so
+the services pick them up (run compile_models.py afterwards).
+
+Usage (from backend/):
+    python train_chunked.py crop  [--data PATH] [--chunksize 100000] [--max-rows 1000000]
+    python train_chunked.py yield [--data PATH] ... [--out-dir models/]
+"""
+
+import argparse
+import os
+import resource
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.metrics import accuracy_score, mean_absolute_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+
+BASE_DIR   = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, "models")
+
+FEATURES = [
+    "Soil_Type",
+    "Farm_Area_acres",
+    "Water_Availability_L_per_week",
+    "Irrigation_Type",
+    "Fertilizer_Used_kg",
+    "Season",
+    "Rainfall_mm",
+    "Temperature_C",
+    "Soil_pH",
+]
+
+# Compact on-read dtypes. Water is int32 rather than int16: weekly litres on
+# large farms can exceed 32767.
+NUMERIC_DTYPES = {
+    "Farm_Area_acres":               "float32",
+    "Water_Availability_L_per_week": "int32",
+    "Fertilizer_Used_kg":            "float32",
+    "Rainfall_mm":                   "float32",
+    "Temperature_C":                 "float32",
+    "Soil_pH":                       "float32",
+}
+
+# Per model: dataset, columns, estimator and artifact file names (as in the
+# original training scripts)
+SPECS = {
+    "crop": {
+        "data":        os.path.join(BASE_DIR, "dataset", "farm_resource_dataset.csv"),
+        "features":    FEATURES,
+        "categorical": ["Soil_Type", "Irrigation_Type", "Season"],
+        "target":      "Crop",
+        "estimator":   lambda: RandomForestClassifier(n_estimators=20, max_depth=15, random_state=42),
+        "model_path":  "crop_model.pkl",
+        "encoders_path": "encoders.pkl",
+        "target_encoder_path": "crop_encoder.pkl",
+    },
+    "yield": {
+        "data":        os.path.join(BASE_DIR, "dataset", "agriculture_dataset.csv"),
+        "features":    FEATURES + ["Crop"],
+        "categorical": ["Soil_Type", "Irrigation_Type", "Season", "Crop"],
+        "target":      "Crop_Yield_ton_per_acre",
+        "estimator":   lambda: RandomForestRegressor(n_estimators=20, max_depth=12, random_state=42, n_jobs=-1),
+        "model_path":  "yield_model.pkl",
+        "encoders_path": "yield_encoders.pkl",
+        "target_encoder_path": None,
+    },
+}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (ru_maxrss is in kB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def read_chunks(spec: dict, chunksize: int):
+    """Streams the dataset with compact dtypes; the target is a category when classifying."""
+    classify = spec["target_encoder_path"] is not None
+    dtypes = {col: "category" for col in spec["categorical"]}
+    dtypes.update({col: NUMERIC_DTYPES[col] for col in spec["features"] if col in NUMERIC_DTYPES})
+    # Regression targets stay float64, the precision scikit-learn fits them in
+    dtypes[spec["target"]] = "category" if classify else "float64"
+    return pd.read_csv(
+        spec["data"], usecols=spec["features"] + [spec["target"]], dtype=dtypes, chunksize=chunksize
+    )
+
+
+def _stripped_categories(column: pd.Series) -> np.ndarray:
+    return column.cat.categories.astype(str).str.strip().to_numpy(dtype=object)
+
+
+def scan_classes(spec: dict, chunksize: int) -> tuple[dict[str, list[str]], int]:
+    """Pass 1: sorted classes per categorical column (and class target), and the row count."""
+    label_cols = spec["categorical"] + ([spec["target"]] if spec["target_encoder_path"] else [])
+    seen: dict[str, set] = {col: set() for col in label_cols}
+    rows = 0
+    for chunk in read_chunks(spec, chunksize):
+        rows += len(chunk)
+        for col in label_cols:
+            # Only categories that actually occur in this chunk
+            present = chunk[col].cat.remove_unused_categories()
+            seen[col].update(_stripped_categories(present))
+    return {col: sorted(values) for col, values in seen.items()}, rows
+
+
+def encode_column(column: pd.Series, classes: list[str]) -> np.ndarray:
+    """Label codes of a categorical chunk column against the global sorted classes."""
+    code_of = {value: code for code, value in enumerate(classes)}
+    category_codes = np.array([code_of[v] for v in _stripped_categories(column)], dtype=np.int32)
+    return category_codes[column.cat.codes.to_numpy()]
+
+
+def sample_rows(spec: dict, chunksize: int, classes: dict[str, list[str]], total_rows: int,
+                max_rows: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pass 2: encodes every chunk and keeps a uniform random sample of
+    min(total_rows, max_rows) rows, in file order.
+    """
+    if total_rows <= max_rows:
+        keep = np.arange(total_rows)
+    else:
+        keep = np.sort(np.random.default_rng(seed).choice(total_rows, size=max_rows, replace=False))
+
+    classify = spec["target_encoder_path"] is not None
+    X = np.empty((len(keep), len(spec["features"])), dtype=np.float32)
+    y = np.empty(len(keep), dtype=np.int32 if classify else np.float64)
+
+    offset = filled = 0
+    for chunk in read_chunks(spec, chunksize):
+        lo, hi = np.searchsorted(keep, [offset, offset + len(chunk)])
+        rows = keep[lo:hi] - offset
+        offset += len(chunk)
+        if not len(rows):
+            continue
+        for j, col in enumerate(spec["features"]):
+            if col in classes:
+                X[filled:filled + len(rows), j] = encode_column(chunk[col], classes[col])[rows]
+            else:
+                X[filled:filled + len(rows), j] = chunk[col].to_numpy()[rows]
+        target = chunk[spec["target"]]
+        y[filled:filled + len(rows)] = (
+            encode_column(target, classes[spec["target"]]) if classify else target.to_numpy()
+        )[rows]
+        filled += len(rows)
+    return X, y
+
+
+def label_encoder(classes: list[str]) -> LabelEncoder:
+    encoder = LabelEncoder()
+    encoder.fit(classes)
+    return encoder
+
+
+def train(name: str, data: str | None, chunksize: int, max_rows: int, seed: int,
+          out_dir: str = MODELS_DIR) -> None:
+    spec = dict(SPECS[name])
+    if data:
+        spec["data"] = data
+    classify = spec["target_encoder_path"] is not None
+
+    print("\n" + "=" * 55)
+    print(f"  Chunked training — {name} model")
+    print("=" * 55)
+    print(f"Dataset    : {spec['data']}")
+    print(f"Chunk size : {chunksize} rows   Max sample: {max_rows} rows")
+
+    start = time.perf_counter()
+    classes, total_rows = scan_classes(spec, chunksize)
+    pass1_s = time.perf_counter() - start
+    print(f"\n[Pass 1] {total_rows} rows, classes collected in {pass1_s:.2f} s (peak RSS {peak_rss_mb():.0f} MB)")
+    for col, values in classes.items():
+        print(f"   {col}: {values}")
+
+    start = time.perf_counter()
+    X, y = sample_rows(spec, chunksize, classes, total_rows, max_rows, seed)
+    pass2_s = time.perf_counter() - start
+    print(f"[Pass 2] {len(X)} rows sampled and encoded in {pass2_s:.2f} s "
+          f"({X.nbytes / 2**20:.1f} MB feature matrix, peak RSS {peak_rss_mb():.0f} MB)")
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    start = time.perf_counter()
+    model = spec["estimator"]()
+    model.fit(X_train, y_train)
+    fit_s = time.perf_counter() - start
+    print(f"[Fit]    {type(model).__name__} on {len(X_train)} rows in {fit_s:.2f} s (peak RSS {peak_rss_mb():.0f} MB)")
+
+    y_pred = model.predict(X_test)
+    if classify:
+        print(f"   Accuracy on {len(X_test)} held-out rows : {accuracy_score(y_test, y_pred):.4f}")
+    else:
+        print(f"   MAE  : {mean_absolute_error(y_test, y_pred):.4f} ton/acre")
+        print(f"   R²   : {r2_score(y_test, y_pred):.4f}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    model_path = os.path.join(out_dir, spec["model_path"])
+    joblib.dump(model, model_path)
+    joblib.dump({col: label_encoder(classes[col]) for col in spec["categorical"]},
+                os.path.join(out_dir, spec["encoders_path"]))
+    if classify:
+        joblib.dump(label_encoder(classes[spec["target"]]), os.path.join(out_dir, spec["target_encoder_path"]))
+
+    print(f"\n✅ Model saved → {model_path}")
+    print(f"✅ Total {pass1_s + pass2_s + fit_s:.2f} s, peak RSS {peak_rss_mb():.0f} MB")
+    print("   Run `python compile_models.py` to refresh the compiled forests.")
+    print("=" * 55 + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("model", choices=list(SPECS))
+    parser.add_argument("--data", help="CSV to train on (default: the model's dataset in dataset/)")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="rows per CSV chunk")
+    parser.add_argument("--max-rows", type=int, default=1_000_000, help="rows kept for training")
+    parser.add_argument("--seed", type=int, default=42, help="sampling seed")
+    parser.add_argument("--out-dir", default=MODELS_DIR, help="where to write the artifacts (default: models/)")
+    args = parser.parse_args()
+    train(args.model, args.data, args.chunksize, args.max_rows, args.seed, args.out_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,18 @@
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
 import joblib
 import os
 
+from services.dataset_cache import label_encode, load_dataset
+
 # Set base directory
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(BASE_DIR, "dataset", "farm_resource_dataset.csv")
 
-# Load dataset
-data = pd.read_csv(DATA_PATH)
-
-# Clean column names and data (strip spaces)
-data.columns = [col.strip() for col in data.columns]
+# Load dataset (column names and string values come back stripped, via the
+# columnar cache in dataset/.cache/)
+data = load_dataset(DATA_PATH)
 categorical_cols = ["Soil_Type", "Irrigation_Type", "Season"]
-for col in categorical_cols:
-    data[col] = data[col].astype(str).str.strip()
 
 # Define features and target
 features = [
@@ -31,18 +27,14 @@ features = [
     "Soil_pH"
 ]
 X = data[features].copy()
-y = data["Crop"].str.strip()
 
 # Encode categorical columns
-encoders = {}
-for col in categorical_cols:
-    le = LabelEncoder()
-    X[col] = le.fit_transform(X[col])
-    encoders[col] = le
+X, encoders = label_encode(X, categorical_cols)
 
 # Encode crop label
-crop_encoder = LabelEncoder()
-y = crop_encoder.fit_transform(y)
+labels, label_encoders = label_encode(data[["Crop"]].copy(), ["Crop"])
+y = labels["Crop"].to_numpy()
+crop_encoder = label_encoders["Crop"]
 
 # Train-test split
 X_train, X_test, y_train, y_test = train_test_split(
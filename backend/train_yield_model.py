@@ -4,9 +4,10 @@ import numpy as np
 import joblib
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import mean_absolute_error, r2_score
 
+from services.dataset_cache import label_encode, load_dataset
+
 # ─── Paths ─────────────────────────────────────────────────────────────────────
 BASE_DIR        = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH       = os.path.join(BASE_DIR, "dataset", "agriculture_dataset.csv")
@@ -59,24 +60,22 @@ def generate_sample_dataset(path: str, n_rows: int = 10000) -> pd.DataFrame:
 
 
 def load_or_generate_data() -> pd.DataFrame:
-    if os.path.exists(DATA_PATH):
-        df = pd.read_csv(DATA_PATH)
-        print(f"✅ Loaded dataset: {DATA_PATH}  ({len(df)} rows)")
-    else:
+    if not os.path.exists(DATA_PATH):
         print(f"⚠️  agriculture_dataset.csv not found. Generating synthetic data...")
-        df = generate_sample_dataset(DATA_PATH)
+        generate_sample_dataset(DATA_PATH)
+    # Read through the columnar cache in dataset/.cache/ (string columns
+    # come back as categoricals)
+    df = load_dataset(DATA_PATH)
+    print(f"✅ Loaded dataset: {DATA_PATH}  ({len(df)} rows)")
     return df
 
 
 def label_encode_categoricals(df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
     """Label-encode all string/object columns. Returns (encoded_df, encoders_dict)."""
-    encoders = {}
     # Use 'str' for pandas 3 compatibility; falls back to 'object' gracefully
-    cat_cols = df.select_dtypes(include=["object", "string"]).columns.tolist()
-    for col in cat_cols:
-        le = LabelEncoder()
-        df[col] = le.fit_transform(df[col].astype(str))
-        encoders[col] = le
+    cat_cols = df.select_dtypes(include=["object", "string", "category"]).columns.tolist()
+    df, encoders = label_encode(df, cat_cols)
+    for col, le in encoders.items():
         print(f"   Label-encoded: {col}  (classes: {list(le.classes_)})")
     return df, encoders
 
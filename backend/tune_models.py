@@ -0,0 +1,307 @@
+"""
+Hyperparameter search for the crop and yield forests, trading accuracy
+against inference latency and artifact size.
+
+Every candidate (n_estimators × max_depth × min_samples_leaf) is scored in
+a process pool (joblib):
+  - k-fold cross-validation on the training split (accuracy for crop, MAE
+    for yield) and the score on the held-out 20% (the training scripts'
+    split)
+  - the size of the pickled model and of the compiled forest
+    (compile_models.py), which is what the services load.
+Then, one candidate at a time with nothing else running, it measures the
+compiled forest's single-row latency (median of --single-calls calls) and
+its batch latency (median of --batch-calls calls on --batch-rows rows).
+
+--search halving runs successive halving instead of the full grid: each
+round cross-validates the surviving candidates on 3x more training rows.
+It keeps the best third by score, plus every candidate that is
+Pareto-optimal on (score, node count), so that small, fast models aren't
+dropped for a slightly lower score.
+
+The output table marks the Pareto frontier over (held-out score,
+single-row latency, batch latency, compiled size) and the current
+hyperparameters. With --latency-budget-ms, it also names the best-scoring
+candidate within the budget. --json saves every candidate's metrics.
+
+Usage (from backend/):
+    python tune_models.py crop  [--search grid|halving] [--jobs -1] [--cv 3] [--json tuning_crop.json]
+    python tune_models.py yield [--n-estimators 10 20 50] [--max-depth 8 12 None] [--min-samples-leaf 1 5]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from itertools import product
+
+import joblib
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, mean_absolute_error
+from sklearn.model_selection import cross_val_score, train_test_split
+
+from services.dataset_cache import label_encode, load_dataset
+from services.forest import compile_forest, load_forest, save_forest
+from train_chunked import SPECS
+
+SCORING = {"crop": "accuracy", "yield": "neg_mean_absolute_error"}
+PARAMS  = ("n_estimators", "max_depth", "min_samples_leaf")
+
+
+# ─── Data ──────────────────────────────────────────────────────────────────────
+
+def load_split(name: str) -> tuple[np.ndarray, ...]:
+    """The training scripts' features, encoding and 80/20 split, as float32."""
+    spec = SPECS[name]
+    data = load_dataset(spec["data"])
+    X, _ = label_encode(data[spec["features"]].copy(), spec["categorical"])
+    if name == "crop":
+        labels, _ = label_encode(data[[spec["target"]]].copy(), [spec["target"]])
+        y = labels[spec["target"]].to_numpy()
+    else:
+        y = data[spec["target"]].to_numpy(dtype=np.float64)
+    return tuple(train_test_split(X.to_numpy(dtype=np.float32), y, test_size=0.2, random_state=42))
+
+
+def score(name: str, y_true: np.ndarray, y_pred: np.ndarray) -> float:
+    """Held-out accuracy (crop) or MAE in ton/acre (yield)."""
+    return accuracy_score(y_true, y_pred) if name == "crop" else mean_absolute_error(y_true, y_pred)
+
+
+def better(name: str, a: float, b: float) -> bool:
+    """True if score `a` is at least as good as `b` (accuracy up, MAE down)."""
+    return a >= b if name == "crop" else a <= b
+
+
+# ─── Candidates ────────────────────────────────────────────────────────────────
+
+def estimator(name: str, params: dict):
+    """The training script's estimator with `params` overridden, single-threaded."""
+    return clone(SPECS[name]["estimator"]()).set_params(n_jobs=1, **params)
+
+
+def current_params(name: str) -> dict:
+    defaults = SPECS[name]["estimator"]().get_params()
+    return {p: defaults[p] for p in PARAMS}
+
+
+def cv_score(name: str, params: dict, X: np.ndarray, y: np.ndarray, folds: int) -> tuple[dict, float, int]:
+    """Mean cross-validated score (MAE positive) and total node count of one fit."""
+    scores = cross_val_score(estimator(name, params), X, y, cv=folds, scoring=SCORING[name], n_jobs=1)
+    nodes = sum(t.tree_.node_count for t in estimator(name, params).fit(X, y).estimators_)
+    return params, float(abs(np.mean(scores))), nodes
+
+
+def evaluate(name: str, params: dict, split: tuple, folds: int, out_dir: str) -> dict:
+    """
+    Cross-validates and fits one candidate, scores it on the held-out split
+    and saves its pickle and compiled forest (stamped with that pickle, as
+    compile_models.py does) to `out_dir` for the latency pass.
+    """
+    X_train, X_test, y_train, y_test = split
+    cv = float(abs(np.mean(cross_val_score(
+        estimator(name, params), X_train, y_train, cv=folds, scoring=SCORING[name], n_jobs=1
+    ))))
+
+    start = time.perf_counter()
+    model = estimator(name, params).fit(X_train, y_train)
+    fit_s = time.perf_counter() - start
+
+    pickle_path = os.path.join(out_dir, f"{_slug(params)}.pkl")
+    joblib.dump(model, pickle_path)
+    forest = compile_forest(model)
+    save_forest(forest, os.path.join(out_dir, _slug(params)), pickle_path)
+
+    return {
+        **params,
+        "cv_score":       round(cv, 5),
+        "test_score":     round(float(score(name, y_test, model.predict(X_test))), 5),
+        "fit_seconds":    round(fit_s, 3),
+        "nodes":          forest.n_nodes,
+        "pickle_kb":      round(os.path.getsize(pickle_path) / 1024, 1),
+        "compiled_kb":    round(forest.nbytes / 1024, 1),
+    }
+
+
+def _slug(params: dict) -> str:
+    return "-".join(f"{p}{params[p]}" for p in PARAMS)
+
+
+def measure_latency(forest, X: np.ndarray, single_calls: int, batch_rows: int, batch_calls: int) -> dict:
+    """Median single-row and batch latency of a compiled forest, as the services call it."""
+    def median_ms(fn, calls: int) -> float:
+        times = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return round(statistics.median(times) * 1000, 4)
+
+    row = X[:1]
+    batch = np.resize(X, (batch_rows, X.shape[1]))
+    # Single rows go through predict, batches through predict_proba for the
+    # classifier (as prediction.py does)
+    batch_fn = forest.predict_proba if forest.kind == "classifier" else forest.predict
+    forest.predict(row)
+    return {
+        "single_ms": median_ms(lambda: forest.predict(row), single_calls),
+        "batch_ms":  median_ms(lambda: batch_fn(batch), batch_calls),
+    }
+
+
+# ─── Search strategies ─────────────────────────────────────────────────────────
+
+def pareto(candidates: list[dict], objectives: list[tuple[str, bool]]) -> list[bool]:
+    """
+    Marks non-dominated candidates. `objectives` are (key, higher_is_better);
+    a candidate is dominated if another is at least as good on every
+    objective and strictly better on one.
+    """
+    def at_least(a, b, key, higher):
+        return a[key] >= b[key] if higher else a[key] <= b[key]
+
+    return [
+        not any(
+            all(at_least(o, c, k, h) for k, h in objectives)
+            and any(o[k] != c[k] for k, _ in objectives)
+            for o in candidates
+        )
+        for c in candidates
+    ]
+
+
+def successive_halving(name: str, grid: list[dict], X: np.ndarray, y: np.ndarray, folds: int,
+                       jobs: int, factor: int = 3) -> list[dict]:
+    """
+    Prunes `grid` by cross-validating on growing subsets of the training
+    rows. Keeps the top 1/factor by score plus the (score, nodes) Pareto
+    front each round; stops when one round's survivors use all rows.
+    """
+    rounds = max(0, int(np.ceil(np.log(max(len(grid), 1)) / np.log(factor))) - 1)
+    survivors = grid
+    for r in range(rounds, 0, -1):
+        rows = max(len(X) // factor ** r, folds * 20)
+        rng = np.random.default_rng(r)
+        subset = np.sort(rng.choice(len(X), size=min(rows, len(X)), replace=False))
+        results = Parallel(n_jobs=jobs)(
+            delayed(cv_score)(name, params, X[subset], y[subset], folds) for params in survivors
+        )
+        ranked = sorted(results, key=lambda r_: r_[1], reverse=(name == "crop"))
+        keep = {_slug(p) for p, _, _ in ranked[:max(1, len(ranked) // factor)]}
+        entries = [{"slug": _slug(p), "score": s, "nodes": n} for p, s, n in results]
+        front = pareto(entries, [("score", name == "crop"), ("nodes", False)])
+        keep |= {e["slug"] for e, on_front in zip(entries, front) if on_front}
+        survivors = [p for p in survivors if _slug(p) in keep]
+        print(f"   halving: {len(results)} candidates on {len(subset)} rows → {len(survivors)} kept")
+    return survivors
+
+
+# ─── Main ──────────────────────────────────────────────────────────────────────
+
+def _depth(value: str):
+    return None if value.lower() == "none" else int(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("model", choices=list(SPECS))
+    parser.add_argument("--search", choices=("grid", "halving"), default="grid")
+    parser.add_argument("--n-estimators", type=int, nargs="+", default=[10, 20, 50, 100])
+    parser.add_argument("--max-depth", type=_depth, nargs="+", default=[8, 12, 15, 20, None])
+    parser.add_argument("--min-samples-leaf", type=int, nargs="+", default=[1, 5])
+    parser.add_argument("--cv", type=int, default=3, help="cross-validation folds")
+    parser.add_argument("--jobs", type=int, default=-1, help="worker processes (-1: one per CPU)")
+    parser.add_argument("--single-calls", type=int, default=200)
+    parser.add_argument("--batch-rows", type=int, default=256)
+    parser.add_argument("--batch-calls", type=int, default=20)
+    parser.add_argument("--latency-budget-ms", type=float, help="single-row latency budget for a recommendation")
+    parser.add_argument("--json", metavar="PATH", help="write every candidate's metrics as JSON")
+    args = parser.parse_args()
+
+    name = args.model
+    current = current_params(name)
+    grid = [dict(zip(PARAMS, values)) for values in product(args.n_estimators, args.max_depth, args.min_samples_leaf)]
+    if current not in grid:
+        grid.append(current)
+
+    split = load_split(name)
+    metric = "accuracy" if name == "crop" else "MAE (ton/acre)"
+    print(f"\n🔎 Tuning {name} model: {len(grid)} candidates, {args.cv}-fold CV, "
+          f"{len(split[0])} train / {len(split[1])} held-out rows, score = {metric}")
+
+    start = time.perf_counter()
+    if args.search == "halving":
+        grid = successive_halving(name, grid, split[0], split[2], args.cv, args.jobs)
+        if current not in grid:
+            grid.append(current)
+
+    tmp = tempfile.mkdtemp(prefix="tune-")
+    try:
+        results = Parallel(n_jobs=args.jobs)(
+            delayed(evaluate)(name, params, split, args.cv, tmp) for params in grid
+        )
+        search_s = time.perf_counter() - start
+        print(f"   search finished in {search_s:.1f} s ({len(results)} final candidates); measuring latency …")
+
+        # Latency is measured serially, with the worker pool idle
+        for result in results:
+            slug = _slug(result)
+            forest = load_forest(os.path.join(tmp, slug), os.path.join(tmp, f"{slug}.pkl"), mmap=False)
+            result.update(measure_latency(forest, split[1], args.single_calls, args.batch_rows, args.batch_calls))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    front = pareto(results, [
+        ("test_score", name == "crop"), ("single_ms", False), ("batch_ms", False), ("compiled_kb", False),
+    ])
+    for result, on_front in zip(results, front):
+        result["pareto"] = on_front
+        result["current"] = {p: result[p] for p in PARAMS} == current
+
+    results.sort(key=lambda r: (r["single_ms"], -r["test_score"] if name == "crop" else r["test_score"]))
+    print(f"\n  {'trees':>5} {'depth':>5} {'leaf':>4} {'cv':>8} {'test':>8} {'1-row ms':>9} "
+          f"{f'{args.batch_rows}-row ms':>11} {'nodes':>8} {'pickle KB':>10} {'flat KB':>9}")
+    for r in results:
+        marks = ("★" if r["pareto"] else " ") + ("  ← current" if r["current"] else "")
+        print(f"  {r['n_estimators']:>5} {str(r['max_depth']):>5} {r['min_samples_leaf']:>4} "
+              f"{r['cv_score']:>8.4f} {r['test_score']:>8.4f} {r['single_ms']:>9.3f} {r['batch_ms']:>11.3f} "
+              f"{r['nodes']:>8} {r['pickle_kb']:>10.0f} {r['compiled_kb']:>9.0f} {marks}")
+    print(f"\n  ★ = Pareto frontier over test score, single-row and batch latency, and compiled size "
+          f"({sum(front)} of {len(results)})")
+
+    recommended = None
+    if args.latency_budget_ms is not None:
+        within = [r for r in results if r["single_ms"] <= args.latency_budget_ms]
+        for r in within:
+            if recommended is None or not better(name, recommended["test_score"], r["test_score"]):
+                recommended = r
+        if recommended is None:
+            print(f"\n⚠️  No candidate is within {args.latency_budget_ms} ms per row")
+        else:
+            print(f"\n✅ Best within {args.latency_budget_ms} ms per row: "
+                  + ", ".join(f"{p}={recommended[p]}" for p in PARAMS)
+                  + f" (test {recommended['test_score']:.4f}, {recommended['single_ms']:.3f} ms)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "model":       name,
+                "search":      args.search,
+                "cv_folds":    args.cv,
+                "score":       metric,
+                "batch_rows":  args.batch_rows,
+                "seconds":     round(time.perf_counter() - start, 1),
+                "current":     current,
+                "recommended": recommended and {p: recommended[p] for p in PARAMS},
+                "candidates":  results,
+            }, f, indent=2)
+        print(f"\n💾 Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()